@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Charset decoding benchmark
+
+Builds a seeded corpus of Korean and English mail in the encodings we receive
+(UTF-8, ks_c_5601-1987 and EUC-KR labels on CP949 text, unlabelled CP949,
+raw 8-bit and RFC 2047 headers, base64/quoted-printable/8bit bodies, HTML-only
+and multipart/alternative) and compares the previous UTF-8-only decoding with
+the current charset-aware extract_email_body and decode_mime_words.
+
+Each email counts as intact when its subject, sender name and body decode to
+exactly the text that was encoded; lost characters are counted per email.
+
+Usage:
+    python benchmarks/charset_benchmark.py [--emails 2000] [--seed 0] [--output report.json]
+"""
+from email import base64mime, encoders
+from email.header import Header, decode_header
+from email.message import Message
+from email.mime.multipart import MIMEMultipart
+from email.mime.nonmultipart import MIMENonMultipart
+from typing import Callable, Dict, List, Tuple
+import argparse
+import difflib
+import email
+import html
+import json
+import os
+import platform
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path[:0] = [path for path in (ROOT, os.path.join(ROOT, 'src')) if path not in sys.path]
+
+from harness import git_revision
+from jane_ai.utils.email_utils import decode_mime_words, extract_email_body
+
+SUBJECTS = [
+    "휴가 신청 (9/15~9/16)",
+    "출장기안문 작성 요청",
+    "똠방각하 세미나 좌석 배치 건",
+    "RE: 회의실 예약 확인",
+    "Course evaluation deadline",
+]
+
+NAMES = ["홍길동", "김철수", "이영희", "박똠희", "Alex Kim"]
+
+BODIES = [
+    "안녕하세요, 다음 주 월요일과 화요일 연차 휴가를 신청하려고 합니다.\n확인 부탁드립니다.",
+    "첨부한 출장 일정으로 출장기안문 초안을 작성해 주실 수 있을까요?\n출장지는 세종시이고 숙박은 1박입니다.",
+    "세미나 참석자 명단을 보내드립니다. 똠방각하님과 쀍 연구원님 자리는 앞줄로 배치해 주세요.",
+    "재직증명서 영문 발급 절차를 안내해 주세요. 감사합니다.",
+    "Could you confirm the deadline for the course evaluation?\nThanks,\nAlex",
+]
+
+# (본문 charset 표기, 실제 인코딩)
+LABELS = [
+    ("utf-8", "utf-8"),
+    ("ks_c_5601-1987", "cp949"),
+    ("euc-kr", "cp949"),
+    ("cp949", "cp949"),
+    (None, "cp949"),
+    (None, "utf-8"),
+]
+
+def old_decode_mime_words(s) -> str:
+    """The previous header decoding: declared charset as-is, otherwise UTF-8"""
+    try:
+        decoded_string = ''
+        for fragment, charset in decode_header(s):
+            if isinstance(fragment, bytes):
+                decoded_string += fragment.decode(charset) if charset else fragment.decode('utf-8')
+            else:
+                decoded_string += fragment
+        return decoded_string
+    except Exception:
+        return str(s)
+
+def old_extract_email_body(email_message: Message) -> str:
+    """The previous body extraction: text/plain parts only, always UTF-8 with errors='ignore'"""
+    try:
+        body = ""
+        if email_message.is_multipart():
+            for part in email_message.walk():
+                if part.get_content_type() == "text/plain":
+                    payload = part.get_payload(decode=True)
+                    if payload:
+                        body += payload.decode('utf-8', errors='ignore')
+        else:
+            payload = email_message.get_payload(decode=True)
+            if payload:
+                body = payload.decode('utf-8', errors='ignore')
+        body = re.sub(r'&nbsp;', ' ', html.unescape(body.strip()))
+        body = '\n'.join(re.sub(r'[ \t]+', ' ', line.strip()) for line in body.split('\n'))
+        return re.sub(r'\n{3,}', '\n\n', body).strip()
+    except Exception:
+        return "본문을 읽을 수 없습니다."
+
+class CorpusBuilder:
+    """Raw RFC 822 bytes with the expected subject, sender name and body"""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+
+    def _text_part(self, text: str, subtype: str, label, codec: str) -> MIMENonMultipart:
+        part = MIMENonMultipart('text', subtype)
+        encoding = self.rng.choice(['base64', 'quoted-printable', '8bit'])
+        data = text.encode(codec)
+        if encoding == 'base64':
+            part.set_payload(data)
+            encoders.encode_base64(part)
+        elif encoding == 'quoted-printable':
+            part.set_payload(data)
+            encoders.encode_quopri(part)
+        else:
+            # BytesGenerator가 surrogateescape로 원래 바이트를 그대로 씀
+            part.set_payload(data.decode('ascii', errors='surrogateescape'))
+            part['Content-Transfer-Encoding'] = '8bit'
+        if label:
+            part.set_param('charset', label)
+        return part
+
+    def _header(self, text: str, codec: str) -> Tuple[str, bool]:
+        """RFC 2047 encoded word or raw 8-bit bytes (second value)"""
+        if text.isascii():
+            return text, False
+        if self.rng.random() < 0.25:
+            return text, True
+        if codec == 'utf-8':
+            return Header(text, 'utf-8').encode(), False
+        label = self.rng.choice(['ks_c_5601-1987', 'euc-kr'])
+        return base64mime.header_encode(text.encode(codec), charset=label), False
+
+    def build_one(self) -> Tuple[str, bytes, Tuple[str, str, str]]:
+        subject, name, body = self.rng.choice(SUBJECTS), self.rng.choice(NAMES), self.rng.choice(BODIES)
+        label, codec = self.rng.choice(LABELS)
+        shape = self.rng.choice(['plain', 'alternative', 'html_only'])
+
+        html_body = "".join(f"<p>{html.escape(line)}</p>" for line in body.split('\n'))
+        if shape == 'plain':
+            message = self._text_part(body, 'plain', label, codec)
+        elif shape == 'html_only':
+            message = self._text_part(f"<html><body>{html_body}</body></html>", 'html', label, codec)
+        else:
+            message = MIMEMultipart('alternative')
+            message.attach(self._text_part(body, 'plain', label, codec))
+            message.attach(self._text_part(f"<html><body>{html_body}</body></html>", 'html', label, codec))
+
+        raw_headers = []
+        subject_value, subject_raw = self._header(subject, codec)
+        name_value, name_raw = self._header(name, codec)
+        headers = {'Subject': (subject_value, subject_raw), 'From': (f"{name_value} <staff@kdis.ac.kr>", name_raw)}
+        for key, (value, raw) in headers.items():
+            if raw:
+                raw_headers.append(f"{key}: {value}".encode(codec))
+            else:
+                message[key] = value
+        data = message.as_bytes()
+        if raw_headers:
+            data = b"\r\n".join(raw_headers) + b"\r\n" + data
+        style = f"{label or 'unlabelled'}/{codec}/{shape}"
+        return style, data, (subject, f"{name} <staff@kdis.ac.kr>", body)
+
+    def build(self, count: int) -> List[Tuple[str, bytes, Tuple[str, str, str]]]:
+        return [self.build_one() for _ in range(count)]
+
+def lost_chars(expected: str, actual: str) -> int:
+    matcher = difflib.SequenceMatcher(None, expected, actual, autojunk=False)
+    return len(expected) - sum(block.size for block in matcher.get_matching_blocks())
+
+def run(decode_header_fn: Callable, extract_fn: Callable,
+        corpus: List[Tuple[str, bytes, Tuple[str, str, str]]]) -> Tuple[List[Tuple[str, str, str]], float]:
+    started = time.perf_counter()
+    decoded = []
+    for _, data, _ in corpus:
+        message = email.message_from_bytes(data)
+        decoded.append((decode_header_fn(message.get('Subject', '')), decode_header_fn(message.get('From', '')),
+                        extract_fn(message)))
+    return decoded, time.perf_counter() - started
+
+def score(corpus, decoded) -> Dict[str, Dict[str, float]]:
+    by_style: Dict[str, Dict[str, float]] = {}
+    for (style, _, expected), actual in zip(corpus, decoded):
+        stats = by_style.setdefault(style, {"emails": 0, "intact": 0, "lost_chars": 0})
+        stats["emails"] += 1
+        lost = sum(lost_chars(want, got) for want, got in zip(expected, actual))
+        stats["lost_chars"] += lost
+        stats["intact"] += int(lost == 0)
+    return by_style
+
+def summarize(by_style: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    emails = sum(stats["emails"] for stats in by_style.values())
+    intact = sum(stats["intact"] for stats in by_style.values())
+    lost = sum(stats["lost_chars"] for stats in by_style.values())
+    return {"intact_pct": 100 * intact / emails if emails else 0.0, "lost_chars_per_email": lost / emails if emails else 0.0}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Jane.ai mixed-charset decoding benchmark")
+    parser.add_argument('--emails', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="also write the JSON report to this file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    corpus = CorpusBuilder(args.seed).build(args.emails)
+
+    old_decoded, old_elapsed = run(old_decode_mime_words, old_extract_email_body, corpus)
+    new_decoded, new_elapsed = run(decode_mime_words, extract_email_body, corpus)
+    old_scores, new_scores = score(corpus, old_decoded), score(corpus, new_decoded)
+
+    by_style = {}
+    for style in sorted(old_scores):
+        before, after = old_scores[style], new_scores[style]
+        by_style[style] = {
+            "emails": before["emails"],
+            "intact_before_pct": 100 * before["intact"] / before["emails"],
+            "intact_after_pct": 100 * after["intact"] / after["emails"],
+            "lost_chars_before": before["lost_chars"] / before["emails"],
+            "lost_chars_after": after["lost_chars"] / after["emails"],
+        }
+
+    report = {
+        "benchmark": "charset",
+        **git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "params": {"emails": args.emails, "seed": args.seed},
+        "before": summarize(old_scores),
+        "after": summarize(new_scores),
+        "decode_us_per_email": {
+            "before": old_elapsed / len(corpus) * 1e6,
+            "after": new_elapsed / len(corpus) * 1e6,
+        },
+        "by_style": by_style,
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+
+if __name__ == "__main__":
+    main()
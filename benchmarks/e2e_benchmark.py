@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark for Jane.ai
+
+Drives JaneAIApplication against an in-process IMAP server, SMTP sink and
+OpenAI-compatible endpoint, then reports throughput, end-to-end latency
+percentiles and peak RSS as JSON tagged with the git commit.
+
+Usage:
+    python benchmarks/e2e_benchmark.py [--emails 200] [--rate 0] [--workers 4]
+        [--model-latency 0.2] [--error-rate 0.0] [--output result.json]
+
+--rate 0 delivers every mail at once; otherwise mails arrive at that many per second.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+from harness import OfflineHarness, build_message, git_revision, latency_summary, peak_rss_mb
+
+QUESTIONS = [
+    ("도서관 이용 시간 문의", "안녕하세요. 방학 중 도서관 이용 시간이 어떻게 되는지 알려주실 수 있나요?"),
+    ("Question about course registration", "Hello, when does the course registration period for the spring semester start?"),
+    ("출장기안문 작성 요청", "다음 주 세종 출장 관련 출장기안문 초안 작성을 부탁드립니다."),
+    ("감사 인사", "지난번 안내 감사했습니다. 좋은 하루 보내세요."),
+    ("Translation request", "Could you translate the attached notice summary into Korean? The workshop is on Friday."),
+    ("주차 등록 문의", "교내 주차 등록은 어디에서 신청하나요?"),
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Jane.ai offline end-to-end benchmark")
+    parser.add_argument('--emails', type=int, default=200)
+    parser.add_argument('--rate', type=float, default=0.0, help="arrivals per second (0: all at once)")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--check-interval', type=float, default=0.2)
+    parser.add_argument('--model-latency', type=float, default=0.2, help="seconds per model request")
+    parser.add_argument('--model-jitter', type=float, default=0.2, help="relative latency jitter (0-1)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of model requests that fail")
+    parser.add_argument('--timeout', type=float, default=600.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cold', action='store_true', help="include agent initialization in the first mail")
+    parser.add_argument('--output', help="also write the JSON report to this file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    with OfflineHarness(workers=args.workers, check_interval=args.check_interval,
+                        model_latency=args.model_latency, model_jitter=args.model_jitter,
+                        error_rate=args.error_rate, seed=args.seed, warm=not args.cold) as harness:
+        started = time.perf_counter()
+        for index in range(args.emails):
+            subject, body = QUESTIONS[index % len(QUESTIONS)]
+            harness.send(build_message(f"{subject} #{index + 1}", body, sender=f"staff{index % 25}@kdis.ac.kr"))
+            if args.rate > 0:
+                time.sleep(max(0.0, started + (index + 1) / args.rate - time.perf_counter()))
+
+        completed = harness.wait_for_replies(args.emails, args.timeout)
+        latencies = harness.latencies()
+        last_reply = max(harness.replied_at.values(), default=started)
+        elapsed = last_reply - started
+
+        model = harness.model
+        report = {
+            "benchmark": "e2e",
+            **git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "params": {
+                "emails": args.emails,
+                "rate": args.rate,
+                "workers": args.workers,
+                "check_interval": args.check_interval,
+                "model_latency": args.model_latency,
+                "model_jitter": args.model_jitter,
+                "error_rate": args.error_rate,
+                "seed": args.seed,
+            },
+            "completed": len(latencies),
+            "timed_out": not completed,
+            "fallback_replies": harness.fallback_replies(),
+            "emails_per_s": len(latencies) / elapsed if elapsed > 0 else None,
+            "latency_ms": latency_summary(list(latencies.values())),
+            "model_requests": dict(model.requests),
+            "model_errors_injected": model.errors,
+            "imap_commands": dict(harness.imap.command_counts),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    if report["timed_out"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
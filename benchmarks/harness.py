@@ -0,0 +1,272 @@
+"""
+Offline harness that runs JaneAIApplication against the fake IMAP, SMTP and model servers
+
+Each injected mail gets a unique Message-ID; the reply's In-Reply-To ties it back
+to the injection time, so end-to-end latency covers IMAP polling, parsing, the
+agent run and SMTP delivery.
+"""
+from email.message import EmailMessage, Message
+from email.utils import formatdate
+from typing import Dict, List, Optional
+import itertools
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path[:0] = [path for path in (ROOT, os.path.join(ROOT, 'src')) if path not in sys.path]
+
+from fake_servers import FakeImapServer, FakeOpenAIServer, FakeSmtpSink
+
+FALLBACK_MARKER = "일시적인 시스템 오류"
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (pct in 0-100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def latency_summary(seconds: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/mean/max in milliseconds"""
+    as_ms = [value * 1000 for value in seconds]
+    return {
+        "p50": percentile(as_ms, 50),
+        "p95": percentile(as_ms, 95),
+        "p99": percentile(as_ms, 99),
+        "mean": sum(as_ms) / len(as_ms) if as_ms else None,
+        "max": max(as_ms) if as_ms else None,
+    }
+
+def git_revision() -> Dict[str, object]:
+    """Commit of the tree under test, so results can be compared across commits"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def build_message(subject: str, body: str, sender: str = "staff@kdis.ac.kr",
+                  to: str = "jane@bench.local") -> EmailMessage:
+    """Plain-text mail as a KDI staff member would send it"""
+    message = EmailMessage()
+    message['From'] = sender
+    message['To'] = to
+    message['Subject'] = subject
+    message['Date'] = formatdate(localtime=True)
+    message.set_content(body)
+    return message
+
+class OfflineHarness:
+    """Starts the fakes, points the app at them through env vars and runs it on a background thread"""
+
+    def __init__(self, workers: int = 4, check_interval: float = 0.2, model_latency: float = 0.2,
+                 model_jitter: float = 0.2, error_rate: float = 0.0, seed: int = 0, warm: bool = True,
+                 extra_env: Optional[Dict[str, str]] = None):
+        self.workers = workers
+        self.check_interval = check_interval
+        self.warm = warm
+        self.extra_env = extra_env or {}
+
+        self.imap = FakeImapServer()
+        self.smtp = FakeSmtpSink(on_message=self._on_reply)
+        self.model = FakeOpenAIServer(latency=model_latency, jitter=model_jitter, error_rate=error_rate, seed=seed)
+
+        self.app = None
+        self.sent_at: Dict[str, float] = {}
+        self.replied_at: Dict[str, float] = {}
+        self.replies: Dict[str, Message] = {}
+        self.stage_timings: Dict[str, List[float]] = {}
+        self._prepared_at: Dict[str, float] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._tmpdir: Optional[tempfile.TemporaryDirectory] = None
+        self._saved_env: Dict[str, Optional[str]] = {}
+
+    def __enter__(self) -> 'OfflineHarness':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _environment(self) -> Dict[str, str]:
+        env = {
+            'JANE_EMAIL_ADDRESS': self.imap.username,
+            'JANE_EMAIL_PASSWORD': self.imap.password,
+            'JANE_IMAP_SERVER': self.imap.host,
+            'JANE_IMAP_PORT': str(self.imap.port),
+            'JANE_IMAP_SSL': 'false',
+            'JANE_SMTP_SERVER': self.smtp.host,
+            'JANE_SMTP_PORT': str(self.smtp.port),
+            'JANE_SMTP_STARTTLS': 'false',
+            'OPENAI_API_KEY': 'benchmark',
+            'JANE_AI_BASE_URL': self.model.base_url,
+            'JANE_AI_TRACING': 'false',
+            'JANE_CHECK_INTERVAL': str(self.check_interval),
+            'JANE_MAX_CONCURRENT_EMAILS': str(self.workers),
+            'JANE_BROWSER_PREWARM': 'false',
+            'JANE_PORTAL_COOKIE_PATH': '',
+            'JANE_VACATION_LEDGER_PATH': os.path.join(self._tmpdir.name, 'vacation_ledger.db'),
+            'JANE_TRACE_PATH': os.path.join(self._tmpdir.name, 'traces.jsonl'),
+            'JANE_USAGE_PATH': os.path.join(self._tmpdir.name, 'usage.db'),
+            'JANE_CONVERSATION_PATH': os.path.join(self._tmpdir.name, 'conversations.db'),
+            'JANE_CONVERSATION_JSON': '',
+        }
+        env.update(self.extra_env)
+        return env
+
+    def start(self):
+        """Start the fakes and the application; returns once the first IMAP poll has completed"""
+        self.imap.start()
+        self.smtp.start()
+        self.model.start()
+        self._tmpdir = tempfile.TemporaryDirectory(prefix="jane-bench-")
+
+        # 첫 폴링은 현재 최신 UID만 기록하므로 기존 메일 하나를 넣어 둠
+        self.imap.append(build_message("seed", "seed").as_bytes())
+
+        for name, value in self._environment().items():
+            self._saved_env[name] = os.environ.get(name)
+            os.environ[name] = value
+
+        from config.config import load_config
+        from jane_ai.core.application import JaneAIApplication
+
+        self.app = JaneAIApplication(load_config())
+        if self.warm:
+            # 에이전트 시스템 import 비용은 측정에서 제외
+            self.app.ai_service.jane_agents
+        self._instrument_stages()
+
+        self._thread = threading.Thread(target=self.app.start, name="jane-app", daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + 30
+        while self.app.email_monitor.last_seen_uid is None:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("application did not start polling the fake IMAP server")
+            time.sleep(0.01)
+
+    def stop(self):
+        """Stop the application (waiting for in-flight replies) and the fakes"""
+        if self.app is not None:
+            self.app.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=60)
+        for server in (self.imap, self.smtp, self.model):
+            server.stop()
+        for name, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+
+    def _instrument_stages(self):
+        """Wrap the pipeline stages of the app instance to record per-stage durations"""
+        app = self.app
+        monitor = app.email_monitor
+        monitor.get_latest_emails = self._timed('poll', monitor.get_latest_emails)
+        monitor.flush_flags = self._timed('flag_flush', monitor.flush_flags)
+        app.ai_service.generate_response = self._timed('generate', app.ai_service.generate_response)
+        app.email_sender.send_reply = self._timed('send', app.email_sender.send_reply)
+
+        prepare = self._timed('prepare', monitor.create_processing_context)
+        def create_processing_context(email_info):
+            context = prepare(email_info)
+            with self._lock:
+                self._prepared_at[email_info.uid] = time.perf_counter()
+            return context
+        monitor.create_processing_context = create_processing_context
+
+        # _process_single_email looks up self._respond at call time, so an instance attribute wins
+        respond = app._respond
+        def timed_respond(context):
+            with self._lock:
+                prepared_at = self._prepared_at.pop(context.email_info.uid, None)
+            if prepared_at is not None:
+                self._record_stage('queue_wait', time.perf_counter() - prepared_at)
+            return respond(context)
+        app._respond = timed_respond
+
+    def _timed(self, stage: str, func):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._record_stage(stage, time.perf_counter() - started)
+        return wrapper
+
+    def _record_stage(self, stage: str, seconds: float):
+        with self._lock:
+            self.stage_timings.setdefault(stage, []).append(seconds)
+
+    def stage_summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Per-stage count and latency percentiles (ms)"""
+        with self._lock:
+            timings = {stage: list(values) for stage, values in self.stage_timings.items()}
+        return {stage: {"count": len(values), **latency_summary(values)} for stage, values in timings.items()}
+
+    def send(self, message: Message) -> str:
+        """Deliver a mail to the watched mailbox; returns its Message-ID"""
+        message_id = message.get('Message-ID')
+        if not message_id:
+            message_id = f"<bench-{next(self._ids)}@bench.local>"
+            message['Message-ID'] = message_id
+        raw = message.as_bytes()
+        with self._lock:
+            self.sent_at[message_id] = time.perf_counter()
+        self.imap.append(raw)
+        return message_id
+
+    def _on_reply(self, received_at: float, reply: Message):
+        message_id = reply.get('In-Reply-To')
+        with self._lock:
+            if message_id in self.sent_at and message_id not in self.replied_at:
+                self.replied_at[message_id] = received_at
+                self.replies[message_id] = reply
+
+    def wait_for_replies(self, count: int, timeout: float) -> bool:
+        """Block until count mails sent through send() have been answered"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if len(self.replied_at) >= count:
+                    return True
+            time.sleep(0.02)
+        return False
+
+    def latencies(self) -> Dict[str, float]:
+        """End-to-end seconds from injection to reply delivery, per Message-ID"""
+        with self._lock:
+            return {mid: self.replied_at[mid] - self.sent_at[mid] for mid in self.replied_at}
+
+    def fallback_replies(self) -> int:
+        """Replies that carry the generic error text instead of a model answer"""
+        count = 0
+        with self._lock:
+            replies = list(self.replies.values())
+        for reply in replies:
+            for part in reply.walk():
+                if part.get_content_maintype() == 'text':
+                    payload = part.get_payload(decode=True) or b''
+                    if FALLBACK_MARKER in payload.decode(part.get_content_charset() or 'utf-8', errors='replace'):
+                        count += 1
+                        break
+        return count
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Synthetic mail load generator for the Jane.ai processing pipeline
+
+Generates a realistic mix of mails (Korean and English questions, vacation
+requests, long quoted threads, HTML-only mails, large attachments and
+auto-replies) and delivers them into the fake mailbox watched by EmailMonitor
+with a Poisson, burst or ramp arrival profile. Vacation requests are submitted
+through the HTTP backend to the local stub portal.
+
+Reports throughput, end-to-end latency per mail category and latency per
+pipeline stage (poll, mark_read, prepare, queue_wait, generate, send) as JSON.
+
+Usage:
+    python benchmarks/load_generator.py [--emails 300] [--profile poisson|burst|ramp]
+        [--rate 5] [--burst-size 20] [--burst-every 5]
+        [--mix korean=4,english=2,vacation=1,thread=1,html=1,attachment=1,autoreply=1]
+        [--attachment-kb 2048] [--workers 4] [--model-latency 0.3] [--output report.json]
+"""
+from datetime import date, timedelta
+from email.message import EmailMessage
+from email.utils import formatdate
+from typing import Dict, List, Tuple
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from harness import ROOT, OfflineHarness, git_revision, latency_summary, peak_rss_mb
+
+sys.path.insert(0, os.path.join(ROOT, 'portal_test'))
+from stub_portal import StubPortal
+
+KOREAN_QUESTIONS = [
+    ("도서관 이용 시간 문의", "안녕하세요. 방학 중 도서관 이용 시간이 어떻게 되는지 알려주실 수 있나요?"),
+    ("주차 등록 문의", "교내 주차 등록은 어디에서 신청하나요? 필요한 서류도 알려주세요."),
+    ("출장기안문 작성 요청", "다음 주 세종 출장 관련 출장기안문 초안 작성을 부탁드립니다. 일정은 화요일부터 수요일까지입니다."),
+    ("재직증명서 발급", "재직증명서를 영문으로 발급받으려면 어떤 절차가 필요한가요?"),
+    ("회의실 예약 문의", "금요일 오후 3시에 10명이 사용할 회의실을 예약할 수 있을까요?"),
+]
+
+ENGLISH_QUESTIONS = [
+    ("Course registration", "Hello, when does the course registration period for the spring semester start?"),
+    ("Visa letter", "Could you tell me how to request an invitation letter for a visa application?"),
+    ("Translation request", "Please translate the following notice into Korean: The workshop has been moved to Friday 2 PM."),
+    ("Dormitory question", "Is the dormitory open during the winter break, and how do I apply for an extension?"),
+]
+
+AUTO_REPLY_SUBJECTS = ["자동 응답: 부재중입니다", "Out of Office: Re: 회의 일정", "Automatic reply: Conference"]
+
+def business_days(start: date, count: int, rng: random.Random) -> List[date]:
+    """Random weekdays after start (holidays are left to the app's validation)"""
+    days = []
+    current = start
+    while len(days) < count:
+        current += timedelta(days=rng.randint(1, 3))
+        if current.weekday() < 5:
+            days.append(current)
+    return days
+
+class MailFactory:
+    """Builds one mail per category; seeded so runs are reproducible"""
+
+    def __init__(self, seed: int, attachment_kb: int, to: str):
+        self.rng = random.Random(seed)
+        self.attachment_kb = attachment_kb
+        self.to = to
+        self.counter = 0
+        self.vacation_days = iter(business_days(date(2027, 3, 1), 10000, self.rng))
+
+    def _base(self, subject: str, sender: str) -> EmailMessage:
+        self.counter += 1
+        message = EmailMessage()
+        message['From'] = sender
+        message['To'] = self.to
+        message['Subject'] = f"{subject} #{self.counter}"
+        message['Date'] = formatdate(localtime=True)
+        return message
+
+    def _sender(self, domain: str = "kdis.ac.kr") -> str:
+        return f"staff{self.rng.randint(1, 60)}@{domain}"
+
+    def korean(self) -> EmailMessage:
+        subject, body = self.rng.choice(KOREAN_QUESTIONS)
+        message = self._base(subject, self._sender())
+        message.set_content(f"{body}\n\n감사합니다.\n홍길동 드림\n행정팀 | 044-550-0000")
+        return message
+
+    def english(self) -> EmailMessage:
+        subject, body = self.rng.choice(ENGLISH_QUESTIONS)
+        message = self._base(subject, self._sender("gmail.com"))
+        message.set_content(f"Hi Jane,\n\n{body}\n\nBest regards,\nAlex")
+        return message
+
+    def vacation(self) -> EmailMessage:
+        start = next(self.vacation_days)
+        end = start if self.rng.random() < 0.6 else start + timedelta(days=1 if start.weekday() < 4 else 0)
+        kind = self.rng.choice(["연차", "병가"])
+        message = self._base("휴가 신청", self._sender())
+        message.set_content(
+            f"{start.year}년 {start.month}월 {start.day}일부터 {end.year}년 {end.month}월 {end.day}일까지 "
+            f"{kind} 휴가 신청합니다. 사유: 개인 사유"
+        )
+        return message
+
+    def thread(self) -> EmailMessage:
+        depth = self.rng.randint(5, 15)
+        message = self._base("Re: 학술대회 일정 조율", self._sender())
+        parts = ["지난 메일에 이어 말씀드립니다. 최종 일정으로 확정해도 될까요?"]
+        for level in range(depth):
+            parts.append(
+                f"\n\n-----Original Message-----\nFrom: staff{level}@kdis.ac.kr\n"
+                f"Sent: 2027-01-{level + 1:02d}\nSubject: Re: 학술대회 일정 조율\n\n"
+                + "\n".join(f"> 일정 관련 의견 {level}-{line}: 오전 세션은 10시에 시작하는 것으로 합니다." for line in range(8))
+            )
+        message.set_content(''.join(parts))
+        return message
+
+    def html(self) -> EmailMessage:
+        message = self._base("세미나 참석 확인", self._sender())
+        rows = ''.join(f"<tr><td>세션 {n}</td><td>{9 + n}:00</td></tr>" for n in range(12))
+        message.set_content(
+            "<html><body><p>안녕하세요,</p><p>다음 세미나 <b>참석 가능 여부</b>를 알려주실 수 있나요?</p>"
+            f"<table>{rows}</table><p>감사합니다.</p></body></html>",
+            subtype='html'
+        )
+        return message
+
+    def attachment(self) -> EmailMessage:
+        message = self._base("첨부 문서 검토 요청", self._sender())
+        message.set_content("첨부한 보고서 초안을 검토하고 요약해 주실 수 있나요?")
+        size = max(1, int(self.attachment_kb * self.rng.uniform(0.5, 1.5))) * 1024
+        message.add_attachment(self.rng.randbytes(size), maintype='application', subtype='pdf',
+                               filename=f"report_{self.counter}.pdf")
+        return message
+
+    def autoreply(self) -> EmailMessage:
+        message = self._base(self.rng.choice(AUTO_REPLY_SUBJECTS), self._sender())
+        message['Auto-Submitted'] = 'auto-replied'
+        message['X-Autoreply'] = 'yes'
+        message.set_content("현재 부재중입니다. 복귀 후 확인하겠습니다.\nI am out of the office until Monday.")
+        return message
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        mix.append((name.strip(), float(weight or 1)))
+    return mix
+
+def arrival_offsets(profile: str, count: int, rate: float, burst_size: int, burst_every: float,
+                    rng: random.Random) -> List[float]:
+    """Seconds from the start of the run at which each mail arrives"""
+    if profile == 'burst':
+        return [(index // burst_size) * burst_every for index in range(count)]
+    if profile == 'ramp':
+        # 도착률이 0에서 rate까지 선형 증가 (평균 rate/2)
+        duration = 2 * count / rate
+        return [duration * ((index + 1) / count) ** 0.5 for index in range(count)]
+    offsets, current = [], 0.0
+    for _ in range(count):
+        current += rng.expovariate(rate)
+        offsets.append(current)
+    return offsets
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Jane.ai synthetic mail load generator")
+    parser.add_argument('--emails', type=int, default=300)
+    parser.add_argument('--profile', choices=['poisson', 'burst', 'ramp'], default='poisson')
+    parser.add_argument('--rate', type=float, default=5.0, help="mean arrivals per second (poisson, ramp peak)")
+    parser.add_argument('--burst-size', type=int, default=20)
+    parser.add_argument('--burst-every', type=float, default=5.0, help="seconds between bursts")
+    parser.add_argument('--mix', default="korean=4,english=2,vacation=1,thread=1,html=1,attachment=1,autoreply=1")
+    parser.add_argument('--attachment-kb', type=int, default=2048)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--check-interval', type=float, default=0.5)
+    parser.add_argument('--model-latency', type=float, default=0.3)
+    parser.add_argument('--model-jitter', type=float, default=0.3)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--timeout', type=float, default=900.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="also write the JSON report to this file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    categories = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    offsets = arrival_offsets(args.profile, args.emails, args.rate, args.burst_size, args.burst_every, rng)
+
+    portal = StubPortal().start()
+    portal_env = {
+        'JANE_PORTAL_BACKEND': 'http',
+        'JANE_PORTAL_URL': portal.base_url,
+        'JANE_PORTAL_FORM_URL': '/approval/vacation/form',
+        'JANE_PORTAL_USERNAME': portal.username,
+        'JANE_PORTAL_PASSWORD': portal.password,
+    }
+
+    category_of: Dict[str, str] = {}
+    try:
+        with OfflineHarness(workers=args.workers, check_interval=args.check_interval,
+                            model_latency=args.model_latency, model_jitter=args.model_jitter,
+                            error_rate=args.error_rate, seed=args.seed, extra_env=portal_env) as harness:
+            factory = MailFactory(args.seed, args.attachment_kb, harness.imap.username)
+            started = time.perf_counter()
+            for offset in offsets:
+                time.sleep(max(0.0, started + offset - time.perf_counter()))
+                category = rng.choices(categories, weights)[0]
+                message_id = harness.send(getattr(factory, category)())
+                category_of[message_id] = category
+            injected = time.perf_counter() - started
+
+            completed = harness.wait_for_replies(args.emails, args.timeout)
+            latencies = harness.latencies()
+            last_reply = max(harness.replied_at.values(), default=started)
+            elapsed = last_reply - started
+
+            per_category: Dict[str, Dict] = {}
+            for category in categories:
+                sent = [mid for mid, cat in category_of.items() if cat == category]
+                values = [latencies[mid] for mid in sent if mid in latencies]
+                per_category[category] = {"sent": len(sent), "replied": len(values), **latency_summary(values)}
+
+            report = {
+                "benchmark": "load",
+                **git_revision(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "params": {key: value for key, value in vars(args).items() if key != 'output'},
+                "offered_rate": args.emails / injected if injected > 0 else None,
+                "completed": len(latencies),
+                "timed_out": not completed,
+                "fallback_replies": harness.fallback_replies(),
+                "emails_per_s": len(latencies) / elapsed if elapsed > 0 else None,
+                "end_to_end_ms": latency_summary(list(latencies.values())),
+                "by_category": per_category,
+                "stages_ms": harness.stage_summary(),
+                "model_requests": dict(harness.model.requests),
+                "model_errors_injected": harness.model.errors,
+                "portal_submissions": len(portal.submissions),
+                "peak_rss_mb": peak_rss_mb(),
+            }
+    finally:
+        portal.stop()
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    if report["timed_out"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
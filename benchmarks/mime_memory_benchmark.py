@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+MIME parsing memory benchmark
+
+Parses a batch of messages with large attachments and keeps every parsed
+message alive at once, as the in-flight ProcessingContexts do while replies
+are generated. Each parser runs in a fresh interpreter so its peak RSS is
+measured on its own:
+
+- before: email.message_from_bytes, the whole tree kept
+- after: mime_stream.parse_message, text bodies kept, attachments spooled
+  (spilled to temp files above the threshold)
+
+Usage:
+    python benchmarks/mime_memory_benchmark.py [--emails 8] [--attachment-mb 4] [--output report.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path[:0] = [path for path in (ROOT, os.path.join(ROOT, 'src')) if path not in sys.path]
+
+from harness import build_message, git_revision
+
+CHILD = r'''
+import email, json, os, resource, sys, time
+sys.path[:0] = [{root!r}, {src!r}]
+from jane_ai.utils.email_utils import extract_email_body
+from jane_ai.utils.mime_stream import parse_message, release_payloads
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+paths = {paths!r}
+baseline = rss_mb()
+held = []
+started = time.perf_counter()
+for path in paths:
+    with open(path, 'rb') as f:
+        raw = f.read()
+    message = email.message_from_bytes(raw) if {mode!r} == "before" else parse_message(raw)
+    del raw
+    extract_email_body(message)
+    held.append(message)
+elapsed = time.perf_counter() - started
+report = {{
+    "parse_ms_per_email": elapsed / len(paths) * 1000,
+    "baseline_rss_mb": baseline,
+    "held_rss_mb": rss_mb(),
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}
+for message in held:
+    if {mode!r} == "after":
+        release_payloads(message)
+print(json.dumps(report))
+'''
+
+def write_corpus(directory: str, emails: int, attachment_mb: float):
+    paths = []
+    for index in range(emails):
+        message = build_message(f"첨부 문서 번역 요청 {index}", "첨부한 보고서를 영어로 번역해 주세요.\n감사합니다.")
+        message.add_attachment(os.urandom(int(attachment_mb * 1024 * 1024)), maintype='application',
+                               subtype='pdf', filename=f"report-{index}.pdf")
+        message.add_attachment("회의록 요약\n".encode('utf-8') * 2000, maintype='text', subtype='plain',
+                               filename=f"minutes-{index}.txt")
+        path = os.path.join(directory, f"{index}.eml")
+        with open(path, 'wb') as f:
+            f.write(message.as_bytes())
+        paths.append(path)
+    return paths
+
+def run_child(mode: str, paths):
+    code = CHILD.format(root=ROOT, src=os.path.join(ROOT, 'src'), paths=paths, mode=mode)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Jane.ai MIME parsing memory benchmark")
+    parser.add_argument('--emails', type=int, default=8, help="messages held in memory at once")
+    parser.add_argument('--attachment-mb', type=float, default=4.0)
+    parser.add_argument('--output', help="also write the JSON report to this file")
+    return parser.parse_args()
+
+def main():
+    import tempfile
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="jane-mime-bench-") as directory:
+        paths = write_corpus(directory, args.emails, args.attachment_mb)
+        raw_mb = sum(os.path.getsize(path) for path in paths) / (1024 * 1024)
+        results = {mode: run_child(mode, paths) for mode in ("before", "after")}
+
+    report = {
+        "benchmark": "mime_memory",
+        **git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "params": {"emails": args.emails, "attachment_mb": args.attachment_mb},
+        "raw_mb": raw_mb,
+        **{mode: {
+            "parse_ms_per_email": result["parse_ms_per_email"],
+            "held_mb": result["held_rss_mb"] - result["baseline_rss_mb"],
+            "peak_mb": result["peak_rss_mb"] - result["baseline_rss_mb"],
+        } for mode, result in results.items()},
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Quoted-reply and signature stripping benchmark
+
+Builds a seeded corpus of replies in the styles of the common mail clients
+(Outlook, new Outlook, Gmail in English and Korean, '>' quoting, mobile
+footers, contact signatures and legal disclaimers) and compares the current
+message sent to the model by the previous Outlook-only splitter with the
+current separate_current_message_from_thread. Every email must keep its
+request in the current message and lose no line (whatever is stripped goes to
+the thread history); the run exits with status 1 otherwise.
+
+Tokens are counted with tiktoken (o200k_base) when it is installed; otherwise
+they are estimated (one token per non-ASCII character, four ASCII characters
+per token).
+
+Usage:
+    python benchmarks/quote_strip_benchmark.py [--emails 2000] [--seed 0] [--output report.json]
+"""
+from typing import Callable, Dict, List, Tuple
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path[:0] = [path for path in (ROOT, os.path.join(ROOT, 'src')) if path not in sys.path]
+
+from harness import git_revision
+from jane_ai.utils.email_utils import separate_current_message_from_thread
+
+REQUESTS = [
+    "다음 주 화요일 회의실 예약 가능 여부를 확인 부탁드립니다.",
+    "첨부한 출장 일정으로 출장기안문 초안을 작성해 주실 수 있을까요?",
+    "재직증명서 영문 발급 절차를 안내해 주세요.",
+    "Could you confirm the deadline for the course evaluation?",
+    "Please let me know if the workshop room has a projector.",
+    "네, 말씀하신 일정으로 진행하겠습니다. 감사합니다.",
+]
+
+PREVIOUS = [
+    "지난 회의에서 논의한 내용을 정리하여 공유드립니다. 예산 항목은 다음 주까지 확정하기로 했습니다.",
+    "요청하신 자료를 첨부합니다. 추가로 필요한 사항이 있으면 말씀해 주세요.",
+    "The schedule for the fall semester orientation has been updated. Please review the attached agenda.",
+    "세미나 참석자 명단과 좌석 배치안을 보내드립니다. 변경 사항은 금요일까지 알려주시기 바랍니다.",
+]
+
+SIGNATURES = [
+    "홍길동 드림\n행정팀 | Tel 044-550-0000\nEmail hong@kdis.ac.kr\nwww.kdis.ac.kr",
+    "Best regards,\nAlex Kim\nProgram Officer | KDI School\nTel +82-44-550-1234 | Mobile +82-10-1234-5678\nalex@kdis.ac.kr",
+    "--\n김철수 / 전산2팀 전문원\n전화 044-550-0101 팩스 044-550-0199\nkim@kdis.ac.kr",
+    "감사합니다.\n이영희",
+]
+
+DISCLAIMERS = [
+    "CONFIDENTIALITY NOTICE: This e-mail and any attachments are confidential and intended solely for the "
+    "addressee. If you have received this message in error, please notify the sender and delete it. Any "
+    "unauthorized review, use, disclosure or distribution is prohibited.",
+    "본 메일은 기밀 정보를 포함하고 있으며 지정된 수신인 외에는 열람, 복사, 배포가 금지되어 있습니다. "
+    "잘못 수신하신 경우 발신자에게 알려주시고 즉시 삭제해 주시기 바랍니다.",
+]
+
+MOBILE_FOOTERS = ["Sent from my iPhone", "Galaxy에서 보냄", "Get Outlook for iOS"]
+
+# 인용/서명처럼 보이지만 전체가 현재 메시지인 본문
+LOOKALIKES = [
+    "휴가 신청합니다.\nFrom: 2026-11-03\nTo: 2026-11-05\n사유: 가족 행사",
+    "This message is intended for the HR team: please file my leave 11/3",
+    "안녕하세요.\n--\n11월 3일부터 5일까지 휴가 신청합니다.\n사유: 가족 행사",
+    "다음 항목 부탁드립니다.\n1. 보고서 작성:\n- 예산 요약\n2. 회의록 정리",
+    "숫자 확인했습니다.\n--\nThe numbers above are final.",
+]
+
+def old_separate(body: str) -> Tuple[str, str]:
+    """The previous splitter: only the Outlook '-----Original Message-----' marker"""
+    marker = '-----Original Message-----'
+    if re.search(marker, body):
+        parts = re.split(marker, body, 1)
+        return parts[0].strip(), f"{marker}{parts[1]}".strip()
+    return body.strip(), ""
+
+def token_counter() -> Tuple[str, Callable[[str], int]]:
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("o200k_base")
+        return "tiktoken:o200k_base", lambda text: len(encoding.encode(text))
+    except ImportError:
+        def estimate(text: str) -> int:
+            non_ascii = sum(1 for char in text if ord(char) > 127)
+            return non_ascii + (len(text) - non_ascii + 3) // 4
+        return "estimate", estimate
+
+class CorpusBuilder:
+    """One reply per client style with a random depth of quoted history"""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.expected = ""
+
+    def _history(self, quoted: bool = False) -> str:
+        paragraphs = self.rng.sample(PREVIOUS, k=self.rng.randint(1, len(PREVIOUS)))
+        text = "\n\n".join(paragraphs + [self.rng.choice(SIGNATURES)])
+        if quoted:
+            text = "\n".join(f"> {line}" if line else ">" for line in text.split("\n"))
+        return text
+
+    def _reply(self) -> str:
+        self.expected = self.rng.choice(REQUESTS)
+        parts = [self.expected, self.rng.choice(SIGNATURES)]
+        if self.rng.random() < 0.3:
+            parts.append(self.rng.choice(MOBILE_FOOTERS))
+        if self.rng.random() < 0.3:
+            parts.append(self.rng.choice(DISCLAIMERS))
+        return "\n\n".join(parts)
+
+    def outlook(self) -> str:
+        return (f"{self._reply()}\n\n-----Original Message-----\nFrom: staff@kdis.ac.kr\n"
+                f"Sent: Wednesday, August 27, 2025 3:00 PM\nTo: jane.ai@kdis.ac.kr\nSubject: 회의 일정\n\n{self._history()}")
+
+    def new_outlook(self) -> str:
+        return (f"{self._reply()}\n\n________________________________\n보낸 사람: 김철수 <kim@kdis.ac.kr>\n"
+                f"보낸 날짜: 2025년 8월 27일 수요일 오후 3:00\n받는 사람: Jane.ai <jane.ai@kdis.ac.kr>\n"
+                f"제목: RE: 회의 일정\n\n{self._history()}")
+
+    def gmail(self) -> str:
+        return (f"{self._reply()}\n\nOn Wed, Aug 27, 2025 at 3:00 PM Alex Kim <\nalex@kdis.ac.kr> wrote:\n\n"
+                f"{self._history(quoted=True)}")
+
+    def gmail_korean(self) -> str:
+        return (f"{self._reply()}\n\n2025년 8월 27일 (수) 오후 3:00, 홍길동 <hong@kdis.ac.kr>님이 작성:\n\n"
+                f"{self._history(quoted=True)}")
+
+    def quoted(self) -> str:
+        return f"{self._reply()}\n\n{self._history(quoted=True)}"
+
+    def fresh(self) -> str:
+        return self._reply()
+
+    def lookalike(self) -> str:
+        self.expected = self.rng.choice(LOOKALIKES)
+        return self.expected
+
+    def build(self, count: int) -> List[Tuple[str, str, str]]:
+        styles = ['outlook', 'new_outlook', 'gmail', 'gmail_korean', 'quoted', 'fresh', 'lookalike']
+        corpus = []
+        for _ in range(count):
+            style = self.rng.choice(styles)
+            body = getattr(self, style)()
+            corpus.append((style, body, self.expected))
+        return corpus
+
+def run(splitter: Callable[[str], Tuple[str, str]], corpus: List[Tuple[str, str, str]],
+        count_tokens: Callable[[str], int]) -> Tuple[Dict[str, List[int]], float, List[Tuple[str, str]]]:
+    started = time.perf_counter()
+    splits = [splitter(body) for _, body, _ in corpus]
+    elapsed = time.perf_counter() - started
+    tokens: Dict[str, List[int]] = {}
+    failures = []
+    for (style, body, expected), (current, history) in zip(corpus, splits):
+        tokens.setdefault(style, []).append(count_tokens(current))
+        kept = set(current.split('\n')) | set(history.split('\n'))
+        if expected not in current:
+            failures.append((style, "요청 문장이 현재 메시지에 없음"))
+        elif any(line.strip() and line not in kept for line in body.split('\n')):
+            failures.append((style, "잘라낸 줄이 스레드 히스토리에 없음"))
+    return tokens, elapsed, failures
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Jane.ai quote and signature stripping benchmark")
+    parser.add_argument('--emails', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="also write the JSON report to this file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    corpus = CorpusBuilder(args.seed).build(args.emails)
+    tokenizer, count_tokens = token_counter()
+
+    old_tokens, old_elapsed, _ = run(old_separate, corpus, count_tokens)
+    new_tokens, new_elapsed, failures = run(separate_current_message_from_thread, corpus, count_tokens)
+
+    by_style = {}
+    for style in sorted(old_tokens):
+        before, after = old_tokens[style], new_tokens[style]
+        by_style[style] = {
+            "emails": len(before),
+            "tokens_before": sum(before) / len(before),
+            "tokens_after": sum(after) / len(after),
+            "saved_per_email": (sum(before) - sum(after)) / len(before),
+        }
+    total_before = sum(sum(values) for values in old_tokens.values())
+    total_after = sum(sum(values) for values in new_tokens.values())
+
+    report = {
+        "benchmark": "quote_strip",
+        **git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "params": {"emails": args.emails, "seed": args.seed},
+        "tokenizer": tokenizer,
+        "prompt_tokens_per_email": {
+            "before": total_before / len(corpus),
+            "after": total_after / len(corpus),
+            "saved": (total_before - total_after) / len(corpus),
+            "saved_pct": 100 * (total_before - total_after) / total_before if total_before else 0.0,
+        },
+        "split_us_per_email": {
+            "before": old_elapsed / len(corpus) * 1e6,
+            "after": new_elapsed / len(corpus) * 1e6,
+        },
+        "by_style": by_style,
+        "failures": len(failures),
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    for style, reason in failures[:10]:
+        print(f"FAIL {style}: {reason}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
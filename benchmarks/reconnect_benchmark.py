@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+IMAP recovery benchmark
+
+Runs the app against the offline harness, then repeatedly drops every IMAP
+session (optionally refusing new ones for --outage seconds) and delivers a
+mail right after each blip. Reports, per blip, the time until the app had a
+new session and until that mail was answered, next to the reply latency
+without a blip, and checks that no mail was lost or answered twice.
+
+Usage:
+    python benchmarks/reconnect_benchmark.py [--blips 5] [--outage 0] [--output report.json]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+from harness import OfflineHarness, build_message, git_revision, latency_summary
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Jane.ai IMAP reconnect benchmark")
+    parser.add_argument('--blips', type=int, default=5)
+    parser.add_argument('--baseline', type=int, default=5, help="mails answered without a blip first")
+    parser.add_argument('--outage', type=float, default=0.0, help="seconds the server refuses connections")
+    parser.add_argument('--check-interval', type=float, default=0.2)
+    parser.add_argument('--model-latency', type=float, default=0.05)
+    parser.add_argument('--reconnect-delay', type=float, default=0.2, help="JANE_IMAP_RECONNECT_DELAY")
+    parser.add_argument('--timeout', type=float, default=60.0, help="seconds to wait for each reply")
+    parser.add_argument('--output', help="also write the JSON report to this file")
+    return parser.parse_args()
+
+def wait_for_session(harness: OfflineHarness, connections: int, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if harness.imap.connections > connections and harness.app.email_monitor.connected:
+            return True
+        time.sleep(0.005)
+    return False
+
+def main():
+    args = parse_args()
+    extra_env = {'JANE_IMAP_RECONNECT_DELAY': str(args.reconnect_delay)}
+    reconnect_s, recovery_s, baseline_s = [], [], []
+    lost = 0
+
+    with OfflineHarness(check_interval=args.check_interval, model_latency=args.model_latency,
+                        extra_env=extra_env) as harness:
+        for index in range(args.baseline):
+            message_id = harness.send(build_message(f"기준 측정 {index}", "주차 등록은 어디에서 하나요?"))
+            if harness.wait_for_replies(index + 1, args.timeout):
+                baseline_s.append(harness.latencies()[message_id])
+
+        answered = args.baseline
+        for index in range(args.blips):
+            connections = harness.imap.connections
+            started = time.perf_counter()
+            harness.imap.interrupt(args.outage)
+            message_id = harness.send(build_message(f"연결 끊김 후 문의 {index}", "도서관 이용 시간이 궁금합니다."))
+            if wait_for_session(harness, connections, args.timeout):
+                reconnect_s.append(time.perf_counter() - started)
+            if harness.wait_for_replies(answered + 1, args.timeout):
+                recovery_s.append(harness.replied_at[message_id] - started)
+                answered += 1
+            else:
+                lost += 1
+
+        time.sleep(args.check_interval * 2)
+        monitor = harness.app.email_monitor
+        report = {
+            "benchmark": "imap_reconnect",
+            **git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "params": {
+                "blips": args.blips,
+                "outage": args.outage,
+                "check_interval": args.check_interval,
+                "model_latency": args.model_latency,
+                "reconnect_delay": args.reconnect_delay,
+            },
+            "baseline_reply_ms": latency_summary(baseline_s),
+            "reconnect_ms": latency_summary(reconnect_s),
+            "recovered_reply_ms": latency_summary(recovery_s),
+            "lost": lost,
+            "duplicate_replies": len(harness.smtp.messages) - len(harness.replied_at),
+            "imap_sessions": harness.imap.connections,
+            "last_seen_uid": monitor.last_seen_uid.decode() if monitor.last_seen_uid else None,
+            "imap_commands": dict(harness.imap.command_counts),
+        }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    if lost:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
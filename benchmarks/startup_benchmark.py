@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for Jane.ai
+
+Starts fresh interpreters that build JaneAIApplication (without connecting to
+IMAP) and reports wall time, peak RSS, which heavy dependencies were loaded and
+an -X importtime breakdown of the slowest imports.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs N] [--top N] [--first-use] [--json]
+
+--first-use additionally initializes the agent system and imports selenium, to
+show the cost that is now deferred to the first email / vacation request.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_MODULES = ('openai', 'agents', 'pydantic', 'selenium', 'webdriver_manager', 'cryptography')
+
+CHILD = r'''
+import json, resource, sys, time
+started = time.perf_counter()
+sys.path[:0] = [{root!r}, {src!r}]
+
+from config.config import load_config
+from jane_ai.core.application import JaneAIApplication
+
+app = JaneAIApplication(load_config())
+startup = time.perf_counter() - started
+loaded = [name for name in {heavy!r} if name in sys.modules]
+
+first_use = None
+if {first_use!r}:
+    began = time.perf_counter()
+    app.ai_service.jane_agents
+    import selenium.webdriver
+    first_use = time.perf_counter() - began
+
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+print(json.dumps({{"startup_s": startup, "first_use_s": first_use, "rss_mb": rss_mb, "heavy_loaded": loaded}}))
+'''
+
+def run_once(first_use: bool, workdir: str):
+    """Run one cold start; returns (metrics, importtime lines)"""
+    code = CHILD.format(root=ROOT, src=os.path.join(ROOT, 'src'), heavy=HEAVY_MODULES, first_use=first_use)
+    env = dict(os.environ)
+    env.setdefault('OPENAI_API_KEY', 'benchmark')
+    env['JANE_VACATION_LEDGER_PATH'] = os.path.join(workdir, 'ledger.db')
+    env['JANE_PORTAL_COOKIE_PATH'] = os.path.join(workdir, 'cookies.enc')
+
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True
+    )
+    metrics = json.loads(proc.stdout.strip().splitlines()[-1])
+    return metrics, [line for line in proc.stderr.splitlines() if line.startswith('import time:')]
+
+def slowest_imports(lines, top: int):
+    """Parse -X importtime output into the slowest modules by cumulative time"""
+    rows = []
+    for line in lines[1:]:
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace('import time:', '|', 1).split('|'))
+        rows.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description="Jane.ai cold-start benchmark")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--first-use', action='store_true')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    runs = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(args.runs):
+            metrics, import_lines = run_once(args.first_use, workdir)
+            runs.append(metrics)
+
+    report = {
+        "runs": args.runs,
+        "startup_s_median": statistics.median(run["startup_s"] for run in runs),
+        "rss_mb_median": statistics.median(run["rss_mb"] for run in runs),
+        "heavy_loaded_at_startup": runs[-1]["heavy_loaded"],
+        "slowest_imports": slowest_imports(import_lines, args.top),
+    }
+    if args.first_use:
+        report["first_use_s_median"] = statistics.median(run["first_use_s"] for run in runs)
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    print(f"시작 시간 (중앙값): {report['startup_s_median'] * 1000:.1f} ms")
+    print(f"최대 RSS (중앙값): {report['rss_mb_median']:.1f} MB")
+    print(f"시작 시 로드된 무거운 모듈: {', '.join(report['heavy_loaded_at_startup']) or '없음'}")
+    if args.first_use:
+        print(f"첫 사용 시 추가 로딩 (중앙값): {report['first_use_s_median'] * 1000:.1f} ms")
+    print(f"\n가장 느린 import (마지막 실행, 누적 기준 상위 {args.top}개):")
+    for row in report["slowest_imports"]:
+        print(f"  {row['cumulative_ms']:8.1f} ms  {row['module']}")
+
+if __name__ == "__main__":
+    main()
@@ -16,8 +16,17 @@ class EmailConfig:
     app_password: str = ""
     imap_server: str = "imap.gmail.com"
     imap_port: int = 993
+    imap_ssl: bool = True
     smtp_server: str = "smtp.gmail.com"
     smtp_port: int = 587
+    smtp_starttls: bool = True
+    exclude_headers: str = ""  # server-side NOT HEADER terms, e.g. "List-Id, Auto-Submitted, From:noreply"
+    gmail_raw: str = ""  # Gmail search query (X-GM-RAW), e.g. "category:primary -from:noreply"
+    gmail_replied_label: str = ""  # Gmail label added to answered mail; empty disables
+    imap_timeout: float = 60.0  # socket timeout; a silent dead connection fails after this
+    imap_keepalive: float = 300.0  # NOOP after this many idle seconds between polls
+    imap_reconnect_delay: float = 1.0  # backoff base after a failed reconnect
+    imap_reconnect_max_delay: float = 60.0
 
 @dataclass
 class AIConfig:
@@ -26,20 +35,61 @@ class AIConfig:
     model: str = "gpt-4o"
     max_tokens: int = 1000
     temperature: float = 0.7
+    base_url: str = ""  # OpenAI-compatible endpoint; empty uses the OpenAI API
+    tracing: bool = True  # export agent traces to the OpenAI platform
+    usage_path: str = "data/usage.db"  # token/cost store; empty disables
+    model_prices: str = ""  # JSON overrides, e.g. {"gpt-4o": [2.5, 1.25, 10]} (USD per 1M input/cached/output)
+
+@dataclass
+class PortalConfig:
+    """KDI portal automation configuration"""
+    username: str = ""
+    password: str = ""
+    base_url: str = "https://portal.kdischool.ac.kr"
+    backend: str = "selenium"  # selenium | http (browser fallback)
+    form_url: str = ""  # e-Approval vacation form page for the HTTP backend
+    cookie_path: str = "data/portal_cookies.enc"  # empty disables session persistence
+    cookie_key: str = ""  # Fernet key; derived from the portal password when empty
+    browser_pool_size: int = 1
+    browser_max_uses: int = 20
+    headless: bool = True
+    browser_prewarm: bool = True  # launch browser sessions in the background at startup
+    batch_window: float = 2.0  # seconds to collect vacation requests into one session
+    batch_max_size: int = 10
+    ledger_path: str = "data/vacation_ledger.db"
+    pending_timeout: float = 600.0
 
 @dataclass
 class AppConfig:
     """Main application configuration"""
     email: EmailConfig = None
     ai: AIConfig = None
-    check_interval: int = 10  # seconds
+    portal: PortalConfig = None
+    check_interval: float = 10  # seconds
     log_level: str = "INFO"
+    max_concurrent_emails: int = 4
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 0  # Prometheus endpoint; 0 disables
+    trace_path: str = "logs/traces.jsonl"  # per-email span log; empty disables
+    trace_max_bytes: int = 10 * 1024 * 1024
+    trace_backups: int = 5
+    trace_otlp_endpoint: str = ""  # OTLP/HTTP JSON collector, e.g. http://127.0.0.1:4318
+    attachment_workers: int = 2  # processes extracting attachment text; 0 disables
+    attachment_max_bytes: int = 10 * 1024 * 1024
+    attachment_timeout: float = 20.0  # seconds per attachment
+    attachment_max_chars: int = 20000  # text kept per attachment
+    attachment_cache_size: int = 256  # extracted files remembered by content hash
+    conversation_path: str = "data/conversations.db"  # per-thread turn store; empty disables
+    conversation_json_path: str = "conversations.json"  # legacy store, imported once
+    conversation_turns: int = 10  # prior turns given to the agents
     
     def __post_init__(self):
         if self.email is None:
             self.email = EmailConfig()
         if self.ai is None:
             self.ai = AIConfig()
+        if self.portal is None:
+            self.portal = PortalConfig()
 
 def load_config() -> AppConfig:
     """Load configuration from environment variables or defaults"""
@@ -48,20 +98,68 @@ def load_config() -> AppConfig:
         app_password=os.getenv('JANE_EMAIL_PASSWORD', ""),
         imap_server=os.getenv('JANE_IMAP_SERVER', EmailConfig.imap_server),
         imap_port=int(os.getenv('JANE_IMAP_PORT', str(EmailConfig.imap_port))),
+        imap_ssl=os.getenv('JANE_IMAP_SSL', 'true').lower() == 'true',
         smtp_server=os.getenv('JANE_SMTP_SERVER', EmailConfig.smtp_server),
-        smtp_port=int(os.getenv('JANE_SMTP_PORT', str(EmailConfig.smtp_port)))
+        smtp_port=int(os.getenv('JANE_SMTP_PORT', str(EmailConfig.smtp_port))),
+        smtp_starttls=os.getenv('JANE_SMTP_STARTTLS', 'true').lower() == 'true',
+        exclude_headers=os.getenv('JANE_IMAP_EXCLUDE_HEADERS', EmailConfig.exclude_headers),
+        gmail_raw=os.getenv('JANE_GMAIL_RAW', EmailConfig.gmail_raw),
+        gmail_replied_label=os.getenv('JANE_GMAIL_REPLIED_LABEL', EmailConfig.gmail_replied_label),
+        imap_timeout=float(os.getenv('JANE_IMAP_TIMEOUT', str(EmailConfig.imap_timeout))),
+        imap_keepalive=float(os.getenv('JANE_IMAP_KEEPALIVE', str(EmailConfig.imap_keepalive))),
+        imap_reconnect_delay=float(os.getenv('JANE_IMAP_RECONNECT_DELAY', str(EmailConfig.imap_reconnect_delay))),
+        imap_reconnect_max_delay=float(os.getenv('JANE_IMAP_RECONNECT_MAX_DELAY',
+                                                 str(EmailConfig.imap_reconnect_max_delay)))
     )
     
     ai_config = AIConfig(
         openai_api_key=os.getenv('OPENAI_API_KEY', ""),
         model=os.getenv('JANE_AI_MODEL', AIConfig.model),
         max_tokens=int(os.getenv('JANE_AI_MAX_TOKENS', str(AIConfig.max_tokens))),
-        temperature=float(os.getenv('JANE_AI_TEMPERATURE', str(AIConfig.temperature)))
+        temperature=float(os.getenv('JANE_AI_TEMPERATURE', str(AIConfig.temperature))),
+        base_url=os.getenv('JANE_AI_BASE_URL', AIConfig.base_url),
+        tracing=os.getenv('JANE_AI_TRACING', 'true').lower() == 'true',
+        usage_path=os.getenv('JANE_USAGE_PATH', AIConfig.usage_path),
+        model_prices=os.getenv('JANE_MODEL_PRICES', AIConfig.model_prices)
+    )
+    
+    portal_config = PortalConfig(
+        username=os.getenv('JANE_PORTAL_USERNAME', ""),
+        password=os.getenv('JANE_PORTAL_PASSWORD', ""),
+        base_url=os.getenv('JANE_PORTAL_URL', PortalConfig.base_url),
+        backend=os.getenv('JANE_PORTAL_BACKEND', PortalConfig.backend).lower(),
+        form_url=os.getenv('JANE_PORTAL_FORM_URL', PortalConfig.form_url),
+        cookie_path=os.getenv('JANE_PORTAL_COOKIE_PATH', PortalConfig.cookie_path),
+        cookie_key=os.getenv('JANE_PORTAL_COOKIE_KEY', PortalConfig.cookie_key),
+        browser_pool_size=int(os.getenv('JANE_BROWSER_POOL_SIZE', str(PortalConfig.browser_pool_size))),
+        browser_max_uses=int(os.getenv('JANE_BROWSER_MAX_USES', str(PortalConfig.browser_max_uses))),
+        headless=os.getenv('JANE_BROWSER_HEADLESS', 'true').lower() == 'true',
+        browser_prewarm=os.getenv('JANE_BROWSER_PREWARM', 'true').lower() == 'true',
+        batch_window=float(os.getenv('JANE_VACATION_BATCH_WINDOW', str(PortalConfig.batch_window))),
+        batch_max_size=int(os.getenv('JANE_VACATION_BATCH_MAX_SIZE', str(PortalConfig.batch_max_size))),
+        ledger_path=os.getenv('JANE_VACATION_LEDGER_PATH', PortalConfig.ledger_path),
+        pending_timeout=float(os.getenv('JANE_VACATION_PENDING_TIMEOUT', str(PortalConfig.pending_timeout)))
     )
     
     return AppConfig(
         email=email_config,
         ai=ai_config,
-        check_interval=int(os.getenv('JANE_CHECK_INTERVAL', '10')),
-        log_level=os.getenv('JANE_LOG_LEVEL', 'INFO')
+        portal=portal_config,
+        check_interval=float(os.getenv('JANE_CHECK_INTERVAL', '10')),
+        log_level=os.getenv('JANE_LOG_LEVEL', 'INFO'),
+        max_concurrent_emails=int(os.getenv('JANE_MAX_CONCURRENT_EMAILS', '4')),
+        metrics_host=os.getenv('JANE_METRICS_HOST', AppConfig.metrics_host),
+        metrics_port=int(os.getenv('JANE_METRICS_PORT', str(AppConfig.metrics_port))),
+        trace_path=os.getenv('JANE_TRACE_PATH', AppConfig.trace_path),
+        trace_max_bytes=int(os.getenv('JANE_TRACE_MAX_BYTES', str(AppConfig.trace_max_bytes))),
+        trace_backups=int(os.getenv('JANE_TRACE_BACKUPS', str(AppConfig.trace_backups))),
+        trace_otlp_endpoint=os.getenv('JANE_TRACE_OTLP_ENDPOINT', AppConfig.trace_otlp_endpoint),
+        attachment_workers=int(os.getenv('JANE_ATTACHMENT_WORKERS', str(AppConfig.attachment_workers))),
+        attachment_max_bytes=int(os.getenv('JANE_ATTACHMENT_MAX_BYTES', str(AppConfig.attachment_max_bytes))),
+        attachment_timeout=float(os.getenv('JANE_ATTACHMENT_TIMEOUT', str(AppConfig.attachment_timeout))),
+        attachment_max_chars=int(os.getenv('JANE_ATTACHMENT_MAX_CHARS', str(AppConfig.attachment_max_chars))),
+        attachment_cache_size=int(os.getenv('JANE_ATTACHMENT_CACHE_SIZE', str(AppConfig.attachment_cache_size))),
+        conversation_path=os.getenv('JANE_CONVERSATION_PATH', AppConfig.conversation_path),
+        conversation_json_path=os.getenv('JANE_CONVERSATION_JSON', AppConfig.conversation_json_path),
+        conversation_turns=int(os.getenv('JANE_CONVERSATION_TURNS', str(AppConfig.conversation_turns)))
     )
\ No newline at end of file
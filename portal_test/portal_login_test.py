@@ -4,7 +4,13 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
-import time
+import sys
+import os
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from jane_ai.services.portal_steps import datepicker_closed, datepicker_rendered, popup_window_opened, tree_node_expanded
 
 def test_portal_login():
     chrome_options = webdriver.ChromeOptions()
@@ -49,7 +55,7 @@ def test_portal_login():
         login_submit.click()
         print("로그인 버튼을 클릭했습니다.")
         
-        time.sleep(1)
+        wait.until(EC.staleness_of(login_submit))  # 로그인 폼이 사라질 때까지 대기
         
         current_url = driver.current_url
         print(f"로그인 후 현재 URL: {current_url}")
@@ -67,15 +73,12 @@ def test_portal_login():
             print("e-Approval 메뉴를 클릭합니다...")
             approval_menu.click()
             
-            time.sleep(1)  # 드롭다운 메뉴가 나타날 시간 대기
-            
             # 문서작성 버튼이 나타날 때까지 대기 후 클릭
             print("문서작성 버튼을 찾는 중...")
             doc_create_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[@title='문서작성']")))
             doc_create_button.click()
             print("문서작성 버튼을 클릭했습니다!")
             
-            time.sleep(1)
             print(f"문서작성 페이지 URL: {driver.current_url}")
             
             # "3. 서식(복무) (Personnel documents)" 카테고리 클릭
@@ -84,7 +87,7 @@ def test_portal_login():
             personnel_category.click()
             print("서식(복무) 카테고리를 클릭했습니다!")
             
-            time.sleep(1)  # 카테고리 내용이 로드될 시간 대기
+            handles_before = driver.window_handles  # 팝업 감지를 위한 기존 창 목록
             
             # "직원휴가신청서(연차/대체휴가)" 양식 클릭 - JavaScript로 클릭 시도
             print("직원휴가신청서(연차/대체휴가) 양식을 찾는 중...")
@@ -92,7 +95,6 @@ def test_portal_login():
                 vacation_form = wait.until(EC.presence_of_element_located((By.XPATH, "//div[@class='aprv_doc_box'][@role='form_add']//h4[contains(text(), '직원휴가신청서(연차/대체휴가)')]")))
                 # 스크롤해서 요소를 화면에 보이게 함
                 driver.execute_script("arguments[0].scrollIntoView(true);", vacation_form)
-                time.sleep(1)
                 # JavaScript로 클릭
                 driver.execute_script("arguments[0].click();", vacation_form)
                 print("직원휴가신청서(연차/대체휴가) 양식을 클릭했습니다!")
@@ -101,7 +103,6 @@ def test_portal_login():
                     # 전체 div 박스를 클릭
                     vacation_div = driver.find_element(By.XPATH, "//div[@class='aprv_doc_box'][@role='form_add'][.//h4[contains(text(), '직원휴가신청서(연차/대체휴가)')]]")
                     driver.execute_script("arguments[0].scrollIntoView(true);", vacation_div)
-                    time.sleep(1)
                     driver.execute_script("arguments[0].click();", vacation_div)
                     print("직원휴가신청서(연차/대체휴가) 양식 박스를 클릭했습니다!")
                 except Exception as e:
@@ -117,7 +118,7 @@ def test_portal_login():
                             print("해당 양식을 찾아서 클릭했습니다!")
                             break
             
-            time.sleep(1)  # 팝업이 열릴 시간 대기
+            wait.until(EC.any_of(popup_window_opened(handles_before), EC.presence_of_element_located((By.XPATH, "//span[@class='btn_gray'][@role='select_regfile'][contains(text(), '기록물철')]"))))  # 팝업이 열릴 때까지 대기
             
             # 팝업 창 처리
             print("팝업 창 처리 중...")
@@ -143,7 +144,7 @@ def test_portal_login():
                 regfile_button.click()
                 print("기록물철 버튼을 클릭했습니다!")
                 
-                time.sleep(1)  # 드롭다운이 로드될 시간 대기
+                wait.until(EC.presence_of_element_located((By.XPATH, "//span[@class='tree_label'][contains(text(), '부서복무관리')]")))  # 기록물철 트리 표시 대기
                 
                 # "부서복무관리"가 이미 확장되어 있는지 확인하고, 없으면 확장
                 print("부서복무관리 항목 확인 중...")
@@ -156,11 +157,9 @@ def test_portal_login():
                     print("부서복무관리를 확장합니다...")
                     dept_mgmt_expander = driver.find_element(By.XPATH, "//span[@class='tree_label'][contains(text(), '부서복무관리')]/preceding-sibling::span[@class='dynatree-expander']")
                     dept_mgmt_expander.click()
-                    time.sleep(1)
+                    wait.until(tree_node_expanded('부서복무관리'))
                     print("부서복무관리를 확장했습니다!")
                 
-                time.sleep(1)  # 하위 항목이 로드될 시간 대기
-                
                 # 휴가(외출) 항목 선택 - 여러 방법 시도
                 print("휴가(외출) 항목을 찾는 중...")
                 try:
@@ -190,7 +189,6 @@ def test_portal_login():
                             except Exception as inner_e:
                                 print(f"  {i+1}. 텍스트 확인 실패: {inner_e}")
                 
-                time.sleep(1)
                 print(f"휴가(외출) 선택 후 현재 URL: {driver.current_url}")
                 
                 # 확인 버튼 클릭
@@ -222,7 +220,6 @@ def test_portal_login():
                             except Exception as btn_e:
                                 print(f"  {i+1}. 버튼 확인 실패: {btn_e}")
                 
-                time.sleep(1)
                 print(f"확인 버튼 클릭 후 현재 URL: {driver.current_url}")
                 
                 # 날짜 선택 처리 - 단계별로 진행
@@ -240,7 +237,7 @@ def test_portal_login():
                     start_date_input.click()
                     print("StartDate_1 input 필드를 클릭했습니다 (ID 방식).")
                 
-                time.sleep(1)  # 날짜 선택기가 나타날 시간 대기
+                wait.until(datepicker_rendered())  # 날짜 선택기가 나타날 때까지 대기
                 
                 # 2단계: 년도 드롭다운 선택
                 print("년도 드롭다운을 찾는 중...")
@@ -250,8 +247,6 @@ def test_portal_login():
                 year_dropdown.select_by_value("2025")
                 print("2025년을 선택했습니다.")
                 
-                time.sleep(1)
-                
                 # 3단계: 월 드롭다운 선택 (8월은 value="7")
                 print("월 드롭다운을 찾는 중...")
                 month_select = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "select.ui-datepicker-month")))
@@ -259,7 +254,7 @@ def test_portal_login():
                 month_dropdown.select_by_value("7")
                 print("8월을 선택했습니다.")
                 
-                time.sleep(1)  # 캘린더가 9월로 업데이트될 시간 대기
+                wait.until(datepicker_rendered(2025, 8))  # 캘린더가 8월로 업데이트될 때까지 대기
                 
                 # 4단계: 8일 선택 (8월의 8일은 data-month="7")
                 print("8월 8일을 찾는 중...")
@@ -267,7 +262,7 @@ def test_portal_login():
                 day_8.click()
                 print("8월 8일을 선택했습니다.")
                 
-                time.sleep(1)
+                wait.until(datepicker_closed())
                 
                 # 종료일 선택 - 2025년 9월 2일
                 print("종료일 선택 처리 시작...")
@@ -284,7 +279,7 @@ def test_portal_login():
                     end_date_input.click()
                     print("EndDate_1 input 필드를 클릭했습니다 (ID 방식).")
                 
-                time.sleep(1)  # 날짜 선택기가 나타날 시간 대기
+                wait.until(datepicker_rendered())  # 날짜 선택기가 나타날 때까지 대기
                 
                 # 2단계: 년도 드롭다운 선택 (2025년)
                 print("종료일 년도 드롭다운을 찾는 중...")
@@ -293,8 +288,6 @@ def test_portal_login():
                 end_year_dropdown.select_by_value("2025")
                 print("종료일 2025년을 선택했습니다.")
                 
-                time.sleep(1)
-                
                 # 3단계: 월 드롭다운 선택 (8월은 value="7")
                 print("종료일 월 드롭다운을 찾는 중...")
                 end_month_select = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "select.ui-datepicker-month")))
@@ -302,7 +295,7 @@ def test_portal_login():
                 end_month_dropdown.select_by_value("7")
                 print("종료일 8월을 선택했습니다.")
                 
-                time.sleep(1)  # 캘린더가 9월로 업데이트될 시간 대기
+                wait.until(datepicker_rendered(2025, 8))  # 캘린더가 8월로 업데이트될 때까지 대기
                 
                 # 4단계: 8일 선택 (8월의 8일은 data-month="7")
                 print("8월 8일을 찾는 중...")
@@ -310,7 +303,7 @@ def test_portal_login():
                 day_8_end.click()
                 print("8월 8일을 선택했습니다.")
                 
-                time.sleep(1)
+                wait.until(datepicker_closed())
                 
                 # 휴가 종류 선택 - 연가 (개선된 방법)
                 print("휴가 종류 선택 중...")
@@ -331,8 +324,6 @@ def test_portal_login():
                     except Exception as alt_e:
                         print(f"대체 방법도 실패: {alt_e}")
                 
-                time.sleep(1)
-                
                 # Term_1 필드에 1 입력 (기간)
                 print("휴가 기간(일수) 입력 중...")
                 try:
@@ -343,8 +334,6 @@ def test_portal_login():
                 except Exception as term_e:
                     print(f"휴가 기간 입력 중 오류: {term_e}")
                 
-                time.sleep(1)
-                
                 # 기안 버튼 클릭
                 print("기안 버튼을 찾는 중...")
                 try:
@@ -361,8 +350,6 @@ def test_portal_login():
                     except Exception as alt_submit_e:
                         print(f"기안 버튼 대체 방법도 실패: {alt_submit_e}")
                 
-                time.sleep(2)  # 팝업이 나타날 시간 대기
-                
                 # 의견 입력 팝업 처리
                 print("의견 입력 팝업 처리 중...")
                 try:
@@ -372,8 +359,6 @@ def test_portal_login():
                     opinion_textarea.send_keys("AI기반 외출 신청")
                     print("의견을 입력했습니다: 'AI기반 외출 신청'")
                     
-                    time.sleep(1)
-                    
                     # 확인 버튼 클릭
                     confirm_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[@class='ui-button-text'][contains(text(), '확인')]")))
                     confirm_button.click()
@@ -389,7 +374,7 @@ def test_portal_login():
                     except Exception as alt_confirm_e:
                         print(f"확인 버튼 대체 방법도 실패: {alt_confirm_e}")
                 
-                time.sleep(2)
+                wait.until(EC.invisibility_of_element_located((By.NAME, "opinion")))  # 의견 팝업이 닫힐 때까지 대기
                 print("휴가 신청서 기안 제출이 완료되었습니다!")
                 
             except Exception as e:
@@ -404,7 +389,6 @@ def test_portal_login():
         print(f"에러 발생: {str(e)}")
     
     finally:
-        time.sleep(1)
         driver.quit()
         print("브라우저를 종료했습니다.")
 
@@ -0,0 +1,229 @@
+"""
+Local stub of the KDI portal for exercising both vacation backends offline
+
+Serves the SSO login page, the portal main page with the e-Approval
+document tree and the 직원휴가신청서 popup form (regfile tree, datepicker,
+opinion dialog). Accepted submissions are kept in StubPortal.submissions.
+
+Usage:
+    python portal_test/stub_portal.py [port]
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import json
+import secrets
+import sys
+import threading
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>SSO Login</title></head>
+<body>
+<form method="post" action="/sso/login">
+  <input type="hidden" name="returnUrl" value="/portal/main">
+  <input type="text" id="login_id" name="login_id">
+  <input type="password" id="login_pwd" name="login_pwd">
+  <input type="submit" value="Login">
+</form>
+</body></html>"""
+
+MAIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>KDI School Portal</title></head>
+<body>
+<div title="e-Approval" onclick="document.getElementById('approvalMenu').style.display='block'">e-Approval</div>
+<div id="approvalMenu" style="display:none">
+  <span title="문서작성" onclick="document.getElementById('formTree').style.display='block'">문서작성</span>
+</div>
+<div id="formTree" style="display:none">
+  <span class="tree_label" onclick="document.getElementById('forms').style.display='block'">3. 서식(복무) (Personnel documents)</span>
+</div>
+<div id="forms" style="display:none">
+  <div class="aprv_doc_box" role="form_add" onclick="window.open('/approval/vacation/form', 'vacationForm', 'width=900,height=800')">
+    <h4 class="tit">직원휴가신청서(연차/대체휴가)</h4>
+  </div>
+</div>
+</body></html>"""
+
+FORM_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>직원휴가신청서</title>
+<style>.hidden {display:none}</style></head>
+<body>
+<form id="vacationForm" method="post" action="/approval/vacation/submit">
+  <input type="hidden" name="formToken" value="%(token)s">
+  <input type="hidden" name="regFile" value="">
+  <span class="btn_gray" role="select_regfile" onclick="show('regfileDialog')">기록물철</span>
+  <input type="text" name="StartDate_1" onclick="openPicker(this)" readonly>
+  <input type="text" name="EndDate_1" onclick="openPicker(this)" readonly>
+  <select name="VactionKind_1">
+    <option value="01">연가</option><option value="02">병가</option>
+    <option value="03">경조휴가</option><option value="04">특별휴가</option>
+  </select>
+  <input type="text" name="Term_1" value="">
+  <span class="btn_highlight" role="submit_approve" onclick="show('opinionDialog')">기안</span>
+  <div id="opinionDialog" class="hidden">
+    <textarea name="opinion"></textarea>
+    <button type="button" onclick="submitForm()"><span class="ui-button-text">확인</span></button>
+  </div>
+</form>
+
+<div id="regfileDialog" class="hidden">
+  <span id="deptNode"><span class="dynatree-expander" onclick="expandDept()"></span><span class="tree_label">부서복무관리</span></span>
+  <div id="deptChildren" class="hidden">
+    <span class="tree_label" onclick="document.forms.vacationForm.regFile.value='휴가(외출)'">휴가(외출)</span>
+  </div>
+  <button type="button" highlight="true" onclick="hide('regfileDialog')"><span>확인</span></button>
+</div>
+
+<div id="ui-datepicker-div" class="hidden"></div>
+
+<script>
+function show(id) { document.getElementById(id).classList.remove('hidden'); }
+function hide(id) { document.getElementById(id).classList.add('hidden'); }
+function expandDept() {
+  document.getElementById('deptNode').className = 'dynatree-node dynatree-expanded';
+  show('deptChildren');
+}
+
+var pickerInput = null, pickerYear = 2025, pickerMonth = 0;
+function openPicker(input) {
+  pickerInput = input;
+  var now = new Date();
+  pickerYear = now.getFullYear(); pickerMonth = now.getMonth();
+  renderPicker();
+  show('ui-datepicker-div');
+}
+function renderPicker() {
+  var html = '<select class="ui-datepicker-year" onchange="pickerYear=+this.value;renderPicker()">';
+  for (var y = 2024; y <= 2030; y++) {
+    html += '<option value="' + y + '"' + (y == pickerYear ? ' selected' : '') + '>' + y + '</option>';
+  }
+  html += '</select><select class="ui-datepicker-month" onchange="pickerMonth=+this.value;renderPicker()">';
+  for (var m = 0; m < 12; m++) {
+    html += '<option value="' + m + '"' + (m == pickerMonth ? ' selected' : '') + '>' + (m + 1) + '</option>';
+  }
+  html += '</select><table><tr>';
+  var days = new Date(pickerYear, pickerMonth + 1, 0).getDate();
+  for (var d = 1; d <= days; d++) {
+    html += '<td data-handler="selectDay" data-month="' + pickerMonth + '" data-year="' + pickerYear + '">'
+          + '<a href="#" onclick="pickDay(' + d + ');return false;">' + d + '</a></td>';
+  }
+  document.getElementById('ui-datepicker-div').innerHTML = html + '</tr></table>';
+}
+function pickDay(day) {
+  var mm = ('0' + (pickerMonth + 1)).slice(-2), dd = ('0' + day).slice(-2);
+  pickerInput.value = pickerYear + '-' + mm + '-' + dd;
+  hide('ui-datepicker-div');
+}
+function submitForm() {
+  var body = new URLSearchParams(new FormData(document.forms.vacationForm));
+  fetch('/approval/vacation/submit', {method: 'POST', body: body}).then(function () {
+    hide('opinionDialog');
+  });
+}
+</script>
+</body></html>"""
+
+class StubPortal:
+    """Threaded stub portal server bound to localhost"""
+
+    def __init__(self, username: str = "stub-user", password: str = "stub-pass", port: int = 0):
+        self.username = username
+        self.password = password
+        self.sessions = set()
+        self.submissions = []
+        self.login_count = 0
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> 'StubPortal':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _session(self):
+                for part in self.headers.get('Cookie', '').split(';'):
+                    name, _, value = part.strip().partition('=')
+                    if name == 'JSESSIONID' and value in portal.sessions:
+                        return value
+                return None
+
+            def _send(self, status, body='', content_type='text/html; charset=utf-8', headers=None):
+                payload = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _redirect(self, location, headers=None):
+                self._send(302, headers=dict(headers or {}, Location=location))
+
+            def _form(self):
+                length = int(self.headers.get('Content-Length', 0))
+                fields = parse_qs(self.rfile.read(length).decode('utf-8'), keep_blank_values=True)
+                return {name: values[-1] for name, values in fields.items()}
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path == '/sso/login':
+                    return self._send(200, LOGIN_PAGE)
+                if not self._session():
+                    return self._redirect('/sso/login')
+                if path in ('/', '/portal/main'):
+                    return self._send(200, MAIN_PAGE)
+                if path == '/approval/vacation/form':
+                    return self._send(200, FORM_PAGE % {'token': secrets.token_hex(8)})
+                self._send(404, 'not found')
+
+            def do_POST(self):
+                path = urlparse(self.path).path
+                fields = self._form()
+                if path == '/sso/login':
+                    if fields.get('login_id') == portal.username and fields.get('login_pwd') == portal.password:
+                        session = secrets.token_hex(16)
+                        portal.sessions.add(session)
+                        portal.login_count += 1
+                        return self._redirect(
+                            fields.get('returnUrl') or '/portal/main',
+                            {'Set-Cookie': f'JSESSIONID={session}; Path=/; HttpOnly'}
+                        )
+                    return self._send(200, LOGIN_PAGE)
+                if not self._session():
+                    return self._redirect('/sso/login')
+                if path == '/approval/vacation/submit':
+                    required = ('formToken', 'regFile', 'StartDate_1', 'EndDate_1', 'VactionKind_1', 'Term_1', 'opinion')
+                    missing = [name for name in required if not fields.get(name)]
+                    if missing:
+                        body = {'success': False, 'message': f"필수 항목 누락: {', '.join(missing)}"}
+                    else:
+                        portal.submissions.append(fields)
+                        body = {'success': True, 'docId': len(portal.submissions)}
+                    return self._send(200, json.dumps(body, ensure_ascii=False), 'application/json; charset=utf-8')
+                self._send(404, 'not found')
+
+        return Handler
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    stub = StubPortal(port=port).start()
+    print(f"Stub portal: {stub.base_url} (ID: {stub.username}, PW: {stub.password})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,100 @@
+"""
+Run the vacation backends against the local stub portal
+
+Usage:
+    python portal_test/stub_portal_check.py [--selenium]
+"""
+import sys
+import os
+import tempfile
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from stub_portal import StubPortal
+from jane_ai.services.portal_cookies import PortalCookieStore
+from jane_ai.services.portal_http import HttpVacationBackend
+from jane_ai.models.vacation_models import VacationRequest
+
+def check_http_backend(stub: StubPortal):
+    """Submit through the browserless HTTP backend"""
+    print("=== HTTP 백엔드 테스트 ===")
+    backend = HttpVacationBackend(
+        username=stub.username,
+        password=stub.password,
+        base_url=stub.base_url,
+        form_url="/approval/vacation/form"
+    )
+    request = VacationRequest(start_date="2025-09-01", end_date="2025-09-02", days_count=2, reason="개인 사유")
+
+    result = backend.submit_vacation_request(request)
+    print(f"결과: {result}")
+    assert result["success"], result
+    assert stub.submissions[-1]["StartDate_1"] == "2025-09-01"
+    assert stub.submissions[-1]["Term_1"] == "2"
+    assert stub.submissions[-1]["regFile"] == "휴가(외출)"
+
+    # 두 번째 제출은 저장된 쿠키를 재사용 (추가 로그인 없음)
+    backend.submit_vacation_request(request)
+    assert stub.login_count == 1, stub.login_count
+    print("HTTP 백엔드 통과")
+
+def check_cookie_persistence(stub: StubPortal):
+    """A new backend instance reuses the encrypted session saved by the previous one"""
+    print("\n=== 세션 쿠키 저장 테스트 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PortalCookieStore(os.path.join(tmp, "cookies.enc"), username=stub.username, password=stub.password)
+        request = VacationRequest(start_date="2025-09-03", end_date="2025-09-03", days_count=1)
+
+        for _ in range(2):
+            backend = HttpVacationBackend(
+                username=stub.username,
+                password=stub.password,
+                base_url=stub.base_url,
+                form_url="/approval/vacation/form",
+                cookie_store=store
+            )
+            before = stub.login_count
+            result = backend.submit_vacation_request(request)
+            assert result["success"], result
+        
+        # 두 번째 인스턴스는 저장된 쿠키로 로그인 없이 제출
+        assert stub.login_count == before, stub.login_count
+        assert b"JSESSIONID" not in open(store.path, "rb").read()
+    print("세션 쿠키 저장 통과")
+
+def check_selenium_backend(stub: StubPortal):
+    """Submit through the pooled browser backend"""
+    from jane_ai.services.browser_pool import BrowserPool
+    from jane_ai.services.vacation_service import VacationService
+
+    print("\n=== Selenium 백엔드 테스트 ===")
+    pool = BrowserPool(username=stub.username, password=stub.password, base_url=stub.base_url)
+    service = VacationService(username=stub.username, password=stub.password, pool=pool)
+    request = VacationRequest(start_date="2025-09-08", end_date="2025-09-09", days_count=2, reason="개인 사유")
+
+    try:
+        before = len(stub.submissions)
+        result = service.submit_vacation_request(request)
+        print(f"결과: {result}")
+        assert result["success"], result
+        assert len(stub.submissions) == before + 1
+        assert stub.submissions[-1]["EndDate_1"] == "2025-09-09"
+        print("Selenium 백엔드 통과")
+    finally:
+        pool.shutdown()
+
+def main():
+    stub = StubPortal().start()
+    print(f"Stub portal: {stub.base_url}\n")
+    try:
+        check_http_backend(stub)
+        check_cookie_persistence(stub)
+        if "--selenium" in sys.argv:
+            check_selenium_backend(stub)
+    finally:
+        stub.stop()
+    print("\n테스트 완료")
+
+if __name__ == "__main__":
+    main()
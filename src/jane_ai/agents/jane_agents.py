@@ -1,15 +1,30 @@
 """
 Jane.ai Agent-based system using OpenAI Agents SDK
 """
-from agents import Agent, Runner, function_tool, trace
+from agents import (
+    Agent, RunHooks, Runner, RunContextWrapper, Tool, function_tool, set_default_openai_client,
+    set_tracing_disabled, trace
+)
+from agents.models.openai_provider import DEFAULT_MODEL
 from pydantic import BaseModel
-from typing import Optional, Literal
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Literal
 from datetime import datetime, timedelta
 import asyncio
 import json
 
-from ..services.vacation_service import VacationService, VacationRequest
+from ..models.usage_models import UsageRecord
+from ..models.vacation_models import VacationRequest
+from ..services.vacation_service import VacationService
+from ..services.vacation_batcher import VacationBatcher
+from ..services.usage_store import UsageStore
+from ..utils.attachment_text import format_attachments
+from ..utils.email_utils import extract_sender_email
 from ..utils.logging_utils import get_logger
+from ..utils.metrics import record_usage, timed
+from ..utils import tracing
+from ..utils.business_calendar import validate_vacation_period
+from ..utils.vacation_parser import parse_vacation_request, VACATION_TYPE_NAMES
 
 logger = get_logger('jane_agents')
 
@@ -30,42 +45,83 @@ class EmailIntent(BaseModel):
     requires_action: bool
     action_description: str
 
-# Function tools
-@function_tool
-def submit_vacation_request(
-    start_date: str,
-    end_date: str, 
-    vacation_type: str = "01",
-    reason: str = "개인 사유"
-) -> dict:
+@dataclass
+class JaneRunContext:
+    """Per-email state shared with tools through Runner.run(context=...)"""
+    sender_email: str = ""
+    email_uid: str = ""
+    subject: str = ""
+    intent: str = ""
+    vacation_batcher: Optional[VacationBatcher] = None  # portal submitter of the JaneAgents instance
+    tool_spans: Dict[str, tracing.Span] = field(default_factory=dict)  # open tool spans by call id
+
+class ToolSpanHooks(RunHooks):
+    """Record every tool call of an agent run as a child span of the email's trace"""
+    
+    def __init__(self):
+        self._spans = {}
+    
+    def _key(self, context, tool: Tool):
+        return getattr(context, 'tool_call_id', None) or (id(context), tool.name)
+    
+    async def on_tool_start(self, context, agent, tool: Tool) -> None:
+        tool_span = tracing.tracer.start_span(f"tool:{tool.name}", agent=agent.name)
+        if tool_span is not None:
+            self._spans[self._key(context, tool)] = tool_span
+            # 훅은 도구와 별도 태스크에서 실행되므로 도구가 찾을 수 있게 실행 컨텍스트에도 저장
+            call_id = getattr(context, 'tool_call_id', None)
+            if call_id and isinstance(context.context, JaneRunContext):
+                context.context.tool_spans[call_id] = tool_span
+    
+    async def on_tool_end(self, context, agent, tool: Tool, result: str) -> None:
+        tool_span = self._spans.pop(self._key(context, tool), None)
+        if tool_span is not None:
+            if isinstance(context.context, JaneRunContext):
+                context.context.tool_spans.pop(getattr(context, 'tool_call_id', None), None)
+            tool_span.end()
+
+def _tool_span(ctx: RunContextWrapper) -> Optional[tracing.Span]:
     """
-    Submit a vacation request to KDI portal
+    Span that ToolSpanHooks opened for this tool call
+    
+    The SDK runs on_tool_start and the tool in sibling tasks, so the hook cannot make its
+    span current for the tool; the tool activates it itself.
     
-    Args:
-        start_date: Start date in YYYY-MM-DD format
-        end_date: End date in YYYY-MM-DD format  
-        vacation_type: Type of vacation (01: 연가, 02: 병가, etc.)
-        reason: Reason for vacation request
-        
     Returns:
-        dict: Result with success status and message
+        Optional[tracing.Span]: The tool span, else the active span (outside a hooked run)
     """
+    run_context = ctx.context
+    call_id = getattr(ctx, 'tool_call_id', None)
+    if isinstance(run_context, JaneRunContext) and call_id in run_context.tool_spans:
+        return run_context.tool_spans[call_id]
+    return tracing.current_span()
+
+async def _submit_vacation(vacation_batcher: Optional[VacationBatcher], start_date: str, end_date: str,
+                           vacation_type: str, reason: str, requester: str = "") -> dict:
+    """Submit a vacation request to KDI portal (shared by the tool and the fast path)"""
     try:
-        # Calculate days count
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
-        days_count = (end - start).days + 1
+        if vacation_batcher is None:
+            return {"success": False, "message": "휴가 신청 서비스가 설정되지 않았습니다."}
+        
+        # Validate dates and count business days before any browser launches
+        try:
+            _, _, days_count = validate_vacation_period(start_date, end_date)
+        except ValueError as e:
+            logger.warning(f"휴가 신청 검증 실패: {e}")
+            return {"success": False, "invalid": True, "message": str(e)}
         
         vacation_request = VacationRequest(
             start_date=start_date,
             end_date=end_date,
             vacation_type=vacation_type,
             days_count=days_count,
-            reason=reason
+            reason=reason,
+            requester=requester
         )
         
-        vacation_service = VacationService()
-        result = vacation_service.submit_vacation_request(vacation_request)
+        # Portal work runs on the batcher's bounded executor; the event loop only awaits it
+        with timed('tool_submit_vacation'):
+            result = await asyncio.wrap_future(vacation_batcher.submit(vacation_request))
         
         logger.info(f"휴가 신청 결과: {result}")
         return result
@@ -74,6 +130,36 @@ def submit_vacation_request(
         logger.error(f"휴가 신청 도구 실행 중 오류: {e}")
         return {"success": False, "message": f"휴가 신청 처리 중 오류: {str(e)}"}
 
+# Function tools
+@function_tool
+async def submit_vacation_request(
+    ctx: RunContextWrapper[JaneRunContext],
+    start_date: str,
+    end_date: str, 
+    vacation_type: str = "01",
+    reason: str = "개인 사유"
+) -> dict:
+    """
+    Submit a vacation request to KDI portal
+    
+    Args:
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format  
+        vacation_type: Type of vacation (01: 연가, 02: 병가, etc.)
+        reason: Reason for vacation request
+        
+    Returns:
+        dict: Result with success status and message ("duplicate" is True when
+        the same request was already submitted or is still being processed;
+        "unconfirmed" is True when an earlier attempt may have been posted)
+    """
+    if not isinstance(ctx.context, JaneRunContext):
+        return {"success": False, "message": "휴가 신청 서비스가 설정되지 않았습니다."}
+    with tracing.activate(_tool_span(ctx)):
+        return await _submit_vacation(
+            ctx.context.vacation_batcher, start_date, end_date, vacation_type, reason, ctx.context.sender_email
+        )
+
 @function_tool
 def analyze_vacation_request(user_message: str) -> VacationRequestAnalysis:
     """
@@ -85,34 +171,135 @@ def analyze_vacation_request(user_message: str) -> VacationRequestAnalysis:
     Returns:
         VacationRequestAnalysis: Analysis result with extracted information
     """
-    # This would typically use AI to extract vacation details
-    # For now, simple keyword-based analysis
     analysis = VacationRequestAnalysis(is_vacation_request=False)
     
-    vacation_keywords = ['휴가', '연차', '병가', '외출', '반차', 'vacation', 'leave']
-    if any(keyword in user_message.lower() for keyword in vacation_keywords):
-        analysis.is_vacation_request = True
-        
-        # Extract dates (simplified - in practice would use more sophisticated parsing)
-        missing_info = []
-        if not analysis.start_date:
-            missing_info.append("시작 날짜")
-        if not analysis.end_date:
-            missing_info.append("종료 날짜")
-        if not analysis.reason:
-            missing_info.append("휴가 사유")
+    with timed('tool_analyze_vacation'):
+        vacation_keywords = ['휴가', '연차', '병가', '외출', '반차', 'vacation', 'leave']
+        if any(keyword in user_message.lower() for keyword in vacation_keywords):
+            analysis.is_vacation_request = True
             
-        analysis.missing_info = missing_info
+            # Rule-based extraction of dates, type and reason
+            parsed = parse_vacation_request(user_message)
+            analysis.start_date = parsed.start_date
+            analysis.end_date = parsed.end_date
+            analysis.vacation_type = parsed.vacation_type or analysis.vacation_type
+            analysis.reason = parsed.reason
+            analysis.missing_info = [item for item in parsed.missing_info if item != "휴가 종류"]
     
     return analysis
 
+# Response templates for the rule-based vacation fast path
+VACATION_SUBMITTED_TEMPLATE = """안녕하세요, Jane.ai입니다.
+
+요청하신 휴가 신청서를 포털 전자결재에 기안했습니다.
+
+- 휴가 종류: {vacation_type}
+- 기간: {start_date} ~ {end_date}
+- 사유: {reason}
+
+결재 진행 상황은 포털 e-Approval에서 확인하실 수 있습니다.
+
+추가 문의사항이 있으시면 언제든 연락주세요.
+
+---
+Jane.ai
+한국개발연구원 국제정책대학원 AI 비서
+jane.ai@kdis.ac.kr"""
+
+VACATION_ALREADY_SUBMITTED_TEMPLATE = """안녕하세요, Jane.ai입니다.
+
+요청하신 휴가 신청서는 이미 포털 전자결재에 기안되어 있어 다시 기안하지 않았습니다.
+
+- 휴가 종류: {vacation_type}
+- 기간: {start_date} ~ {end_date}
+
+결재 진행 상황은 포털 e-Approval에서 확인하실 수 있습니다.
+
+추가 문의사항이 있으시면 언제든 연락주세요.
+
+---
+Jane.ai
+한국개발연구원 국제정책대학원 AI 비서
+jane.ai@kdis.ac.kr"""
+
+VACATION_IN_PROGRESS_TEMPLATE = """안녕하세요, Jane.ai입니다.
+
+같은 기간의 휴가 신청이 이미 접수되어 있어 새로 기안하지 않았습니다.
+
+- 휴가 종류: {vacation_type}
+- 기간: {start_date} ~ {end_date}
+- 처리 상태: {message}
+
+중복 기안을 막기 위해 같은 요청을 다시 보내지 않으셔도 됩니다. 포털 e-Approval에서 기안 여부를 확인해 주세요.
+
+추가 문의사항이 있으시면 언제든 연락주세요.
+
+---
+Jane.ai
+한국개발연구원 국제정책대학원 AI 비서
+jane.ai@kdis.ac.kr"""
+
+VACATION_INVALID_TEMPLATE = """안녕하세요, Jane.ai입니다.
+
+요청하신 휴가 기간으로는 신청서를 기안할 수 없어 포털에 제출하지 않았습니다.
+
+- 휴가 종류: {vacation_type}
+- 기간: {start_date} ~ {end_date}
+- 확인 사항: {message}
+
+기간을 확인하신 뒤 다시 요청해 주세요.
+
+추가 문의사항이 있으시면 언제든 연락주세요.
+
+---
+Jane.ai
+한국개발연구원 국제정책대학원 AI 비서
+jane.ai@kdis.ac.kr"""
+
+VACATION_FAILED_TEMPLATE = """안녕하세요, Jane.ai입니다.
+
+요청하신 휴가 신청서를 포털에 기안하는 중 문제가 발생했습니다.
+
+- 휴가 종류: {vacation_type}
+- 기간: {start_date} ~ {end_date}
+- 사유: {reason}
+- 처리 결과: {message}
+
+잠시 후 다시 요청해 주시거나 포털에서 직접 신청해 주세요.
+
+추가 문의사항이 있으시면 언제든 연락주세요.
+
+---
+Jane.ai
+한국개발연구원 국제정책대학원 AI 비서
+jane.ai@kdis.ac.kr"""
+
 # Specialized Agents
 class JaneAgents:
     """Jane.ai Agent system"""
     
-    def __init__(self):
+    def __init__(self, vacation_batcher: Optional[VacationBatcher] = None, api_key: str = "",
+                 base_url: str = "", tracing: bool = True, usage_store: Optional[UsageStore] = None):
+        # 인스턴스마다 자신의 포털 백엔드를 사용 (도구는 JaneRunContext로 받음)
+        self._vacation_batcher = vacation_batcher
+        
+        # OpenAI 호환 엔드포인트 사용 시 기본 클라이언트 교체 (키가 없으면 OPENAI_API_KEY 사용)
+        if base_url:
+            from openai import AsyncOpenAI
+            set_default_openai_client(AsyncOpenAI(api_key=api_key or None, base_url=base_url), use_for_tracing=False)
+        if not tracing:
+            set_tracing_disabled(True)
+        
+        self.usage_store = usage_store
         self.setup_agents()
     
+    @property
+    def vacation_batcher(self) -> VacationBatcher:
+        """Portal submitter of this instance, creating a default one on first use"""
+        if self._vacation_batcher is None:
+            self._vacation_batcher = VacationBatcher(VacationService())
+        return self._vacation_batcher
+    
     def setup_agents(self):
         """Initialize all specialized agents"""
         
@@ -177,6 +364,7 @@ class JaneAgents:
             4. 문서 작성 가이드라인 안내
             
             KDI School의 공식 문서 형식과 절차를 준수하여 작성합니다.
+            첨부 파일의 추출된 텍스트가 함께 주어지면 그 내용을 바탕으로 해석하고 번역합니다.
             """
         )
         
@@ -244,16 +432,40 @@ class JaneAgents:
             str: Generated response
         """
         try:
-            with trace("Jane.ai Email Processing"):
+            run_context = JaneRunContext(
+                sender_email=extract_sender_email(email_context.get('sender', '')),
+                email_uid=email_context.get('uid') or "",
+                subject=email_context.get('subject') or "",
+                vacation_batcher=self.vacation_batcher
+            )
+            
+            # Step 0: Rule-based fast path for fully specified vacation requests
+            fast_path_response = await self._try_vacation_fast_path(user_message, run_context)
+            if fast_path_response:
+                tracing.set_trace_attribute('route', 'vacation_fast_path')
+                return fast_path_response
+            
+            attachments = email_context.get('attachments') or []
+            attachment_list = format_attachments(attachments, with_text=False)
+            
+            hooks = ToolSpanHooks()
+            with trace("Jane.ai Email Processing", group_id=email_context.get('uid')):
                 # Step 1: Intent Analysis
                 logger.info("사용자 의도 분석 시작...")
-                intent_result = await Runner.run(
-                    self.intent_agent, 
-                    f"다음 이메일 내용의 의도를 분석하세요:\n\n{user_message}"
-                )
-                
+                with timed('intent'):
+                    intent_result = await Runner.run(
+                        self.intent_agent, 
+                        f"다음 이메일 내용의 의도를 분석하세요:\n\n{user_message}"
+                        + (f"\n\n첨부 파일:\n{attachment_list}" if attachment_list else ""),
+                        context=run_context,
+                        hooks=hooks
+                    )
                 intent = intent_result.final_output
+                run_context.intent = intent.intent_type
+                self._record_usage(self.intent_agent, intent_result, run_context)
                 logger.info(f"의도 분석 결과: {intent.intent_type} (신뢰도: {intent.confidence})")
+                tracing.set_trace_attribute('intent', intent.intent_type)
+                tracing.set_trace_attribute('intent_confidence', intent.confidence)
                 
                 # Step 2: Route to appropriate agent
                 agent_input = f"""
@@ -271,16 +483,30 @@ class JaneAgents:
                 # Route based on intent
                 if intent.intent_type == "vacation":
                     logger.info("휴가 전문 에이전트로 라우팅...")
-                    result = await Runner.run(self.vacation_agent, agent_input)
+                    specialist = self.vacation_agent
                 elif intent.intent_type == "document":
                     logger.info("문서 전문 에이전트로 라우팅...")
-                    result = await Runner.run(self.document_agent, agent_input)
+                    specialist = self.document_agent
                 elif intent.intent_type == "information":
                     logger.info("정보 제공 에이전트로 라우팅...")
-                    result = await Runner.run(self.information_agent, agent_input)
+                    specialist = self.information_agent
                 else:
                     logger.info("메인 오케스트레이터로 처리...")
-                    result = await Runner.run(self.main_agent, agent_input)
+                    specialist = self.main_agent
+                
+                conversation = email_context.get('conversation')
+                if conversation:
+                    agent_input += f"\n이전 대화 (참고용, 오래된 순):\n{conversation}\n"
+                
+                # 첨부 파일 본문은 문서를 다루는 에이전트에만 전달 (다른 에이전트는 파일 목록만)
+                if attachments:
+                    reads_documents = specialist in (self.document_agent, self.main_agent)
+                    agent_input += f"\n첨부 파일:\n{format_attachments(attachments, with_text=reads_documents)}\n"
+                
+                tracing.set_trace_attribute('route', specialist.name)
+                with timed('specialist'):
+                    result = await Runner.run(specialist, agent_input, context=run_context, hooks=hooks)
+                self._record_usage(specialist, result, run_context)
                 
                 response = result.final_output
                 logger.info("에이전트 처리 완료")
@@ -291,6 +517,54 @@ class JaneAgents:
             logger.error(f"에이전트 처리 중 오류: {e}")
             return self._get_fallback_response()
     
+    def _record_usage(self, agent: Agent, result, run_context: JaneRunContext):
+        """Feed an agent run's token usage to the metrics and the per-email usage store"""
+        usage = result.context_wrapper.usage
+        record_usage(agent.name, usage)
+        if self.usage_store is None or not usage.requests:
+            return
+        self.usage_store.record(UsageRecord(
+            agent=agent.name,
+            model=agent.model if isinstance(agent.model, str) else DEFAULT_MODEL,
+            requests=usage.requests,
+            input_tokens=usage.input_tokens,
+            cached_tokens=usage.input_tokens_details.cached_tokens or 0,
+            output_tokens=usage.output_tokens,
+            email_uid=run_context.email_uid,
+            subject=run_context.subject,
+            sender_domain=run_context.sender_email.rpartition('@')[2].lower(),
+            intent=run_context.intent
+        ))
+    
+    async def _try_vacation_fast_path(self, user_message: str, run_context: JaneRunContext) -> Optional[str]:
+        """Submit fully specified vacation requests without any model call"""
+        parsed = parse_vacation_request(user_message)
+        if not parsed.is_complete:
+            return None
+        
+        logger.info(f"규칙 기반 휴가 신청 처리 (모델 호출 생략): {parsed.start_date} ~ {parsed.end_date}")
+        result = await _submit_vacation(
+            run_context.vacation_batcher,
+            parsed.start_date, parsed.end_date, parsed.vacation_type, parsed.reason, run_context.sender_email
+        )
+        
+        # 중복/검증 실패에 '다시 요청해 달라'는 실패 안내를 보내면 중복 신청을 부르게 됨
+        if result.get("duplicate"):
+            template = VACATION_ALREADY_SUBMITTED_TEMPLATE if result.get("success") else VACATION_IN_PROGRESS_TEMPLATE
+        elif result.get("invalid"):
+            template = VACATION_INVALID_TEMPLATE
+        elif result.get("success"):
+            template = VACATION_SUBMITTED_TEMPLATE
+        else:
+            template = VACATION_FAILED_TEMPLATE
+        return template.format(
+            start_date=parsed.start_date,
+            end_date=parsed.end_date,
+            vacation_type=VACATION_TYPE_NAMES.get(parsed.vacation_type, parsed.vacation_type),
+            reason=parsed.reason,
+            message=result.get("message", "")
+        )
+    
     def _get_fallback_response(self) -> str:
         """Fallback response in case of errors"""
         return """안녕하세요, Jane.ai입니다.
@@ -2,13 +2,31 @@
 Main Jane.ai application
 """
 import time
-from typing import List
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Deque, Dict, List, Optional, Set
 
+from ..models.conversation_models import ConversationTurn
 from ..models.email_models import EmailInfo, ProcessingContext
 from ..services.email_monitor import EmailMonitor
 from ..services.email_sender import EmailSender
 from ..services.ai_service import AIService
+from ..services.attachment_extractor import AttachmentExtractor
+from ..services.conversation_store import ConversationStore, thread_key
+from ..services.browser_pool import BrowserPool
+from ..services.portal_cookies import PortalCookieStore
+from ..services.portal_http import HttpVacationBackend
+from ..services.vacation_service import VacationService
+from ..services.vacation_batcher import VacationBatcher
+from ..services.vacation_ledger import VacationLedger
+from ..services.usage_store import UsageStore
 from ..utils.logging_utils import get_logger
+from ..utils.email_utils import extract_sender_email
+from ..utils.metrics import EMAILS, MetricsServer, timed
+from ..utils.mime_stream import release_payloads
+from ..utils.pricing import parse_prices
+from ..utils import tracing
 from config.config import AppConfig
 
 logger = get_logger('application')
@@ -24,22 +42,130 @@ class JaneAIApplication:
             email_address=config.email.address,
             app_password=config.email.app_password,
             imap_server=config.email.imap_server,
-            imap_port=config.email.imap_port
+            imap_port=config.email.imap_port,
+            use_ssl=config.email.imap_ssl,
+            keep_attachments=config.attachment_workers > 0,
+            exclude_headers=config.email.exclude_headers,
+            gmail_raw=config.email.gmail_raw,
+            replied_label=config.email.gmail_replied_label,
+            timeout=config.email.imap_timeout,
+            keepalive_interval=config.email.imap_keepalive,
+            reconnect_delay=config.email.imap_reconnect_delay,
+            reconnect_max_delay=config.email.imap_reconnect_max_delay
         )
         
         self.email_sender = EmailSender(
             email_address=config.email.address,
             app_password=config.email.app_password,
             smtp_server=config.email.smtp_server,
-            smtp_port=config.email.smtp_port
+            smtp_port=config.email.smtp_port,
+            use_starttls=config.email.smtp_starttls
         )
         
+        cookie_store = None
+        if config.portal.cookie_path:
+            cookie_store = PortalCookieStore(
+                path=config.portal.cookie_path,
+                key=config.portal.cookie_key,
+                username=config.portal.username,
+                password=config.portal.password
+            )
+        
+        self.browser_pool = BrowserPool(
+            username=config.portal.username,
+            password=config.portal.password,
+            base_url=config.portal.base_url,
+            size=config.portal.browser_pool_size,
+            max_uses=config.portal.browser_max_uses,
+            headless=config.portal.headless,
+            cookie_store=cookie_store
+        )
+        
+        http_backend = None
+        if config.portal.backend == "http":
+            http_backend = HttpVacationBackend(
+                username=config.portal.username,
+                password=config.portal.password,
+                base_url=config.portal.base_url,
+                form_url=config.portal.form_url,
+                cookie_store=cookie_store
+            )
+        
+        self.vacation_service = VacationService(
+            username=config.portal.username,
+            password=config.portal.password,
+            pool=self.browser_pool,
+            http_backend=http_backend
+        )
+        
+        self.vacation_ledger = VacationLedger(
+            path=config.portal.ledger_path,
+            pending_timeout=config.portal.pending_timeout
+        )
+        
+        self.vacation_batcher = VacationBatcher(
+            self.vacation_service,
+            window=config.portal.batch_window,
+            max_batch_size=config.portal.batch_max_size,
+            ledger=self.vacation_ledger
+        )
+        
+        self.usage_store = None
+        if config.ai.usage_path:
+            self.usage_store = UsageStore(path=config.ai.usage_path, prices=parse_prices(config.ai.model_prices))
+        
         self.ai_service = AIService(
             api_key=config.ai.openai_api_key,
             model=config.ai.model,
             max_tokens=config.ai.max_tokens,
-            temperature=config.ai.temperature
+            temperature=config.ai.temperature,
+            base_url=config.ai.base_url,
+            tracing=config.ai.tracing,
+            vacation_batcher=self.vacation_batcher,
+            usage_store=self.usage_store
+        )
+        
+        # 첨부 파일 파싱은 별도 프로세스에서 (IMAP 스레드는 작업을 넘기기만 함)
+        self.attachment_extractor: Optional[AttachmentExtractor] = None
+        if config.attachment_workers > 0:
+            self.attachment_extractor = AttachmentExtractor(
+                max_workers=config.attachment_workers,
+                max_bytes=config.attachment_max_bytes,
+                timeout=config.attachment_timeout,
+                max_chars=config.attachment_max_chars,
+                cache_size=config.attachment_cache_size
+            )
+        
+        self.conversation_store: Optional[ConversationStore] = None
+        if config.conversation_path:
+            self.conversation_store = ConversationStore(path=config.conversation_path)
+            try:
+                self.conversation_store.migrate_json(config.conversation_json_path)
+            except Exception as e:
+                logger.error(f"대화 기록 이전 실패: {e}")
+        
+        # AI 답변 생성/전송은 워커 스레드에서 병렬 처리 (IMAP 작업은 메인 스레드 전용)
+        self._workers = ThreadPoolExecutor(
+            max_workers=config.max_concurrent_emails,
+            thread_name_prefix="jane-email"
         )
+        self._in_flight: Set[Future] = set()
+        self._in_flight_lock = threading.Lock()
+        # 스레드 키 -> 앞선 답변이 끝나길 기다리는 같은 스레드의 이메일 (키가 있으면 답변 진행 중)
+        self._thread_queues: Dict[str, Deque[ProcessingContext]] = {}
+        self._prewarm_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        
+        tracing.configure_tracing(
+            path=config.trace_path,
+            max_bytes=config.trace_max_bytes,
+            backups=config.trace_backups,
+            otlp_endpoint=config.trace_otlp_endpoint
+        )
+        
+        self.metrics_server: Optional[MetricsServer] = None
+        if config.metrics_port:
+            self.metrics_server = MetricsServer(host=config.metrics_host, port=config.metrics_port)
     
     def start(self):
         """Start the Jane.ai email monitoring application"""
@@ -47,21 +173,75 @@ class JaneAIApplication:
         logger.info(f"{self.config.check_interval}초마다 새 이메일을 확인합니다.")
         logger.info("종료하려면 Ctrl+C를 누르세요.")
         
+        if self.metrics_server is not None:
+            self.metrics_server.start()
+        
         if not self.email_monitor.connect():
             logger.error("이메일 서버 연결에 실패했습니다.")
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
             return
         
+        # 포털 브라우저 세션은 백그라운드에서 준비 (IMAP 모니터링 시작을 지연시키지 않음)
+        if self.config.portal.browser_prewarm and self.config.portal.backend != "http":
+            self._prewarm_thread = threading.Thread(
+                target=self._prewarm_browser_pool, name="jane-browser-prewarm", daemon=True
+            )
+            self._prewarm_thread.start()
+        
         try:
-            while True:
+            while not self._stop_event.is_set():
                 self._process_new_emails()
-                time.sleep(self.config.check_interval)
+                self._idle(self.config.check_interval)
                 
         except KeyboardInterrupt:
             logger.info("사용자가 모니터링을 중단했습니다.")
         except Exception as e:
             logger.error(f"애플리케이션 실행 중 오류 발생: {e}")
         finally:
+            self.wait_for_pending()
+            self._workers.shutdown(wait=True)
+            self.email_monitor.flush_flags()
+            if self.attachment_extractor is not None:
+                self.attachment_extractor.shutdown()
             self.email_monitor.disconnect()
+            self.ai_service.close()
+            self.vacation_batcher.shutdown()
+            self.vacation_ledger.close()
+            if self.usage_store is not None:
+                self.usage_store.close()
+            if self.conversation_store is not None:
+                self.conversation_store.close()
+            if self._prewarm_thread is not None:
+                self._prewarm_thread.join(timeout=30)
+            self.browser_pool.shutdown()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+            tracing.tracer.shutdown()
+    
+    def _idle(self, seconds: float):
+        """Wait until the next poll, keeping the IMAP session alive and reconnecting it meanwhile"""
+        deadline = time.monotonic() + seconds
+        while not self._stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self._stop_event.wait(min(remaining, self.email_monitor.seconds_until_maintenance()))
+            was_connected = self.email_monitor.connected
+            if self.email_monitor.keepalive() and not was_connected:
+                # 다시 연결되면 기다리지 않고 끊긴 동안 온 메일부터 확인
+                return
+    
+    def stop(self):
+        """Ask the monitoring loop to finish; start() then waits for in-flight replies and cleans up"""
+        self._stop_event.set()
+    
+    def _prewarm_browser_pool(self):
+        """Resolve the driver and log in browser sessions ahead of the first vacation request"""
+        try:
+            self.browser_pool.start()
+        except Exception as e:
+            logger.warning(f"브라우저 풀 준비 실패 (휴가 신청 시 다시 시도합니다): {e}")
     
     def _process_new_emails(self):
         """Process new emails"""
@@ -70,41 +250,186 @@ class JaneAIApplication:
             
             if new_emails:
                 logger.info(f"새 이메일 {len(new_emails)}개가 도착했습니다!")
+                EMAILS.inc(len(new_emails), result="received")
                 for email_info in new_emails:
                     self._process_single_email(email_info)
             else:
                 logger.info("새 이메일이 없습니다.")
+            
+            # 이번 배치의 읽음 표시와 지난 폴링 이후 끝난 답변의 결과 플래그를 한 번에 전송
+            self.email_monitor.flush_flags()
         
         except Exception as e:
             logger.error(f"이메일 처리 중 오류: {e}")
     
     def _process_single_email(self, email_info: EmailInfo):
-        """Process a single email"""
+        """Prepare a single email on the IMAP thread and hand it to a worker"""
+        # 이메일 한 통의 IMAP/AI/SMTP 작업을 하나의 트레이스로 묶음 (루트 스팬은 _respond에서 종료)
+        root = tracing.tracer.start_trace(
+            "email", uid=email_info.uid, sender_domain=extract_sender_email(email_info.sender).rpartition('@')[2]
+        )
+        dispatched = False
+        context = None
         try:
-            logger.info(f"- 제목: {email_info.subject}")
-            logger.info(f"  발신자: {email_info.sender}")
-            logger.info(f"  날짜: {email_info.date}")
-            logger.info("-" * 50)
-            
-            # 이메일을 읽음으로 처리
-            uid_bytes = email_info.uid.encode()
-            if not self.email_monitor.mark_as_read(uid_bytes):
-                logger.warning(f"이메일 읽음 처리 실패: {email_info.uid}")
-                return
-            
-            # 처리 컨텍스트 생성
-            context = self.email_monitor.create_processing_context(email_info)
-            
-            logger.info("AI 답변 생성 중...")
-            
-            # AI 답변 생성
-            ai_response = self.ai_service.generate_response(context)
+            with tracing.activate(root):
+                logger.info(f"- 제목: {email_info.subject}")
+                logger.info(f"  발신자: {email_info.sender}")
+                logger.info(f"  날짜: {email_info.date}")
+                logger.info("-" * 50)
+                
+                # 이메일을 읽음으로 처리 (배치가 끝날 때 UID STORE 한 번으로 전송)
+                self.email_monitor.queue_flags(email_info.uid, ['\\Seen'])
+                
+                # 처리 컨텍스트 생성
+                context = self.email_monitor.create_processing_context(email_info)
+                context.trace_span = root
+                context.thread_key = self._resolve_thread_key(context)
+                if self.attachment_extractor is not None:
+                    context.pending_attachments = self.attachment_extractor.submit(context.original_email_obj)
+                context.dispatched_at = time.time()
             
-            # AI 답변 전송
-            if self.email_sender.send_reply(context, ai_response):
-                logger.info(f"AI 답변을 전송했습니다: {context.sender_email}")
-            else:
-                logger.error(f"AI 답변 전송 실패: {context.sender_email}")
+            # AI 답변 생성과 전송은 워커에서 진행
+            self._dispatch(context)
+            dispatched = True
+        
+        except Exception as e:
+            logger.error(f"개별 이메일 처리 중 오류: {e}")
+            if root is not None:
+                root.record_error(e)
+        finally:
+            if not dispatched:
+                if context is not None:
+                    release_payloads(context.original_email_obj)
+                if root is not None:
+                    root.end()
+    
+    def _respond(self, context: ProcessingContext):
+        """Generate and send the AI reply for a prepared email (runs on a worker thread)"""
+        root = context.trace_span
+        try:
+            with tracing.activate(root):
+                if root is not None and context.dispatched_at is not None:
+                    # 워커 대기 시간은 지난 구간이므로 시작 시각을 지정해 바로 종료
+                    tracing.tracer.start_span("queue_wait", start_time=context.dispatched_at).end()
+                
+                if context.pending_attachments:
+                    with timed('attachments'):
+                        context.attachments = self.attachment_extractor.collect(context.pending_attachments)
+                    context.pending_attachments = []
+                # 임시 파일로 내린 첨부 원본은 텍스트 추출 후 바로 삭제
+                release_payloads(context.original_email_obj)
+                
+                if self.conversation_store is not None and context.thread_key:
+                    # 이전 대화는 인용문을 다시 파싱하지 않고 저장소에서 조회
+                    with timed('history'):
+                        context.prior_turns = self.conversation_store.recent_turns(
+                            context.thread_key, self.config.conversation_turns
+                        )
+                    self._record_turn(context, context.email_content.current_message, is_user=True)
+                
+                logger.info("AI 답변 생성 중...")
+                
+                # AI 답변 생성
+                with timed('generate'):
+                    ai_response = self.ai_service.generate_response(context)
+                
+                # AI 답변 전송
+                if self.email_sender.send_reply(context, ai_response):
+                    logger.info(f"AI 답변을 전송했습니다: {context.sender_email}")
+                    EMAILS.inc(result="replied")
+                    self.email_monitor.mark_outcome(context.email_info.uid, replied=True)
+                    if self.conversation_store is not None and context.thread_key:
+                        # 사용자가 이 답장에 회신하면 In-Reply-To로 바로 스레드를 찾음
+                        self.conversation_store.index_message(context.reply_message_id, context.thread_key)
+                    self._record_turn(context, ai_response, is_user=False)
+                else:
+                    logger.error(f"AI 답변 전송 실패: {context.sender_email}")
+                    EMAILS.inc(result="send_failed")
+                    self.email_monitor.mark_outcome(context.email_info.uid, replied=False)
+                    if root is not None:
+                        root.record_error("send_reply failed")
         
         except Exception as e:
-            logger.error(f"개별 이메일 처리 중 오류: {e}")
\ No newline at end of file
+            logger.error(f"개별 이메일 처리 중 오류: {e}")
+            EMAILS.inc(result="error")
+            self.email_monitor.mark_outcome(context.email_info.uid, replied=False)
+            if root is not None:
+                root.record_error(e)
+        finally:
+            release_payloads(context.original_email_obj)
+            if root is not None:
+                root.end()
+    
+    def _record_turn(self, context: ProcessingContext, content: str, is_user: bool):
+        """Append an inbound or outbound message to the thread's conversation record"""
+        if self.conversation_store is None or not context.thread_key:
+            return
+        self.conversation_store.append_turn(
+            context.thread_key,
+            context.sender_email or "",
+            context.email_info.subject,
+            ConversationTurn(
+                sender=context.sender_email if is_user else self.config.email.address,
+                content=content,
+                is_user=is_user,
+                email_uid=context.email_info.uid if is_user else "",
+                message_id=(context.email_info.message_id if is_user else context.reply_message_id) or ""
+            )
+        )
+    
+    def _resolve_thread_key(self, context: ProcessingContext) -> str:
+        """Thread of an email from its Message-ID/In-Reply-To/References (or Gmail thread ID)"""
+        email_info = context.email_info
+        fallback = thread_key(context.sender_email or "", email_info.subject)
+        if self.conversation_store is None:
+            return fallback
+        return self.conversation_store.resolve_thread(
+            email_info.message_id,
+            email_info.in_reply_to,
+            email_info.references,
+            email_info.gm_thread_id,
+            fallback,
+            context.sender_email or ""
+        )
+    
+    def _dispatch(self, context: ProcessingContext):
+        """Submit a prepared email to the workers, behind any earlier email of the same thread"""
+        key = context.thread_key
+        with self._in_flight_lock:
+            if key is not None and key in self._thread_queues:
+                # 같은 스레드는 순서대로 답변 (이전 턴이 기록된 뒤에 다음 답변 생성)
+                self._thread_queues[key].append(context)
+                return
+            future = self._workers.submit(self._respond, context)
+            self._in_flight.add(future)
+            if key is not None:
+                self._thread_queues[key] = deque()
+        future.add_done_callback(lambda done: self._on_response_done(done, key))
+    
+    def _on_response_done(self, future: Future, key: Optional[str]):
+        """Release a finished reply and start the next queued email of its thread"""
+        next_future = None
+        with self._in_flight_lock:
+            # 다음 작업을 등록한 뒤에 이전 작업을 지우므로 wait_for_pending이 중간에 끝나지 않음
+            queue = self._thread_queues.get(key) if key is not None else None
+            if queue:
+                next_future = self._workers.submit(self._respond, queue.popleft())
+                self._in_flight.add(next_future)
+            elif key is not None:
+                self._thread_queues.pop(key, None)
+            self._in_flight.discard(future)
+        if next_future is not None:
+            next_future.add_done_callback(lambda done: self._on_response_done(done, key))
+    
+    def wait_for_pending(self, timeout: float = None) -> bool:
+        """Wait until every dispatched email has been answered"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._in_flight_lock:
+                pending = list(self._in_flight)
+            if not pending:
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            wait(pending, timeout=remaining)
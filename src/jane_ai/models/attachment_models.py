@@ -0,0 +1,16 @@
+"""
+Attachment data models
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class AttachmentText:
+    """Text extracted from one email attachment"""
+    filename: str
+    content_type: str
+    size: int  # bytes of the decoded attachment
+    sha256: str
+    text: str = ""
+    truncated: bool = False
+    error: Optional[str] = None  # why no text was extracted (too large, unsupported, timeout, ...)
@@ -0,0 +1,15 @@
+"""
+Conversation data models
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+
+@dataclass
+class ConversationTurn:
+    """One inbound or outbound message of a thread (same fields as the old conversations.json)"""
+    sender: str
+    content: str
+    is_user: bool
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    email_uid: str = ""
+    message_id: str = ""
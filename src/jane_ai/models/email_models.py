@@ -1,11 +1,17 @@
 """
 Email data models
 """
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
 from datetime import datetime
 from email.message import Message
 
+if TYPE_CHECKING:
+    from ..services.attachment_extractor import PendingAttachment
+    from .attachment_models import AttachmentText
+    from .conversation_models import ConversationTurn
+    from ..utils.tracing import Span
+
 @dataclass
 class EmailInfo:
     """Email information data model"""
@@ -16,6 +22,7 @@ class EmailInfo:
     message_id: Optional[str] = None
     in_reply_to: Optional[str] = None
     references: Optional[str] = None
+    gm_thread_id: Optional[str] = None  # Gmail X-GM-THRID, when the server supports it
 
 @dataclass
 class EmailContent:
@@ -42,6 +49,13 @@ class ProcessingContext:
     email_content: EmailContent
     original_email_obj: Optional[Message] = None
     sender_email: Optional[str] = None
+    trace_span: Optional['Span'] = None  # root span of this email's trace
+    dispatched_at: Optional[float] = None  # epoch seconds when handed to a worker
+    pending_attachments: List['PendingAttachment'] = field(default_factory=list)  # queued on the IMAP thread
+    attachments: List['AttachmentText'] = field(default_factory=list)  # collected on the worker
+    thread_key: Optional[str] = None  # conversation store key
+    prior_turns: List['ConversationTurn'] = field(default_factory=list)  # earlier turns of the thread
+    reply_message_id: Optional[str] = None  # Message-ID of the sent reply
     
     def __post_init__(self):
         if self.sender_email is None and self.email_info:
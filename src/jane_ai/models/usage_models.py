@@ -0,0 +1,22 @@
+"""
+Model usage data models
+"""
+from dataclasses import dataclass, field
+from typing import Optional
+import time
+
+@dataclass
+class UsageRecord:
+    """Token usage of one agent run or chat completion, attributed to an email"""
+    agent: str  # agent name, or "chat_fallback" for the plain chat completion path
+    model: str
+    requests: int = 0
+    input_tokens: int = 0  # includes cached_tokens
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: Optional[float] = None  # None when the model has no known price
+    email_uid: str = ""
+    subject: str = ""
+    sender_domain: str = ""
+    intent: str = ""  # vacation | document | information | general, empty when not classified
+    created_at: float = field(default_factory=time.time)
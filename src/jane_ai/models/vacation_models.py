@@ -0,0 +1,29 @@
+"""
+Vacation data models
+"""
+from dataclasses import dataclass
+
+@dataclass
+class VacationRequest:
+    """Vacation request data model (validated like the former pydantic model: strings stay strings, days_count becomes an int)"""
+    start_date: str  # Format: YYYY-MM-DD
+    end_date: str    # Format: YYYY-MM-DD
+    vacation_type: str = "01"  # 01: 연가 (Annual Leave)
+    days_count: int = 1
+    reason: str = "개인 사유"
+    requester: str = ""  # Sender email, used only for duplicate detection
+    
+    def __post_init__(self):
+        for name in ('start_date', 'end_date', 'vacation_type', 'reason', 'requester'):
+            value = getattr(self, name)
+            if not isinstance(value, str):
+                raise ValueError(f"{name}은(는) 문자열이어야 합니다: {value!r}")
+        
+        # pydantic과 같이 정수 또는 정수 문자열("2")만 허용
+        days_count = self.days_count
+        if isinstance(days_count, bool) or not isinstance(days_count, (int, str)):
+            raise ValueError(f"days_count는 정수여야 합니다: {days_count!r}")
+        try:
+            self.days_count = int(days_count)
+        except ValueError:
+            raise ValueError(f"days_count는 정수여야 합니다: {days_count!r}") from None
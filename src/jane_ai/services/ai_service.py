@@ -1,32 +1,44 @@
 """
 AI service for generating email responses using Agent system
 """
-from openai import OpenAI
 from ..models.email_models import ProcessingContext
+from ..models.usage_models import UsageRecord
 from ..utils.logging_utils import get_logger
+from ..utils.attachment_text import format_attachments
 from ..utils.email_utils import extract_email_body, separate_current_message_from_thread
-from ..agents.jane_agents import JaneAgents
+from .conversation_store import format_turns
+from .usage_store import UsageStore
+from .vacation_batcher import VacationBatcher
+from typing import Optional
 import asyncio
+import threading
 
 logger = get_logger('ai_service')
 
 class AIService:
     """AI service for generating intelligent email responses using Agent system"""
     
-    def __init__(self, api_key: str, model: str = "gpt-4o", max_tokens: int = 1000, temperature: float = 0.7):
-        # Keep OpenAI client for fallback
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, model: str = "gpt-4o", max_tokens: int = 1000, temperature: float = 0.7,
+                 base_url: str = "", tracing: bool = True,
+                 vacation_batcher: Optional[VacationBatcher] = None,
+                 usage_store: Optional[UsageStore] = None):
+        # openai / openai-agents are imported on first use (see client, jane_agents)
+        self.api_key = api_key
+        self.base_url = base_url
+        self.tracing = tracing
+        self._client = None
+        self._jane_agents = None
+        self._agents_initialized = False
+        self._agents_lock = threading.Lock()
+        self._vacation_batcher = vacation_batcher
+        self.usage_store = usage_store
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
         
-        # Initialize Agent system
-        try:
-            self.jane_agents = JaneAgents()
-            logger.info("에이전트 시스템 초기화 완료")
-        except Exception as e:
-            logger.error(f"에이전트 시스템 초기화 실패: {e}")
-            self.jane_agents = None
+        # Shared event loop for agent runs (one background thread for all emails)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
         
         # Jane.ai 시스템 프롬프트
         self.system_prompt = """당신은 Jane.ai, 한국개발연구원 국제정책대학원(KDI School)의 전문 이메일 응답 AI입니다.
@@ -58,6 +70,35 @@ class AIService:
 
 모든 응답은 "안녕하세요, Jane.ai입니다."로 시작하고, "추가 문의사항이 있으시면 언제든 연락주세요."로 마무리해주세요."""
     
+    @property
+    def client(self):
+        """OpenAI client for the fallback path, created on first use"""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key, base_url=self.base_url or None)
+        return self._client
+    
+    @property
+    def jane_agents(self):
+        """Agent system, initialized on first use"""
+        with self._agents_lock:
+            if not self._agents_initialized:
+                self._agents_initialized = True
+                try:
+                    from ..agents.jane_agents import JaneAgents
+                    self._jane_agents = JaneAgents(
+                        vacation_batcher=self._vacation_batcher,
+                        api_key=self.api_key,
+                        base_url=self.base_url,
+                        tracing=self.tracing,
+                        usage_store=self.usage_store
+                    )
+                    logger.info("에이전트 시스템 초기화 완료")
+                except Exception as e:
+                    logger.error(f"에이전트 시스템 초기화 실패: {e}")
+                    self._jane_agents = None
+            return self._jane_agents
+    
     def generate_response(self, context: ProcessingContext) -> str:
         """Generate AI response based on processing context using Agent system"""
         try:
@@ -72,6 +113,21 @@ class AIService:
             logger.error(f"AI 답변 생성 실패: {e}")
             return self._get_fallback_response()
     
+    def _get_event_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the shared agent event loop, starting its thread on first use"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="jane-agents", daemon=True).start()
+            return self._loop
+    
+    def close(self):
+        """Stop the shared agent event loop"""
+        with self._loop_lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+    
     def _generate_agent_response(self, context: ProcessingContext) -> str:
         """Generate response using Agent system"""
         try:
@@ -79,22 +135,21 @@ class AIService:
             
             # Email context for agents
             email_context = {
+                'uid': context.email_info.uid,
                 'sender': context.email_info.sender,
                 'subject': context.email_info.subject,
                 'date': context.email_info.date,
-                'thread_history': context.email_content.thread_history
+                'thread_history': context.email_content.thread_history,
+                'conversation': format_turns(context.prior_turns),
+                'attachments': context.attachments
             }
             
-            # Run agent processing (synchronous wrapper for async)
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                response = loop.run_until_complete(
-                    self.jane_agents.process_email(current_message, email_context)
-                )
-                return response
-            finally:
-                loop.close()
+            # Run agent processing on the shared loop (synchronous wrapper for async)
+            future = asyncio.run_coroutine_threadsafe(
+                self.jane_agents.process_email(current_message, email_context),
+                self._get_event_loop()
+            )
+            return future.result()
                 
         except Exception as e:
             logger.error(f"에이전트 응답 생성 실패: {e}")
@@ -105,7 +160,10 @@ class AIService:
         try:
             # 현재 메시지와 이전 대화 분리
             current_message = context.email_content.current_message
-            thread_history = context.email_content.thread_history
+            # 저장된 이전 대화가 있으면 사용하고, 없을 때만 인용문에서 분리한 내용 사용
+            thread_history = format_turns(context.prior_turns) or context.email_content.thread_history
+            if context.attachments:
+                current_message += f"\n\n## 첨부 파일\n{format_attachments(context.attachments)}"
             
             # 사용자 메시지 구성
             if thread_history:
@@ -154,6 +212,7 @@ class AIService:
             )
             
             ai_response = response.choices[0].message.content.strip()
+            self._record_usage(context, response)
             
             logger.info("OpenAI 답변 생성 완료")
             return ai_response
@@ -162,6 +221,24 @@ class AIService:
             logger.error(f"OpenAI 답변 생성 실패: {e}")
             raise e
     
+    def _record_usage(self, context: ProcessingContext, response):
+        """Store the token usage of a chat completion for this email"""
+        usage = getattr(response, 'usage', None)
+        if self.usage_store is None or usage is None:
+            return
+        details = getattr(usage, 'prompt_tokens_details', None)
+        self.usage_store.record(UsageRecord(
+            agent="chat_fallback",
+            model=getattr(response, 'model', None) or self.model,
+            requests=1,
+            input_tokens=usage.prompt_tokens or 0,
+            cached_tokens=getattr(details, 'cached_tokens', 0) or 0,
+            output_tokens=usage.completion_tokens or 0,
+            email_uid=context.email_info.uid,
+            subject=context.email_info.subject,
+            sender_domain=(context.sender_email or "").rpartition('@')[2].lower()
+        ))
+    
     def _get_fallback_response(self) -> str:
         """API 오류 시 기본 답변"""
         return """안녕하세요, Jane.ai입니다.
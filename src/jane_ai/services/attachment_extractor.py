@@ -0,0 +1,207 @@
+"""
+Attachment text extraction on a bounded process pool with a content-hash cache
+"""
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from email.message import Message
+from typing import Dict, List, Optional
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+
+from ..models.attachment_models import AttachmentText
+from ..utils.attachment_text import ExtractionTimeout, MissingDependency, attachment_kind, extract_attachment_text
+from ..utils.email_utils import decode_mime_words
+from ..utils.logging_utils import get_logger
+from ..utils.metrics import record_cache
+from ..utils.mime_stream import attachment_parts, part_payload
+
+logger = get_logger('attachment_extractor')
+
+def _copy_payload(path: str) -> str:
+    """Copy a spilled attachment to a temp file owned by the extraction (deleted when it finishes)"""
+    fd, copy = tempfile.mkstemp(prefix='jane-attach-')
+    os.close(fd)
+    try:
+        shutil.copyfile(path, copy)
+    except OSError:
+        _remove_copy(copy)
+        raise
+    return copy
+
+def _remove_copy(path: Optional[str]):
+    if path:
+        try:
+            os.unlink(path)
+        except OSError as e:
+            logger.warning(f"첨부 파일 추출용 임시 파일 삭제 실패 ({path}): {e}")
+
+@dataclass
+class PendingAttachment:
+    """An attachment handed to the pool; resolved by AttachmentExtractor.collect"""
+    attachment: AttachmentText
+    future: Optional[Future] = None  # None when already resolved (cache hit, skipped)
+
+class AttachmentExtractor:
+    """Extracts attachment text off the ingest thread; identical files are parsed once"""
+
+    def __init__(self, max_workers: int = 2, max_bytes: int = 10 * 1024 * 1024, timeout: float = 20.0,
+                 max_chars: int = 20000, cache_size: int = 256):
+        self.max_workers = max(1, max_workers)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self.cache_size = cache_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # sha256 -> (text, truncated, error) 최근 사용 순
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        # 같은 파일이 동시에 들어오면 진행 중인 작업을 공유 (작업이 읽는 임시 파일은 작업이 소유)
+        self._in_flight: Dict[str, Future] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Process pool, started on first use (spawn: the service process is multi-threaded)"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def submit(self, email_message: Optional[Message]) -> List[PendingAttachment]:
+        """
+        Queue every attachment of a message for extraction without waiting for it
+
+        Args:
+            email_message: Parsed email (None yields no attachments)
+
+        Returns:
+            List[PendingAttachment]: One entry per attachment, in message order
+        """
+        pending: List[PendingAttachment] = []
+        for part in attachment_parts(email_message):
+            filename = decode_mime_words(part.get_filename() or '')
+            try:
+                pending.append(self._submit_part(part, filename))
+            except Exception as e:
+                logger.warning(f"첨부 파일 추출 요청 실패 ({filename}): {e}")
+        return pending
+
+    def _submit_part(self, part: Message, filename: str) -> PendingAttachment:
+        content_type = part.get_content_type()
+        payload = part_payload(part)
+        attachment = AttachmentText(
+            filename=filename or "(이름 없음)",
+            content_type=content_type,
+            size=payload.size,
+            sha256=payload.sha256
+        )
+        kind = attachment_kind(filename, content_type)
+        if kind is None:
+            attachment.error = "지원하지 않는 형식"
+            return PendingAttachment(attachment)
+        if payload.size > self.max_bytes:
+            attachment.error = f"파일이 너무 큼 ({payload.size:,} bytes)"
+            return PendingAttachment(attachment)
+
+        key = attachment.sha256
+        submitted = False
+        owned: Optional[str] = None
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+            else:
+                future = self._in_flight.get(key)
+                if future is None:
+                    # 큰 첨부는 임시 파일 경로만 넘겨 작업 큐에 바이트를 쌓지 않음.
+                    # 메일의 임시 파일은 응답 후 삭제되므로, 같은 파일을 기다리는 다른 메일을 위해 작업 전용 사본을 씀
+                    source = payload.source
+                    if isinstance(source, str):
+                        owned = source = _copy_payload(source)
+                    args = (extract_attachment_text, source, kind, self.max_chars, self.timeout,
+                            part.get_content_charset())
+                    try:
+                        try:
+                            future = self._get_executor().submit(*args)
+                        except BrokenProcessPool:
+                            # 작업 프로세스가 비정상 종료된 풀은 새로 만듦
+                            logger.warning("첨부 파일 처리 프로세스 풀을 다시 시작합니다.")
+                            self._executor.shutdown(wait=False, cancel_futures=True)
+                            self._executor = None
+                            future = self._get_executor().submit(*args)
+                    except Exception:
+                        _remove_copy(owned)
+                        raise
+                    self._in_flight[key] = future
+                    submitted = True
+        record_cache('attachment_text', cached is not None)
+        if cached is not None:
+            attachment.text, attachment.truncated, attachment.error = cached
+            return PendingAttachment(attachment)
+        if submitted:
+            future.add_done_callback(lambda done: self._store(key, done, owned))
+        return PendingAttachment(attachment, future)
+
+    def _store(self, key: str, future: Future, owned: Optional[str] = None):
+        """Cache a finished extraction (timeouts, crashes, I/O errors and missing libraries are not cached, so they can be retried)"""
+        _remove_copy(owned)
+        result = None
+        if not future.cancelled():
+            error = future.exception()
+            if error is None:
+                text, truncated = future.result()
+                result = (text, truncated, None)
+            elif not isinstance(error, (ExtractionTimeout, BrokenProcessPool, OSError, MissingDependency)):
+                result = ("", False, f"추출 실패: {error}")
+                logger.warning(f"첨부 파일 텍스트 추출 실패: {error}")
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if result is not None:
+                self._cache[key] = result
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+    def collect(self, pending: List[PendingAttachment]) -> List[AttachmentText]:
+        """
+        Wait for the queued extractions (runs on the reply worker, never on the IMAP thread)
+
+        Args:
+            pending: Result of submit
+
+        Returns:
+            List[AttachmentText]: Extracted text, or the reason in error
+        """
+        futures = [item.future for item in pending if item.future is not None]
+        if futures:
+            # 작업이 풀에서 대기할 수 있으므로 워커 수 기준으로 전체 대기 시간을 잡음
+            rounds = -(-len(futures) // self.max_workers)
+            wait(futures, timeout=self.timeout * rounds + 1)
+
+        results = []
+        for item in pending:
+            attachment = item.attachment
+            future = item.future
+            if future is not None:
+                if future.cancelled():
+                    attachment.error = "추출 취소"
+                elif not future.done() or isinstance(future.exception(), ExtractionTimeout):
+                    attachment.error = "추출 시간 초과"
+                    logger.warning(f"첨부 파일 텍스트 추출 시간 초과: {attachment.filename}")
+                elif future.exception() is not None:
+                    attachment.error = f"추출 실패: {future.exception()}"
+                else:
+                    attachment.text, attachment.truncated = future.result()
+            results.append(attachment)
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,293 @@
+"""
+Pool of warm, logged-in browser sessions for KDI portal automation
+"""
+from contextlib import contextmanager
+from typing import Iterator, Optional
+import queue
+import threading
+import time
+
+from .portal_cookies import PortalCookieStore
+from ..utils.logging_utils import get_logger
+from ..utils.metrics import record_cache
+
+logger = get_logger('browser_pool')
+
+# selenium / webdriver_manager are imported on first browser use, not at startup
+
+class BrowserSetupError(Exception):
+    """Raised when a browser session cannot be launched"""
+
+class PortalLoginError(Exception):
+    """Raised when the portal login fails"""
+
+class PooledBrowser:
+    """A browser session owned by the pool"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.logged_in = False
+        self.healthy = True
+        self.main_window = driver.current_window_handle
+        self.last_used = time.monotonic()
+
+    def discard(self):
+        """Mark the session as unusable so the pool recycles it on release"""
+        self.healthy = False
+
+class BrowserPool:
+    """Pre-launched headless browser sessions, re-authenticated on expiry and recycled after N uses"""
+
+    def __init__(self, username: str = "", password: str = "",
+                 base_url: str = "https://portal.kdischool.ac.kr",
+                 size: int = 1, max_uses: int = 20, headless: bool = True,
+                 acquire_timeout: float = 300.0, probe_after: float = 60.0,
+                 cookie_store: Optional[PortalCookieStore] = None):
+        self.username = username
+        self.password = password
+        self.base_url = base_url
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.headless = headless
+        self.acquire_timeout = acquire_timeout
+        self.probe_after = probe_after
+        self.cookie_store = cookie_store
+
+        self._idle: "queue.Queue[PooledBrowser]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._driver_path: Optional[str] = None
+        self._use_edge = False
+
+    def start(self):
+        """Resolve the driver binary once and pre-launch logged-in sessions"""
+        self._resolve_driver()
+        for _ in range(self.size - self._live):
+            with self._lock:
+                self._live += 1
+            try:
+                browser = self._create_browser()
+                self._ensure_logged_in(browser)
+                self._idle.put(browser)
+            except Exception as e:
+                with self._lock:
+                    self._live -= 1
+                logger.warning(f"브라우저 세션 사전 실행 실패: {e}")
+        logger.info(f"브라우저 풀 준비 완료 ({self._idle.qsize()}/{self.size})")
+
+    def shutdown(self):
+        """Quit all idle browser sessions"""
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(browser)
+        logger.info("브라우저 풀을 종료했습니다")
+
+    @contextmanager
+    def session(self) -> Iterator[PooledBrowser]:
+        """Borrow a logged-in browser session"""
+        from selenium.common.exceptions import WebDriverException
+        
+        browser = self._acquire()
+        try:
+            self._ensure_logged_in(browser)
+            yield browser
+        except (WebDriverException, PortalLoginError):
+            browser.discard()
+            raise
+        finally:
+            self._release(browser)
+
+    def _resolve_driver(self):
+        """Resolve the WebDriver binary once (webdriver_manager hits the network)"""
+        if self._driver_path:
+            return
+        from webdriver_manager.chrome import ChromeDriverManager
+        try:
+            self._driver_path = ChromeDriverManager().install()
+        except Exception as e:
+            logger.warning(f"Chrome 드라이버 준비 실패, Edge 시도: {e}")
+            from webdriver_manager.microsoft import EdgeChromiumDriverManager
+            self._driver_path = EdgeChromiumDriverManager().install()
+            self._use_edge = True
+
+    def _create_browser(self) -> PooledBrowser:
+        """Launch a browser with anti-detection options"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        
+        try:
+            self._resolve_driver()
+            if self._use_edge:
+                from selenium.webdriver.edge.service import Service as EdgeService
+                edge_options = webdriver.EdgeOptions()
+                if self.headless:
+                    edge_options.add_argument('--headless=new')
+                driver = webdriver.Edge(service=EdgeService(self._driver_path), options=edge_options)
+            else:
+                chrome_options = webdriver.ChromeOptions()
+                if self.headless:
+                    chrome_options.add_argument('--headless=new')
+                chrome_options.add_argument('--no-sandbox')
+                chrome_options.add_argument('--disable-dev-shm-usage')
+                chrome_options.add_argument('--disable-extensions')
+                chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+                chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+                chrome_options.add_experimental_option('useAutomationExtension', False)
+                driver = webdriver.Chrome(service=Service(self._driver_path), options=chrome_options)
+                driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            logger.info("새 브라우저 세션을 시작했습니다")
+            return PooledBrowser(driver)
+        except Exception as e:
+            raise BrowserSetupError(f"브라우저 초기화 실패: {e}") from e
+
+    def _acquire(self) -> PooledBrowser:
+        """Take an idle session, launching a new one while under the pool size"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._live < self.size
+            if can_create:
+                self._live += 1
+
+        if can_create:
+            try:
+                return self._create_browser()
+            except Exception:
+                with self._lock:
+                    self._live -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise BrowserSetupError("사용 가능한 브라우저 세션이 없습니다")
+
+    def _release(self, browser: PooledBrowser):
+        """Return a session to the pool, or recycle it after crash or max uses"""
+        browser.uses += 1
+        browser.last_used = time.monotonic()
+        if browser.healthy and browser.uses < self.max_uses:
+            try:
+                self._reset(browser)
+                self._idle.put(browser)
+                return
+            except Exception as e:
+                logger.warning(f"브라우저 세션 초기화 실패, 재생성합니다: {e}")
+
+        logger.info(f"브라우저 세션을 교체합니다 (사용 횟수: {browser.uses})")
+        self._quit(browser)
+        with self._lock:
+            self._live -= 1
+
+    def _reset(self, browser: PooledBrowser):
+        """Close popup windows and return to the portal main page"""
+        driver = browser.driver
+        for handle in driver.window_handles:
+            if handle != browser.main_window:
+                driver.switch_to.window(handle)
+                driver.close()
+        driver.switch_to.window(browser.main_window)
+        driver.get(self.base_url)
+
+    def _quit(self, browser: PooledBrowser):
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            logger.warning(f"브라우저 종료 중 오류: {e}")
+
+    def _is_logged_in(self, browser: PooledBrowser) -> bool:
+        """Cheap session probe: the SSO login form is not shown"""
+        from selenium.webdriver.common.by import By
+        
+        return browser.logged_in and not browser.driver.find_elements(By.ID, "login_id")
+
+    def _ensure_logged_in(self, browser: PooledBrowser):
+        """Log in on first use and whenever the portal session has expired"""
+        if browser.logged_in and time.monotonic() - browser.last_used > self.probe_after:
+            # 오래 쉬었던 세션은 메인 페이지를 다시 열어 만료 여부 확인
+            browser.driver.get(self.base_url)
+        if self._is_logged_in(browser):
+            return
+        if not browser.logged_in and self._restore_session(browser):
+            return
+        if browser.logged_in:
+            logger.info("포털 세션이 만료되어 다시 로그인합니다")
+        browser.logged_in = self._login(browser.driver)
+        if not browser.logged_in:
+            raise PortalLoginError("포털 로그인 실패")
+        if self.cookie_store is not None:
+            self.cookie_store.save(browser.driver.get_cookies())
+
+    def _restore_session(self, browser: PooledBrowser) -> bool:
+        """Load saved cookies into a fresh browser and probe whether the session is still valid"""
+        from selenium.common.exceptions import WebDriverException
+        
+        if self.cookie_store is None:
+            return False
+        cookies = self.cookie_store.load()
+        if not cookies:
+            return False
+
+        driver = browser.driver
+        driver.get(self.base_url)
+        for cookie in cookies:
+            try:
+                driver.add_cookie(cookie)
+            except WebDriverException:
+                # 현재 도메인과 다른 쿠키 (SSO 서버 등)는 건너뜀
+                pass
+        driver.get(self.base_url)
+
+        browser.logged_in = True
+        if self._is_logged_in(browser):
+            logger.info("저장된 포털 세션을 재사용합니다 (로그인 생략)")
+            record_cache('portal_cookies', True)
+            return True
+        browser.logged_in = False
+        record_cache('portal_cookies', False)
+        logger.info("저장된 포털 세션이 만료되었습니다")
+        return False
+
+    def _login(self, driver) -> bool:
+        """Login to KDI portal"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        try:
+            driver.get(self.base_url)
+            wait = WebDriverWait(driver, 10)
+
+            username_field = wait.until(EC.presence_of_element_located((By.ID, "login_id")))
+            password_field = wait.until(EC.presence_of_element_located((By.ID, "login_pwd")))
+
+            username_field.clear()
+            username_field.send_keys(self.username)
+
+            password_field.clear()
+            password_field.send_keys(self.password)
+
+            login_submit = driver.find_element(By.XPATH, "//input[@type='submit'][@value='Login']")
+            login_submit.click()
+
+            # 로그인 폼이 사라질 때까지 대기 (SSO 리디렉션 완료)
+            wait.until(EC.staleness_of(login_submit))
+
+            current_url = driver.current_url
+            if "portal" in current_url or "main" in current_url or "dashboard" in current_url:
+                logger.info("포털 로그인 성공")
+                return True
+            else:
+                logger.error("포털 로그인 실패")
+                return False
+
+        except Exception as e:
+            logger.error(f"로그인 중 오류: {e}")
+            return False
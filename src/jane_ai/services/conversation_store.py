@@ -0,0 +1,287 @@
+"""
+SQLite store of conversation turns per thread (replaces conversations.json)
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from ..models.conversation_models import ConversationTurn
+from ..utils.email_utils import normalize_subject, parse_message_ids
+from ..utils.logging_utils import get_logger
+
+logger = get_logger('conversation_store')
+
+def thread_key(sender_email: str, subject: str) -> str:
+    """Thread key used by conversations.json: md5 of '{sender_email}_{original subject}'"""
+    return hashlib.md5(f"{sender_email.lower()}_{normalize_subject(subject)}".encode('utf-8')).hexdigest()
+
+def format_turns(turns: List[ConversationTurn], max_chars: int = 8000) -> str:
+    """
+    Render prior turns for a prompt, oldest first
+
+    Args:
+        turns: Turns in chronological order
+        max_chars: Budget; the oldest turns are dropped first when it is exceeded
+
+    Returns:
+        str: Empty when there are no turns
+    """
+    lines: List[str] = []
+    used = 0
+    for turn in reversed(turns):
+        speaker = "사용자" if turn.is_user else "Jane.ai"
+        entry = f"[{turn.timestamp[:16].replace('T', ' ')}] {speaker} ({turn.sender}):\n{turn.content.strip()}"
+        if lines and used + len(entry) > max_chars:
+            break
+        lines.append(entry)
+        used += len(entry)
+    return "\n\n".join(reversed(lines))
+
+class ConversationStore:
+    """Threads and their turns, indexed by thread key and by sender, plus a Message-ID -> thread index"""
+
+    def __init__(self, path: str = "data/conversations.db", message_cache_size: int = 10000):
+        self.path = path
+        self._lock = threading.Lock()
+        # 최근 Message-ID -> 스레드 키 (활발한 스레드는 DB 조회 없이 찾음)
+        self._message_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._message_cache_size = message_cache_size
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_key TEXT PRIMARY KEY,
+                sender_email TEXT NOT NULL,
+                original_subject TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS threads_sender ON threads (sender_email, updated_at)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS turns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                thread_key TEXT NOT NULL REFERENCES threads (thread_key),
+                timestamp TEXT NOT NULL,
+                sender TEXT NOT NULL,
+                content TEXT NOT NULL,
+                is_user INTEGER NOT NULL,
+                email_uid TEXT NOT NULL DEFAULT '',
+                message_id TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS turns_thread ON turns (thread_key, id)")
+        # Message-ID (꺾쇠 포함) 또는 'gm:<X-GM-THRID>' -> 스레드 키
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS message_threads (
+                message_id TEXT PRIMARY KEY,
+                thread_key TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def migrate_json(self, json_path: str) -> int:
+        """
+        Import conversations.json once (later calls are no-ops)
+
+        Args:
+            json_path: Path of the legacy JSON file
+
+        Returns:
+            int: Number of imported turns
+        """
+        if not json_path or not os.path.exists(json_path):
+            return 0
+        with self._lock:
+            done = self._conn.execute("SELECT value FROM store_meta WHERE key = 'json_migrated'").fetchone()
+        if done:
+            return 0
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                threads: Dict[str, dict] = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"대화 기록 JSON 읽기 실패 ({json_path}): {e}")
+            return 0
+
+        imported = 0
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key, thread in threads.items():
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO threads (thread_key, sender_email, original_subject, created_at, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, (thread.get('sender_email') or '').lower(), thread.get('original_subject') or '', now, now)
+                    )
+                    for message in thread.get('messages', []):
+                        self._conn.execute(
+                            "INSERT INTO turns (thread_key, timestamp, sender, content, is_user) VALUES (?, ?, ?, ?, ?)",
+                            (key, message.get('timestamp') or '', message.get('sender') or '',
+                             message.get('content') or '', int(bool(message.get('is_user'))))
+                        )
+                        imported += 1
+                self._conn.execute(
+                    "INSERT INTO store_meta (key, value) VALUES ('json_migrated', ?)", (json_path,)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.info(f"대화 기록 {len(threads)}개 스레드, {imported}개 메시지를 {self.path}로 옮겼습니다.")
+        return imported
+
+    def resolve_thread(self, message_id: Optional[str], in_reply_to: Optional[str], references: Optional[str],
+                       gm_thread_id: Optional[str], fallback_key: str, sender_email: str = "") -> str:
+        """
+        Find the thread of an inbound message from its headers and index its IDs
+
+        Lookup order: Gmail thread ID, In-Reply-To, then References from newest to
+        oldest. A matched thread is used only when the sender owns it or wrote in it
+        before, so forged or forwarded headers cannot pull another person's history
+        into the prompt. Messages with no usable ancestor start a thread under
+        fallback_key (the sender/subject key), so legacy threads keep their history.
+
+        Args:
+            message_id: Message-ID of the inbound message
+            in_reply_to: In-Reply-To header
+            references: References header
+            gm_thread_id: X-GM-THRID, if the server provided it
+            fallback_key: thread_key(sender, subject)
+            sender_email: Address of the inbound sender
+
+        Returns:
+            str: Thread key
+        """
+        candidates = ([f"gm:{gm_thread_id}"] if gm_thread_id else []) + parse_message_ids(in_reply_to)
+        candidates += [mid for mid in reversed(parse_message_ids(references)) if mid not in candidates]
+        key = None
+        try:
+            with self._lock:
+                key = self._lookup_locked(candidates, sender_email.lower())
+                key = key or fallback_key
+                self._index_locked(candidates + parse_message_ids(message_id), key)
+        except sqlite3.Error as e:
+            logger.error(f"스레드 색인 실패: {e}")
+        return key or fallback_key
+
+    def index_message(self, message_id: Optional[str], key: str):
+        """Map an outbound message (e.g. our reply) to its thread"""
+        ids = parse_message_ids(message_id)
+        if not ids:
+            return
+        try:
+            with self._lock:
+                self._index_locked(ids, key)
+        except sqlite3.Error as e:
+            logger.error(f"스레드 색인 실패: {e}")
+
+    def _lookup_locked(self, candidates: List[str], sender_email: str) -> Optional[str]:
+        if not candidates or not sender_email:
+            return None
+        keys: Dict[str, str] = {}
+        for candidate in candidates:
+            key = self._message_cache.get(candidate)
+            if key is not None:
+                self._message_cache.move_to_end(candidate)
+                keys[candidate] = key
+        missing = [candidate for candidate in candidates if candidate not in keys]
+        if missing:
+            keys.update(self._conn.execute(
+                f"SELECT message_id, thread_key FROM message_threads WHERE message_id IN ({', '.join('?' * len(missing))})",
+                missing
+            ).fetchall())
+        checked = set()
+        for candidate in candidates:
+            key = keys.get(candidate)
+            if key is None or key in checked:
+                continue
+            if self._is_participant_locked(key, sender_email):
+                return key
+            checked.add(key)
+            logger.warning(f"스레드 {key[:8]}의 참여자가 아닌 발신자({sender_email})의 참조를 무시합니다")
+        return None
+
+    def _is_participant_locked(self, key: str, sender_email: str) -> bool:
+        """The sender started the thread or wrote one of its inbound turns"""
+        row = self._conn.execute(
+            "SELECT 1 FROM threads WHERE thread_key = ? AND sender_email = ? "
+            "UNION ALL SELECT 1 FROM turns WHERE thread_key = ? AND is_user = 1 AND lower(sender) = ? LIMIT 1",
+            (key, sender_email, key, sender_email)
+        ).fetchone()
+        return row is not None
+
+    def _index_locked(self, ids: Iterable[str], key: str):
+        ids = list(dict.fromkeys(ids))
+        # 이미 다른 스레드로 기록된 ID는 유지 (INSERT OR IGNORE)
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO message_threads (message_id, thread_key) VALUES (?, ?)",
+            [(mid, key) for mid in ids]
+        )
+        for mid in ids:
+            self._message_cache.setdefault(mid, key)
+            self._message_cache.move_to_end(mid)
+        while len(self._message_cache) > self._message_cache_size:
+            self._message_cache.popitem(last=False)
+
+    def append_turn(self, key: str, sender_email: str, subject: str, turn: ConversationTurn):
+        """Add a turn, creating the thread on its first message"""
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.execute(
+                        "INSERT INTO threads (thread_key, sender_email, original_subject, created_at, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT (thread_key) DO UPDATE SET updated_at = excluded.updated_at",
+                        (key, sender_email.lower(), normalize_subject(subject), now, now)
+                    )
+                    self._conn.execute(
+                        "INSERT INTO turns (thread_key, timestamp, sender, content, is_user, email_uid, message_id) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key, turn.timestamp, turn.sender, turn.content, int(turn.is_user), turn.email_uid,
+                         turn.message_id)
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            logger.error(f"대화 기록 저장 실패: {e}")
+
+    def recent_turns(self, key: str, limit: int = 10) -> List[ConversationTurn]:
+        """Last turns of a thread, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sender, content, is_user, timestamp, email_uid, message_id FROM turns "
+                "WHERE thread_key = ? ORDER BY id DESC LIMIT ?",
+                (key, limit)
+            ).fetchall()
+        return [ConversationTurn(sender, content, bool(is_user), timestamp, email_uid, message_id)
+                for sender, content, is_user, timestamp, email_uid, message_id in reversed(rows)]
+
+    def threads_for_sender(self, sender_email: str, limit: int = 20) -> List[Dict]:
+        """Most recently active threads of a sender"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT thread_key, original_subject, created_at, updated_at FROM threads "
+                "WHERE sender_email = ? ORDER BY updated_at DESC LIMIT ?",
+                (sender_email.lower(), limit)
+            )
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -2,40 +2,188 @@
 Email monitoring service
 """
 import imaplib
-import email
+import random
+import re
+import threading
 from email.message import Message
 import time
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 
 from ..models.email_models import EmailInfo, EmailContent, ProcessingContext
 from ..utils.logging_utils import get_logger
+from ..utils.metrics import IMAP_RECONNECTS, timed
 from ..utils.email_utils import decode_mime_words, extract_email_body, extract_sender_email
+from ..utils.imap_search import build_search_criteria, parse_header_filters, quote, uid_sets, validate_gmail_raw
+from ..utils.mime_stream import parse_message, release_payloads
 
 logger = get_logger('email_monitor')
 
+_GM_THRID = re.compile(rb'X-GM-THRID (\d+)')
+
+# 세션이 끊어졌다는 뜻인 예외 (소켓 오류/시간 초과, 서버 BYE 등) - 다시 연결하면 복구됨
+_SESSION_ERRORS = (imaplib.IMAP4.abort, OSError)
+
 class EmailMonitor:
     """Service for monitoring incoming emails"""
     
-    def __init__(self, email_address: str, app_password: str, imap_server: str, imap_port: int):
+    # 처리 결과를 메일함에 남기는 키워드 (예: UNKEYWORD $JaneReplied 로 답하지 않은 메일 검색)
+    REPLIED_FLAG = '$JaneReplied'
+    FAILED_FLAG = '$JaneFailed'
+    # 가져오기에 실패한 메일을 다음 폴링에서 다시 시도하는 횟수 (이후에는 건너뜀)
+    MAX_FETCH_ATTEMPTS = 3
+    
+    def __init__(self, email_address: str, app_password: str, imap_server: str, imap_port: int,
+                 use_ssl: bool = True, keep_attachments: bool = True, exclude_headers: str = "",
+                 gmail_raw: str = "", replied_label: str = "", timeout: float = 60.0,
+                 keepalive_interval: float = 300.0, reconnect_delay: float = 1.0,
+                 reconnect_max_delay: float = 60.0):
         self.email_address = email_address
         self.app_password = app_password
         self.imap_server = imap_server
         self.imap_port = imap_port
+        self.use_ssl = use_ssl
+        self.keep_attachments = keep_attachments
+        # 서버에서 거르는 조건 (설정 오류는 시작 시 ValueError)
+        self.header_filters = parse_header_filters(exclude_headers)
+        self.gmail_raw = validate_gmail_raw(gmail_raw)
+        if not replied_label.isascii():
+            raise ValueError(f"Gmail 라벨 이름은 ASCII여야 합니다: {replied_label!r}")
+        self.replied_label = replied_label
+        self.timeout = timeout or None
+        self.keepalive_interval = keepalive_interval
+        self.reconnect_delay = reconnect_delay
+        self.reconnect_max_delay = reconnect_max_delay
         self.last_seen_uid = None
+        self.uid_validity: Optional[bytes] = None
         self.imap = None
+        self.gmail_extensions = False
+        # 재연결 백오프 상태와 마지막 서버 응답 시각 (NOOP keepalive 기준)
+        self.reconnect_attempts = 0
+        self._next_reconnect = 0.0
+        self._last_activity = time.monotonic()
+        # get_latest_emails에서 파싱한 메시지 (create_processing_context가 다시 가져오지 않도록)
+        self._fetched: Dict[str, Message] = {}
+        # 실패한 UID 아래에 last_seen_uid를 두는 동안: UID별 실패 횟수와 이미 반환한 그 위의 UID
+        self._fetch_failures: Dict[int, int] = {}
+        self._returned: Set[int] = set()
+        # (STORE 항목, 플래그 목록) -> UID 집합; 워커가 쌓고 IMAP 스레드가 flush_flags로 한 번에 전송
+        self._pending_flags: Dict[Tuple[str, str], Set[int]] = {}
+        self._flags_lock = threading.Lock()
     
     def connect(self) -> bool:
         """Connect to Gmail IMAP server"""
         try:
-            self.imap = imaplib.IMAP4_SSL(self.imap_server, self.imap_port)
+            imap_class = imaplib.IMAP4_SSL if self.use_ssl else imaplib.IMAP4
+            # 시간 제한이 없으면 응답 없이 끊긴 연결에서 영원히 대기함
+            self.imap = imap_class(self.imap_server, self.imap_port, timeout=self.timeout)
             self.imap.login(self.email_address, self.app_password)
+            self.gmail_extensions = 'X-GM-EXT-1' in self.imap.capabilities
             self.imap.select('INBOX')
+            self._check_uid_validity()
+            if self.gmail_raw and not self.gmail_extensions:
+                logger.warning("서버가 Gmail 확장(X-GM-EXT-1)을 지원하지 않아 Gmail 검색 조건을 적용하지 않습니다.")
+            # 검색 조건이 서버에서 거부되면 (BAD) 폴링마다 실패하므로 시작할 때 확인
+            try:
+                self._search_uids(b'*')
+            except imaplib.IMAP4.abort:
+                raise
+            except imaplib.IMAP4.error as e:
+                logger.error(f"IMAP 검색 조건이 올바르지 않습니다: {e}")
+                self._close_socket()
+                return False
+            self._last_activity = time.monotonic()
             logger.info("Gmail IMAP 서버에 성공적으로 연결되었습니다.")
             return True
         except Exception as e:
             logger.error(f"이메일 서버 연결 실패: {e}")
+            self._close_socket()
             return False
     
+    def _check_uid_validity(self):
+        """Forget last_seen_uid if the mailbox's UIDs were renumbered (UIDVALIDITY changed)"""
+        _, data = self.imap.response('UIDVALIDITY')
+        validity = data[-1] if data and data[-1] else None
+        if self.uid_validity is not None and validity is not None and validity != self.uid_validity:
+            logger.warning("INBOX UIDVALIDITY가 바뀌어 현재 최신 UID부터 다시 모니터링합니다.")
+            self.last_seen_uid = None
+            self._fetch_failures.clear()
+            self._returned.clear()
+        self.uid_validity = validity or self.uid_validity
+    
+    def _close_socket(self):
+        """Drop the connection without a LOGOUT round-trip"""
+        if self.imap is not None:
+            try:
+                self.imap.shutdown()
+            except Exception:
+                pass
+        self.imap = None
+    
+    def _drop_session(self, error: Exception):
+        """Forget a dead session; the next ensure_connected reconnects"""
+        logger.warning(f"IMAP 연결이 끊어졌습니다: {error}")
+        self._close_socket()
+        self._next_reconnect = 0.0
+    
+    @property
+    def connected(self) -> bool:
+        return self.imap is not None
+    
+    def ensure_connected(self) -> bool:
+        """
+        Reconnect a dropped session, with jittered exponential backoff between failed attempts
+        
+        The first attempt after a drop is immediate. last_seen_uid is kept, so the
+        next poll resumes from it instead of rescanning the mailbox.
+        
+        Returns:
+            bool: True when a session is available
+        """
+        if self.imap is not None:
+            return True
+        now = time.monotonic()
+        if now < self._next_reconnect:
+            return False
+        if self.connect():
+            if self.reconnect_attempts or self.last_seen_uid is not None:
+                IMAP_RECONNECTS.inc(result="connected")
+                logger.info(f"IMAP에 다시 연결했습니다. UID {self.last_seen_uid.decode() if self.last_seen_uid else '-'} 이후부터 확인합니다.")
+            self.reconnect_attempts = 0
+            return True
+        IMAP_RECONNECTS.inc(result="failed")
+        self.reconnect_attempts += 1
+        # full jitter: 여러 인스턴스가 동시에 재접속해 서버를 몰아치지 않도록
+        delay = random.uniform(0, min(self.reconnect_max_delay, self.reconnect_delay * 2 ** self.reconnect_attempts))
+        self._next_reconnect = now + delay
+        logger.info(f"{delay:.1f}초 후 IMAP 재연결을 다시 시도합니다 ({self.reconnect_attempts}회 실패).")
+        return False
+    
+    def seconds_until_maintenance(self) -> float:
+        """Time until keepalive has work to do (a due NOOP or reconnection attempt)"""
+        if self.imap is None:
+            return max(0.0, self._next_reconnect - time.monotonic())
+        return max(0.0, self._last_activity + self.keepalive_interval - time.monotonic())
+    
+    def keepalive(self) -> bool:
+        """
+        Send NOOP when the session has been idle for keepalive_interval, reconnecting dead sessions
+        
+        Returns:
+            bool: True when a session is available
+        """
+        if self.imap is None:
+            return self.ensure_connected()
+        if time.monotonic() - self._last_activity < self.keepalive_interval:
+            return True
+        try:
+            with timed('imap_noop'):
+                self.imap.noop()
+            self._last_activity = time.monotonic()
+            return True
+        except _SESSION_ERRORS as e:
+            self._drop_session(e)
+            return self.ensure_connected()
+    
     def disconnect(self):
         """Disconnect from IMAP server"""
         if self.imap:
@@ -45,78 +193,163 @@ class EmailMonitor:
                 logger.info("IMAP 연결이 해제되었습니다.")
             except Exception as e:
                 logger.error(f"연결 해제 중 오류: {e}")
+            self.imap = None
     
-    def mark_as_read(self, uid: bytes) -> bool:
-        """Mark email as read"""
-        try:
-            self.imap.uid('store', uid, '+FLAGS', '\\Seen')
-            logger.info(f"이메일 UID {uid.decode()}를 읽음으로 처리했습니다.")
-            return True
-        except Exception as e:
-            logger.error(f"읽음 처리 실패 (UID: {uid.decode()}): {e}")
-            return False
+    def queue_flags(self, uid: str, flags: Sequence[str], item: str = '+FLAGS.SILENT'):
+        """
+        Queue a flag change for the next flush_flags (safe to call from worker threads)
+        
+        Args:
+            uid: Message UID
+            flags: Flags, keywords or (quoted) Gmail labels, e.g. ['\\Seen']
+            item: STORE data item: +FLAGS.SILENT, -FLAGS.SILENT or +X-GM-LABELS
+        """
+        key = (item, f"({' '.join(flags)})")
+        with self._flags_lock:
+            self._pending_flags.setdefault(key, set()).add(int(uid))
+    
+    def mark_outcome(self, uid: str, replied: bool):
+        """Queue the processing outcome: $JaneReplied (and the Gmail label, if set) or $JaneFailed"""
+        self.queue_flags(uid, [self.REPLIED_FLAG if replied else self.FAILED_FLAG])
+        if replied and self.replied_label and self.gmail_extensions:
+            self.queue_flags(uid, [quote(self.replied_label)], item='+X-GM-LABELS')
+    
+    def flush_flags(self) -> int:
+        """
+        Send the queued flag changes as one UID STORE per distinct change over a UID set (IMAP thread only)
+        
+        Returns:
+            int: Number of UID STORE commands sent
+        """
+        if self.imap is None:
+            return 0
+        with self._flags_lock:
+            pending, self._pending_flags = self._pending_flags, {}
+        sent = 0
+        for (item, flags), uids in pending.items():
+            for uid_set in uid_sets(uids):
+                try:
+                    with timed('imap_store'):
+                        status, data = self.imap.uid('store', uid_set, item, flags)
+                    sent += 1
+                    self._last_activity = time.monotonic()
+                    if status != 'OK':
+                        logger.warning(f"플래그 변경 거부 ({item} {flags}, UID {uid_set}): {data}")
+                except Exception as e:
+                    logger.error(f"플래그 변경 실패 ({item} {flags}, UID {uid_set}): {e}")
+                    # 연결 오류일 수 있으므로 다음 flush에서 다시 보냄
+                    with self._flags_lock:
+                        self._pending_flags.setdefault((item, flags), set()).update(uids)
+                    if isinstance(e, _SESSION_ERRORS) and self.imap is not None:
+                        self._drop_session(e)
+                    if self.imap is None:
+                        # 남은 변경도 다음 flush로 미룸
+                        with self._flags_lock:
+                            for key, rest in pending.items():
+                                self._pending_flags.setdefault(key, set()).update(rest)
+                        return sent
+                    break
+        return sent
     
     def get_latest_emails(self) -> List[EmailInfo]:
-        """Get latest emails using UID-based tracking"""
-        try:
-            # INBOX 새로고침 (캐시 방지)
-            self.imap.select('INBOX')
-            
-            # 모든 이메일 UID 검색
-            status, messages = self.imap.uid('search', None, 'ALL')
-            if status != 'OK':
+        """Get latest emails using UID-based tracking, reconnecting once right away if the session dropped"""
+        for _ in range(2):
+            if not self.ensure_connected():
                 return []
-            
-            all_uids = messages[0].split()
-            if not all_uids:
-                return []
-            
-            # 최신 UID 확인
-            latest_uid = all_uids[-1]
-            
-            # 첫 실행시 현재 상태 기록
-            if self.last_seen_uid is None:
-                self.last_seen_uid = latest_uid
-                logger.info(f"모니터링을 시작합니다. 현재 최신 UID: {latest_uid.decode()}")
+            try:
+                return self._poll()
+            except _SESSION_ERRORS as e:
+                # last_seen_uid는 폴링이 끝까지 성공했을 때만 바뀌므로 재연결 후 같은 UID부터 다시 확인
+                self._drop_session(e)
+            except Exception as e:
+                logger.error(f"이메일 확인 중 오류: {e}")
                 return []
-            
-            # 새로운 이메일 확인
-            if latest_uid != self.last_seen_uid:
-                # 마지막으로 본 UID 이후의 새 이메일 찾기
-                last_seen_index = -1
-                for i, uid in enumerate(all_uids):
-                    if uid == self.last_seen_uid:
-                        last_seen_index = i
-                        break
-                
-                if last_seen_index >= 0:
-                    new_uids = all_uids[last_seen_index + 1:]
-                else:
-                    new_uids = [latest_uid]
-                
-                new_emails = []
-                for uid in new_uids:
-                    email_info = self._extract_email_info(uid)
-                    if email_info:
-                        new_emails.append(email_info)
-                
-                # 최신 UID 업데이트
-                self.last_seen_uid = latest_uid
-                return new_emails
-            
+        return []
+    
+    def _poll(self) -> List[EmailInfo]:
+        """One SEARCH/FETCH round from last_seen_uid (session errors propagate to the caller)"""
+        # 지난 폴링에서 처리되지 않은 메시지 정리
+        for message in self._fetched.values():
+            release_payloads(message)
+        self._fetched.clear()
+        
+        # INBOX 새로고침 (캐시 방지)
+        self.imap.select('INBOX')
+        self._last_activity = time.monotonic()
+        # SELECT 시점에 이미 있던 메시지의 마지막 UID (걸러진 메일도 다시 검색하지 않도록)
+        uid_next = self._uid_next()
+        
+        # 첫 실행시 현재 상태 기록
+        if self.last_seen_uid is None:
+            if uid_next is not None:
+                latest_uid = str(uid_next - 1).encode()
+            else:
+                with timed('imap_search'):
+                    status, messages = self.imap.uid('search', None, 'ALL')
+                if status != 'OK':
+                    return []
+                latest_uid = (messages[0].split() or [b'0'])[-1]
+            self.last_seen_uid = latest_uid
+            logger.info(f"모니터링을 시작합니다. 현재 최신 UID: {latest_uid.decode()}")
             return []
         
-        except Exception as e:
-            logger.error(f"이메일 확인 중 오류: {e}")
+        # 마지막으로 본 UID 이후에서 조건에 맞는 메일만 서버가 찾음 (전체 UID 목록을 받지 않음)
+        last_seen = int(self.last_seen_uid)
+        new_uids = [uid for uid in self._search_uids(f"{last_seen + 1}:*".encode()) if int(uid) > last_seen]
+        
+        new_emails = []
+        failed = []
+        for uid in new_uids:
+            number = int(uid)
+            if number in self._returned:
+                continue
+            email_info = self._extract_email_info(uid)
+            if email_info:
+                new_emails.append(email_info)
+                self._returned.add(number)
+                self._fetch_failures.pop(number, None)
+                continue
+            attempts = self._fetch_failures.get(number, 0) + 1
+            if attempts < self.MAX_FETCH_ATTEMPTS:
+                self._fetch_failures[number] = attempts
+                failed.append(number)
+            else:
+                self._fetch_failures.pop(number, None)
+                logger.error(f"UID {number} 메일을 {attempts}회 가져오지 못해 건너뜁니다.")
+        
+        # 최신 UID 업데이트 (가져오지 못한 메일이 있으면 그 앞까지만 진행해 다음 폴링에서 다시 시도)
+        latest = max([last_seen, (uid_next or 1) - 1] + [int(uid) for uid in new_uids])
+        if failed:
+            latest = min(latest, min(failed) - 1)
+        self.last_seen_uid = str(latest).encode()
+        self._returned = {number for number in self._returned if number > latest}
+        return new_emails
+    
+    def _uid_next(self) -> Optional[int]:
+        """UIDNEXT reported by the last SELECT (None when the server did not send it)"""
+        _, data = self.imap.response('UIDNEXT')
+        if data and data[-1] and data[-1].isdigit():
+            return int(data[-1])
+        return None
+    
+    def _search_uids(self, uid_range: bytes) -> List[bytes]:
+        """UIDs in uid_range that pass the configured header and Gmail filters"""
+        gmail_raw = self.gmail_raw if self.gmail_extensions else None
+        criteria, literal = build_search_criteria(uid_range.decode(), self.header_filters, gmail_raw)
+        with timed('imap_search'):
+            # 한글 등 비ASCII Gmail 검색어는 리터럴로 전송 (X-GM-RAW가 마지막 인자)
+            self.imap.literal = literal
+            status, messages = self.imap.uid('search', *criteria)
+        if status != 'OK' or not messages or not messages[0]:
             return []
+        return messages[0].split()
     
     def _extract_email_info(self, uid: bytes) -> Optional[EmailInfo]:
         """Extract email information from UID"""
         try:
-            status, msg_data = self.imap.uid('fetch', uid, '(RFC822)')
-            if status == 'OK' and msg_data[0] is not None:
-                raw_email = msg_data[0][1]
-                email_message = email.message_from_bytes(raw_email)
+            email_message, gm_thread_id = self._fetch_message(uid)
+            if email_message is not None:
+                self._fetched[uid.decode()] = email_message
                 
                 # 이메일 정보 추출
                 subject = decode_mime_words(email_message.get('Subject', '제목 없음'))
@@ -133,22 +366,44 @@ class EmailMonitor:
                     date=date,
                     message_id=message_id,
                     in_reply_to=in_reply_to,
-                    references=references
+                    references=references,
+                    gm_thread_id=gm_thread_id
                 )
             return None
+        except _SESSION_ERRORS:
+            # 연결이 끊긴 경우 이 메일을 건너뛰지 않고 재연결 후 다시 가져옴
+            raise
         except Exception as e:
             logger.error(f"이메일 정보 추출 실패 (UID: {uid.decode()}): {e}")
             return None
     
+    def _fetch_message(self, uid: bytes) -> Tuple[Optional[Message], Optional[str]]:
+        """
+        Fetch one message and parse it incrementally, keeping only headers, text bodies and attachments
+        
+        Returns:
+            Tuple[Optional[Message], Optional[str]]: Parsed message and Gmail thread ID (None elsewhere)
+        """
+        # Gmail은 스레드 ID(X-GM-THRID)를 같은 FETCH로 함께 받음
+        items = '(X-GM-THRID BODY.PEEK[])' if self.gmail_extensions else '(BODY.PEEK[])'
+        with timed('imap_fetch'):
+            status, msg_data = self.imap.uid('fetch', uid, items)
+        if status != 'OK' or not msg_data or not isinstance(msg_data[0], tuple):
+            return None, None
+        envelope, raw_email = msg_data[0]
+        del msg_data
+        match = _GM_THRID.search(envelope)
+        gm_thread_id = match.group(1).decode() if match else None
+        return parse_message(raw_email, keep_attachments=self.keep_attachments), gm_thread_id
+    
     def get_original_email(self, uid: str) -> Optional[Message]:
         """Get original email object by UID"""
         try:
-            uid_bytes = uid.encode()
-            status, msg_data = self.imap.uid('fetch', uid_bytes, '(RFC822)')
-            if status == 'OK' and msg_data[0] is not None:
-                raw_email = msg_data[0][1]
-                return email.message_from_bytes(raw_email)
-            return None
+            # get_latest_emails에서 이미 가져온 메시지는 다시 FETCH하지 않음
+            email_message = self._fetched.pop(uid, None)
+            if email_message is not None:
+                return email_message
+            return self._fetch_message(uid.encode())[0]
         except Exception as e:
             logger.error(f"원본 이메일 가져오기 실패 (UID: {uid}): {e}")
             return None
@@ -160,11 +415,12 @@ class EmailMonitor:
         
         # 이메일 본문 추출
         full_body = ""
-        if original_email:
-            full_body = extract_email_body(original_email)
-        
-        # 이메일 콘텐츠 생성
-        email_content = EmailContent.from_raw_body(full_body)
+        with timed('extract_body'):
+            if original_email:
+                full_body = extract_email_body(original_email)
+            
+            # 이메일 콘텐츠 생성
+            email_content = EmailContent.from_raw_body(full_body)
         
         # 처리 컨텍스트 생성
         return ProcessingContext(
@@ -10,26 +10,31 @@ from email.message import Message
 
 from ..models.email_models import ProcessingContext
 from ..utils.logging_utils import get_logger
-from ..utils.email_utils import decode_mime_words, extract_email_body
+from ..utils.metrics import timed
+from ..utils.email_utils import build_references, decode_mime_words
 
 logger = get_logger('email_sender')
 
 class EmailSender:
     """Service for sending email responses"""
     
-    def __init__(self, email_address: str, app_password: str, smtp_server: str, smtp_port: int):
+    def __init__(self, email_address: str, app_password: str, smtp_server: str, smtp_port: int,
+                 use_starttls: bool = True):
         self.email_address = email_address
         self.app_password = app_password
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
+        self.use_starttls = use_starttls
     
     def send_reply(self, context: ProcessingContext, response_body: str) -> bool:
         """Send email reply with thread history"""
         try:
             # SMTP 서버 연결
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.email_address, self.app_password)
+            with timed('smtp_connect'):
+                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+                if self.use_starttls:
+                    server.starttls()
+                server.login(self.email_address, self.app_password)
             
             # 이메일 메시지 작성
             msg = MIMEMultipart()
@@ -45,10 +50,14 @@ class EmailSender:
             
             msg['Subject'] = Header(reply_subject, 'utf-8')
             
-            # 이메일 스레드 헤더 설정
+            # 이메일 스레드 헤더 설정 (References는 전체 체인을 이어서 긴 스레드도 유지)
+            reply_message_id = make_msgid(domain=self.email_address.rpartition('@')[2] or None)
+            msg['Message-ID'] = reply_message_id
             if context.original_email_obj and context.email_info.message_id:
                 msg['In-Reply-To'] = context.email_info.message_id
-                msg['References'] = context.email_info.message_id
+                msg['References'] = build_references(
+                    context.email_info.references, context.email_info.in_reply_to, context.email_info.message_id
+                )
             
             # 본문 작성 (원본 이메일 포함)
             email_body = response_body
@@ -57,7 +66,8 @@ class EmailSender:
                 # 원본 이메일 정보 추출 및 디코딩
                 original_sender = decode_mime_words(context.original_email_obj.get('From', ''))
                 original_date = context.original_email_obj.get('Date', '')
-                original_body = extract_email_body(context.original_email_obj)
+                # 수신 시 한 번 디코딩한 본문을 재사용
+                original_body = context.email_content.full_body
                 
                 # 원본 메시지 포맷으로 추가
                 email_body += f"""
@@ -77,9 +87,11 @@ Subject: {subject}
             msg.attach(MIMEText(email_body, 'plain', 'utf-8'))
             
             # 이메일 전송
-            server.send_message(msg)
-            server.quit()
+            with timed('smtp_send'):
+                server.send_message(msg)
+                server.quit()
             
+            context.reply_message_id = reply_message_id
             logger.info(f"답변 이메일을 성공적으로 전송했습니다: {context.sender_email}")
             return True
             
@@ -0,0 +1,130 @@
+"""
+Encrypted on-disk store of authenticated portal cookies
+"""
+from http.cookiejar import Cookie, CookieJar
+from pathlib import Path
+from typing import Dict, List
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+
+from ..utils.logging_utils import get_logger
+
+logger = get_logger('portal_cookies')
+
+# Keys a Selenium cookie dict may carry (driver.get_cookies() / driver.add_cookie())
+SELENIUM_COOKIE_KEYS = ('name', 'value', 'domain', 'path', 'expiry', 'secure', 'httpOnly', 'sameSite')
+
+class PortalCookieStore:
+    """Fernet-encrypted cookie file shared by the browser pool and the HTTP backend"""
+
+    def __init__(self, path: str = "data/portal_cookies.enc", key: str = "",
+                 username: str = "", password: str = ""):
+        self.path = Path(path)
+        self._key = key
+        self._username = username
+        self._password = password
+        self._cipher = None
+        self._lock = threading.Lock()
+
+    @property
+    def _fernet(self):
+        """Fernet cipher, created on first use (cryptography import and key derivation are not free)"""
+        if self._cipher is None:
+            from cryptography.fernet import Fernet
+            key = self._key.encode() if self._key else self._derive_key(self._username, self._password)
+            self._cipher = Fernet(key)
+        return self._cipher
+
+    @staticmethod
+    def _derive_key(username: str, password: str) -> bytes:
+        """Derive a Fernet key from the portal credentials when no explicit key is configured"""
+        salt = f"jane.ai-portal-cookies:{username}".encode('utf-8')
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, 200_000)
+        return base64.urlsafe_b64encode(digest)
+
+    def load(self) -> List[Dict]:
+        """
+        Load saved cookies, dropping expired ones
+
+        Returns:
+            List[Dict]: Selenium-style cookie dicts (empty when nothing usable is stored)
+        """
+        with self._lock:
+            try:
+                token = self.path.read_bytes()
+            except FileNotFoundError:
+                return []
+            except OSError as e:
+                logger.warning(f"저장된 포털 쿠키를 읽지 못했습니다: {e}")
+                return []
+
+        from cryptography.fernet import InvalidToken
+        try:
+            cookies = json.loads(self._fernet.decrypt(token))
+        except (InvalidToken, ValueError):
+            logger.warning("저장된 포털 쿠키를 복호화할 수 없어 무시합니다")
+            return []
+
+        now = time.time()
+        return [cookie for cookie in cookies if not cookie.get('expiry') or cookie['expiry'] > now]
+
+    def save(self, cookies: List[Dict]):
+        """Encrypt and write cookies atomically (owner read/write only)"""
+        cookies = [{k: cookie[k] for k in SELENIUM_COOKIE_KEYS if cookie.get(k) is not None} for cookie in cookies]
+        token = self._fernet.encrypt(json.dumps(cookies).encode('utf-8'))
+
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(token)
+                os.replace(tmp_path, self.path)
+                logger.info(f"포털 세션 쿠키 {len(cookies)}개를 저장했습니다")
+            except OSError as e:
+                logger.warning(f"포털 쿠키 저장 실패: {e}")
+
+    def clear(self):
+        """Forget the saved session"""
+        with self._lock:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+def cookies_from_jar(jar: CookieJar) -> List[Dict]:
+    """Convert a cookie jar into Selenium-style cookie dicts"""
+    cookies = []
+    for cookie in jar:
+        entry = {
+            'name': cookie.name,
+            'value': cookie.value,
+            'domain': cookie.domain,
+            'path': cookie.path,
+            'secure': cookie.secure,
+            'httpOnly': cookie.has_nonstandard_attr('HttpOnly'),
+        }
+        if cookie.expires:
+            entry['expiry'] = cookie.expires
+        cookies.append(entry)
+    return cookies
+
+def add_cookies_to_jar(jar: CookieJar, cookies: List[Dict]):
+    """Load Selenium-style cookie dicts into a cookie jar"""
+    for entry in cookies:
+        domain = entry.get('domain', '')
+        jar.set_cookie(Cookie(
+            version=0, name=entry['name'], value=entry['value'],
+            port=None, port_specified=False,
+            domain=domain, domain_specified=domain.startswith('.'), domain_initial_dot=domain.startswith('.'),
+            path=entry.get('path', '/'), path_specified=True,
+            secure=entry.get('secure', False),
+            expires=entry.get('expiry'), discard=entry.get('expiry') is None,
+            comment=None, comment_url=None,
+            rest={'HttpOnly': None} if entry.get('httpOnly') else {}
+        ))
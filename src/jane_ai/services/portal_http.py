@@ -0,0 +1,242 @@
+"""
+Browserless e-Approval submission over an HTTP session
+"""
+from html.parser import HTMLParser
+from http.cookiejar import CookieJar
+from typing import Dict, List, Optional, Tuple
+from urllib.error import URLError
+from urllib.parse import urlencode, urljoin
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+import json
+import threading
+
+from .portal_cookies import PortalCookieStore, add_cookies_to_jar, cookies_from_jar
+from ..utils.email_utils import decode_bytes
+from ..utils.logging_utils import get_logger
+from ..utils.metrics import record_cache, timed
+
+logger = get_logger('portal_http')
+
+# 브라우저 흐름이 기록물철 트리(부서복무관리)에서 선택하는 항목
+REGFILE_NAME = "휴가(외출)"
+
+class _FormParser(HTMLParser):
+    """Collect <form> elements with their action, method and default field values, and tree labels"""
+
+    def __init__(self):
+        super().__init__()
+        self.forms: List[Dict] = []
+        self.tree_labels: List[str] = []
+        self._form: Optional[Dict] = None
+        self._textarea: Optional[str] = None
+        self._select: Optional[str] = None
+        self._label: Optional[List[str]] = None
+        # 라벨을 연 태그와, 라벨 안에서 다시 열린 같은 태그의 수 (중첩된 태그의 종료로 라벨이 끊기지 않도록)
+        self._label_tag: Optional[str] = None
+        self._label_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self._label is not None:
+            if tag == self._label_tag:
+                self._label_depth += 1
+        elif 'tree_label' in (attrs.get('class') or '').split():
+            self._label = []
+            self._label_tag = tag
+            self._label_depth = 0
+        if tag == 'form':
+            self._form = {
+                'id': attrs.get('id'),
+                'action': attrs.get('action', ''),
+                'method': attrs.get('method', 'get').lower(),
+                'fields': {},
+            }
+            self.forms.append(self._form)
+        elif self._form is None:
+            return
+        elif tag == 'input' and attrs.get('name'):
+            if attrs.get('type', 'text').lower() in ('checkbox', 'radio') and 'checked' not in attrs:
+                return
+            if attrs.get('type', '').lower() in ('submit', 'button', 'image'):
+                return
+            self._form['fields'][attrs['name']] = attrs.get('value', '')
+        elif tag == 'textarea' and attrs.get('name'):
+            self._textarea = attrs['name']
+            self._form['fields'][self._textarea] = ''
+        elif tag == 'select' and attrs.get('name'):
+            self._select = attrs['name']
+            self._form['fields'].setdefault(self._select, '')
+        elif tag == 'option' and self._select:
+            if 'selected' in attrs or not self._form['fields'][self._select]:
+                self._form['fields'][self._select] = attrs.get('value', '')
+
+    def handle_endtag(self, tag):
+        if self._label is not None and tag == self._label_tag:
+            if self._label_depth:
+                self._label_depth -= 1
+            else:
+                self.tree_labels.append(''.join(self._label).strip())
+                self._label = None
+                self._label_tag = None
+        if tag == 'form':
+            self._form = None
+        elif tag == 'textarea':
+            self._textarea = None
+        elif tag == 'select':
+            self._select = None
+
+    def handle_data(self, data):
+        if self._label is not None:
+            self._label.append(data)
+        if self._form is not None and self._textarea:
+            self._form['fields'][self._textarea] += data
+
+def _parse(html_text: str) -> _FormParser:
+    parser = _FormParser()
+    parser.feed(html_text)
+    parser.close()
+    return parser
+
+def parse_forms(html_text: str) -> List[Dict]:
+    """Parse all forms on a page"""
+    return _parse(html_text).forms
+
+class HttpVacationBackend:
+    """Vacation submission that posts the e-Approval form fields directly, without a browser"""
+
+    def __init__(self, username: str = "", password: str = "",
+                 base_url: str = "https://portal.kdischool.ac.kr",
+                 form_url: str = "", timeout: float = 15.0,
+                 cookie_store: Optional[PortalCookieStore] = None, regfile: str = REGFILE_NAME):
+        self.username = username
+        self.password = password
+        self.base_url = base_url
+        self.form_url = urljoin(base_url + '/', form_url) if form_url else ""
+        self.timeout = timeout
+        self.cookie_store = cookie_store
+        self.regfile = regfile
+
+        self.cookie_jar = CookieJar()
+        self._cookies_restored = cookie_store is None
+        self.opener = build_opener(HTTPCookieProcessor(self.cookie_jar))
+        self._login_lock = threading.Lock()
+
+    def submit_vacation_request(self, request) -> dict:
+        """
+        Submit a vacation request by posting the form fields
+
+        Args:
+            request: VacationRequest object with vacation details
+
+        Returns:
+            dict: Result with success status and message. "fallback" is True when
+            nothing was posted, so retrying with the browser backend is safe;
+            "unconfirmed" is True when the form may have been posted.
+        """
+        if not self.form_url:
+            return {"success": False, "fallback": True, "message": "HTTP 양식 주소가 설정되지 않았습니다"}
+
+        try:
+            with timed('portal_http_form'):
+                form = self._load_vacation_form()
+            if form is None:
+                return {"success": False, "fallback": True, "message": "휴가 신청서 양식을 불러오지 못했습니다"}
+        except (URLError, OSError) as e:
+            logger.error(f"휴가 신청서 양식 요청 실패: {e}")
+            return {"success": False, "fallback": True, "message": f"포털 연결 실패: {e}"}
+
+        # 기록물철: 브라우저 흐름처럼 양식의 기록물철 트리에 있는 항목만 선택
+        if self.regfile not in form['tree_labels']:
+            logger.error(f"기록물철 '{self.regfile}' 항목을 양식에서 찾지 못했습니다")
+            return {"success": False, "fallback": True, "message": f"기록물철 '{self.regfile}'을(를) 찾지 못했습니다"}
+
+        fields = dict(form['fields'])
+        fields.update({
+            'regFile': self.regfile,
+            'StartDate_1': request.start_date,
+            'EndDate_1': request.end_date,
+            'VactionKind_1': request.vacation_type,
+            'Term_1': str(request.days_count),
+            'opinion': request.reason,
+        })
+
+        try:
+            action = urljoin(form['url'], form['action'] or form['url'])
+            with timed('portal_http_post'):
+                final_url, status, body = self._open(action, fields)
+        except (URLError, OSError) as e:
+            # 요청이 전송되었을 수 있으므로 브라우저 재시도는 하지 않음
+            logger.error(f"휴가 신청서 전송 실패: {e}")
+            return {"success": False, "fallback": False, "unconfirmed": True, "message": f"휴가 신청서 전송 실패: {e}"}
+
+        # 4xx/5xx는 HTTPError(URLError)로 위에서 처리됨; 성공은 응답의 success 표시로만 인정
+        if self._is_login_page(body):
+            return {"success": False, "fallback": False, "message": "휴가 신청서 제출 실패 (로그인 세션 만료)"}
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict) or payload.get('success') is not True:
+            message = payload.get('message') if isinstance(payload, dict) else None
+            rejected = isinstance(payload, dict) and payload.get('success') is False
+            logger.error(f"휴가 신청서 제출 응답에 성공 표시가 없습니다 (HTTP {status}): {body[:200]!r}")
+            # 포털이 명시적으로 거부한 경우만 제출되지 않은 것으로 확정
+            return {"success": False, "fallback": False, "unconfirmed": not rejected,
+                    "message": message or f"휴가 신청서 제출 결과를 확인하지 못했습니다 (HTTP {status})"}
+
+        logger.info("휴가 신청서 제출 완료 (HTTP)")
+        return {"success": True, "message": "휴가 신청이 성공적으로 완료되었습니다"}
+
+    def _load_vacation_form(self) -> Optional[Dict]:
+        """Fetch the vacation form page, logging in first if the session is missing or expired"""
+        restored = False
+        if not self._cookies_restored:
+            # 저장된 세션 쿠키가 있으면 첫 양식 요청이 곧 유효성 확인이 됨
+            cookies = self.cookie_store.load()
+            add_cookies_to_jar(self.cookie_jar, cookies)
+            self._cookies_restored = True
+            restored = bool(cookies)
+        final_url, status, body = self._open(self.form_url)
+        if restored:
+            record_cache('portal_cookies', not self._is_login_page(body))
+        if self._is_login_page(body):
+            with self._login_lock:
+                if not self._login(final_url, body):
+                    return None
+            final_url, status, body = self._open(self.form_url)
+
+        page = _parse(body)
+        for form in page.forms:
+            if 'StartDate_1' in form['fields'] or form['id'] == 'vacationForm':
+                form['url'] = final_url
+                form['tree_labels'] = page.tree_labels
+                return form
+        logger.error("휴가 신청서 양식을 찾지 못했습니다")
+        return None
+
+    def _login(self, login_url: str, login_page: str) -> bool:
+        """Post credentials to the SSO login form"""
+        for form in parse_forms(login_page):
+            if 'login_id' in form['fields']:
+                fields = dict(form['fields'])
+                fields.update({'login_id': self.username, 'login_pwd': self.password})
+                final_url, status, body = self._open(urljoin(login_url, form['action'] or login_url), fields)
+                if status < 400 and not self._is_login_page(body):
+                    logger.info("포털 로그인 성공 (HTTP)")
+                    if self.cookie_store is not None:
+                        self.cookie_store.save(cookies_from_jar(self.cookie_jar))
+                    return True
+                break
+        logger.error("포털 로그인 실패 (HTTP)")
+        return False
+
+    def _is_login_page(self, body: str) -> bool:
+        return 'name="login_id"' in body or "id=\"login_id\"" in body
+
+    def _open(self, url: str, fields: Optional[Dict[str, str]] = None) -> Tuple[str, int, str]:
+        """GET (or POST when fields are given) and return final URL, status and decoded body"""
+        data = urlencode(fields).encode('utf-8') if fields is not None else None
+        http_request = Request(url, data=data, headers={'User-Agent': 'Mozilla/5.0 Jane.ai'})
+        with self.opener.open(http_request, timeout=self.timeout) as response:
+            charset = response.headers.get_content_charset()
+            return response.geturl(), response.status, decode_bytes(response.read(), charset)
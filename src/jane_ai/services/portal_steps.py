@@ -0,0 +1,91 @@
+"""
+Condition-based page steps for KDI portal automation
+"""
+from selenium.common.exceptions import NoSuchElementException, NoSuchWindowException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Tuple
+import time
+
+from ..utils.logging_utils import get_logger
+from ..utils.metrics import PORTAL_STEP_SECONDS
+
+logger = get_logger('portal_steps')
+
+DATEPICKER = (By.ID, "ui-datepicker-div")
+
+# DOM conditions (WebDriverWait.until 호환: driver를 받아 truthy 값을 반환)
+def datepicker_rendered(year: int = None, month: int = None) -> Callable:
+    """Datepicker is visible, optionally showing the given year/month (month is 1-based)"""
+    def _condition(driver):
+        try:
+            picker = driver.find_element(*DATEPICKER)
+            if not picker.is_displayed():
+                return False
+            if year is None:
+                return picker
+            cells = picker.find_elements(
+                By.XPATH, f".//td[@data-handler='selectDay'][@data-month='{month - 1}'][@data-year='{year}']"
+            )
+            return picker if cells else False
+        except (NoSuchElementException, StaleElementReferenceException):
+            return False
+    return _condition
+
+def datepicker_closed() -> Callable:
+    """Datepicker was hidden after a day was picked"""
+    return EC.invisibility_of_element_located(DATEPICKER)
+
+def popup_window_opened(handles_before: List[str]) -> Callable:
+    """A new browser window was opened"""
+    return EC.new_window_is_opened(handles_before)
+
+def tree_node_expanded(label: str) -> Callable:
+    """A dynatree node with the given label is expanded"""
+    return EC.presence_of_element_located((
+        By.XPATH,
+        f"//span[@class='tree_label'][contains(text(), '{label}')]/parent::span[contains(@class, 'dynatree-expanded')]"
+    ))
+
+def dialog_closed(element) -> Callable:
+    """The element is gone, either detached from the DOM or with its window closed"""
+    def _condition(driver):
+        try:
+            return not element.is_displayed()
+        except (StaleElementReferenceException, NoSuchWindowException):
+            return True
+    return _condition
+
+class PortalSteps:
+    """Runs named page steps that wait on explicit DOM conditions and records their durations"""
+
+    def __init__(self, driver, timeout: float = 10, poll_frequency: float = 0.1):
+        self.driver = driver
+        self.wait = WebDriverWait(driver, timeout, poll_frequency=poll_frequency)
+        self.timings: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[WebDriverWait]:
+        """Time a named step; the body waits on its own completion condition"""
+        started = time.perf_counter()
+        try:
+            yield self.wait
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings.append((name, elapsed))
+            PORTAL_STEP_SECONDS.observe(elapsed, step=name)
+            logger.debug(f"단계 완료: {name} ({elapsed:.3f}s)")
+
+    def until(self, condition: Callable):
+        """Wait for a condition with the step timeout"""
+        return self.wait.until(condition)
+
+    def total(self) -> float:
+        return sum(elapsed for _, elapsed in self.timings)
+
+    def summary(self) -> str:
+        """One-line summary of step durations for logging"""
+        parts = [f"{name}={elapsed:.2f}s" for name, elapsed in self.timings]
+        return f"{self.total():.2f}s ({', '.join(parts)})"
@@ -0,0 +1,125 @@
+"""
+Local store of model token usage and cost per email
+"""
+from dataclasses import astuple, fields
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import sqlite3
+import threading
+
+from ..models.usage_models import UsageRecord
+from ..utils.logging_utils import get_logger
+from ..utils.pricing import MODEL_PRICES, estimate_cost
+
+logger = get_logger('usage_store')
+
+# 집계 기준으로 허용하는 컬럼 (SQL에 그대로 들어가므로 화이트리스트로 제한)
+GROUP_COLUMNS = ("day", "intent", "model", "agent", "sender_domain")
+
+_COLUMNS = [f.name for f in fields(UsageRecord)]
+
+class UsageStore:
+    """SQLite table of UsageRecord rows with daily rollups"""
+
+    def __init__(self, path: str = "data/usage.db",
+                 prices: Optional[Dict[str, Tuple[float, float, float]]] = None):
+        self.path = path
+        self.prices = MODEL_PRICES if prices is None else prices
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS model_usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                day TEXT NOT NULL,
+                agent TEXT NOT NULL,
+                model TEXT NOT NULL,
+                requests INTEGER NOT NULL DEFAULT 0,
+                input_tokens INTEGER NOT NULL DEFAULT 0,
+                cached_tokens INTEGER NOT NULL DEFAULT 0,
+                output_tokens INTEGER NOT NULL DEFAULT 0,
+                cost_usd REAL,
+                email_uid TEXT NOT NULL DEFAULT '',
+                subject TEXT NOT NULL DEFAULT '',
+                sender_domain TEXT NOT NULL DEFAULT '',
+                intent TEXT NOT NULL DEFAULT '',
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS model_usage_day ON model_usage (day)")
+
+    def record(self, record: UsageRecord):
+        """Store one usage row, pricing it with the configured table when no cost is given"""
+        if record.cost_usd is None:
+            record.cost_usd = estimate_cost(
+                record.model, record.input_tokens, record.cached_tokens, record.output_tokens, self.prices
+            )
+        day = datetime.fromtimestamp(record.created_at).date().isoformat()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    f"INSERT INTO model_usage (day, {', '.join(_COLUMNS)}) "
+                    f"VALUES (?, {', '.join('?' * len(_COLUMNS))})",
+                    (day,) + astuple(record)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"모델 사용량 기록 실패: {e}")
+
+    def rollup(self, start: date, end: date, group_by: Sequence[str] = ("day",)) -> List[Dict]:
+        """
+        Aggregate usage between two local dates (inclusive)
+
+        Args:
+            start: First day
+            end: Last day
+            group_by: Columns from GROUP_COLUMNS
+
+        Returns:
+            List[Dict]: One row per group with emails, requests, token totals and cost,
+            most expensive first within each day
+        """
+        unknown = [column for column in group_by if column not in GROUP_COLUMNS]
+        if unknown:
+            raise ValueError(f"지원하지 않는 집계 기준: {', '.join(unknown)}")
+        columns = list(group_by)
+        select = ", ".join(columns + [
+            "COUNT(DISTINCT NULLIF(email_uid, '')) AS emails",
+            "SUM(requests) AS requests",
+            "SUM(input_tokens) AS input_tokens",
+            "SUM(cached_tokens) AS cached_tokens",
+            "SUM(output_tokens) AS output_tokens",
+            "SUM(cost_usd) AS cost_usd",
+            "SUM(cost_usd IS NULL) AS unpriced",
+        ])
+        group = f"GROUP BY {', '.join(columns)}" if columns else ""
+        order = ", ".join((["day"] if "day" in columns else []) + ["cost_usd DESC", "input_tokens DESC"])
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT {select} FROM model_usage WHERE day BETWEEN ? AND ? {group} ORDER BY {order}",
+                (start.isoformat(), end.isoformat())
+            )
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def top_emails(self, start: date, end: date, limit: int = 10) -> List[Dict]:
+        """Most expensive emails between two local dates (inclusive)"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT email_uid, MIN(day) AS day, MAX(subject) AS subject, MAX(sender_domain) AS sender_domain, "
+                "MAX(intent) AS intent, SUM(requests) AS requests, SUM(input_tokens) AS input_tokens, "
+                "SUM(cached_tokens) AS cached_tokens, SUM(output_tokens) AS output_tokens, SUM(cost_usd) AS cost_usd "
+                "FROM model_usage WHERE day BETWEEN ? AND ? AND email_uid != '' "
+                "GROUP BY email_uid ORDER BY cost_usd DESC, input_tokens DESC LIMIT ?",
+                (start.isoformat(), end.isoformat(), limit)
+            )
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,98 @@
+"""
+Collection window that groups vacation requests into one portal session
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+import threading
+
+from .vacation_ledger import VacationLedger
+from .vacation_service import VacationService
+from ..models.vacation_models import VacationRequest
+from ..utils.logging_utils import get_logger
+from ..utils.metrics import record_cache
+
+logger = get_logger('vacation_batcher')
+
+class VacationBatcher:
+    """Groups vacation requests arriving within a short window and submits them as one batch"""
+
+    def __init__(self, service: VacationService, window: float = 2.0, max_batch_size: int = 10,
+                 max_workers: Optional[int] = None, ledger: Optional[VacationLedger] = None):
+        self.service = service
+        self.ledger = ledger
+        self.window = window
+        self.max_batch_size = max(1, max_batch_size)
+
+        # Bounded executor for blocking portal work, sized to the browser pool
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or service.pool.size,
+            thread_name_prefix="jane-portal"
+        )
+        self._pending: List[Tuple[VacationRequest, Future]] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def submit(self, request: VacationRequest) -> Future:
+        """Queue a request; the returned future resolves to its result dict"""
+        future: Future = Future()
+        
+        # 이미 제출되었거나 처리 중인 신청은 기록된 결과를 바로 반환
+        if self.ledger is not None:
+            recorded = self.ledger.claim(request)
+            record_cache('vacation_ledger', recorded is not None)
+            if recorded is not None:
+                future.set_result(recorded)
+                return future
+        
+        with self._lock:
+            self._pending.append((request, future))
+            if len(self._pending) >= self.max_batch_size or self.window <= 0:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return future
+
+    def flush(self):
+        """Submit everything collected so far"""
+        with self._lock:
+            self._flush_locked()
+
+    def shutdown(self):
+        """Flush pending requests and wait for running batches"""
+        self.flush()
+        self.executor.shutdown(wait=True)
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self.executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[VacationRequest, Future]]):
+        if len(batch) > 1:
+            logger.info(f"휴가 신청 {len(batch)}건을 한 번의 포털 세션으로 처리합니다")
+        try:
+            results = self.service.submit_vacation_requests([request for request, _ in batch])
+            for (request, future), result in zip(batch, results):
+                self._record(request, result)
+                future.set_result(result)
+        except Exception as e:
+            logger.error(f"휴가 신청 일괄 처리 중 오류: {e}")
+            for request, future in batch:
+                if not future.done():
+                    # 어느 단계에서 실패했는지 알 수 없으므로 제출되었을 수 있는 것으로 기록
+                    self._record(request, {"success": False, "unconfirmed": True, "message": str(e)})
+                    future.set_exception(e)
+    
+    def _record(self, request: VacationRequest, result: dict):
+        if self.ledger is None:
+            return
+        try:
+            self.ledger.record(request, result)
+        except Exception as e:
+            logger.error(f"휴가 신청 기록 저장 실패: {e}")
@@ -0,0 +1,119 @@
+"""
+Local ledger of vacation submissions to prevent duplicate portal drafts
+"""
+from pathlib import Path
+from typing import Optional
+import sqlite3
+import threading
+import time
+
+from ..models.vacation_models import VacationRequest
+from ..utils.logging_utils import get_logger
+
+logger = get_logger('vacation_ledger')
+
+STATUS_PENDING = "pending"
+STATUS_SUBMITTED = "submitted"
+STATUS_FAILED = "failed"
+# 제출 단계 이후 실패 (양식이 전송되었을 수 있음) - 자동으로 다시 제출하지 않음
+STATUS_UNCONFIRMED = "unconfirmed"
+
+class VacationLedger:
+    """SQLite ledger keyed on requester, dates and vacation type"""
+
+    def __init__(self, path: str = "data/vacation_ledger.db", pending_timeout: float = 600.0):
+        self.path = path
+        self.pending_timeout = pending_timeout
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS vacation_ledger (
+                requester TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                vacation_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                message TEXT NOT NULL DEFAULT '',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (requester, start_date, end_date, vacation_type)
+            )
+        """)
+
+    @staticmethod
+    def _key(request: VacationRequest):
+        return (request.requester.lower(), request.start_date, request.end_date, request.vacation_type)
+
+    def claim(self, request: VacationRequest) -> Optional[dict]:
+        """
+        Mark a request as pending before submission
+
+        Returns:
+            Optional[dict]: The recorded result when the request was already submitted,
+            is still in flight or may have been posted (unconfirmed); None when the
+            caller should submit it now
+        """
+        key = self._key(request)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT status, message, updated_at FROM vacation_ledger "
+                    "WHERE requester = ? AND start_date = ? AND end_date = ? AND vacation_type = ?",
+                    key
+                ).fetchone()
+
+                if row:
+                    status, message, updated_at = row
+                    if status == STATUS_SUBMITTED:
+                        logger.info(f"이미 제출된 휴가 신청입니다: {key}")
+                        self._conn.execute("COMMIT")
+                        return {"success": True, "duplicate": True, "message": message}
+                    if status == STATUS_UNCONFIRMED:
+                        logger.warning(f"제출 여부를 확인하지 못한 휴가 신청입니다: {key}")
+                        self._conn.execute("COMMIT")
+                        return {"success": False, "duplicate": True, "unconfirmed": True,
+                                "message": "이전 휴가 신청이 포털에 제출되었는지 확인하지 못했습니다. "
+                                           "포털 e-Approval에서 기안 여부를 확인해 주세요"}
+                    if status == STATUS_PENDING and now - updated_at < self.pending_timeout:
+                        logger.info(f"처리 중인 휴가 신청입니다: {key}")
+                        self._conn.execute("COMMIT")
+                        return {"success": False, "duplicate": True,
+                                "message": "동일한 휴가 신청이 이미 처리 중입니다"}
+
+                self._conn.execute(
+                    "INSERT INTO vacation_ledger (requester, start_date, end_date, vacation_type, status, attempts, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, 1, ?) "
+                    "ON CONFLICT (requester, start_date, end_date, vacation_type) "
+                    "DO UPDATE SET status = excluded.status, attempts = attempts + 1, updated_at = excluded.updated_at",
+                    key + (STATUS_PENDING, now)
+                )
+                self._conn.execute("COMMIT")
+                return None
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def record(self, request: VacationRequest, result: dict):
+        """Store the submission outcome ("unconfirmed" results are never re-claimed automatically)"""
+        if result.get("success"):
+            status = STATUS_SUBMITTED
+        elif result.get("unconfirmed"):
+            status = STATUS_UNCONFIRMED
+        else:
+            status = STATUS_FAILED
+        with self._lock:
+            self._conn.execute(
+                "UPDATE vacation_ledger SET status = ?, message = ?, updated_at = ? "
+                "WHERE requester = ? AND start_date = ? AND end_date = ? AND vacation_type = ?",
+                (status, result.get("message", ""), time.time()) + self._key(request)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,37 +1,63 @@
 """
-Vacation request service using Selenium automation
+Vacation request service using Selenium automation (with an optional HTTP backend)
 """
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.action_chains import ActionChains
-from webdriver_manager.chrome import ChromeDriverManager
-from pydantic import BaseModel
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
 from datetime import datetime
-import time
+import threading
 
+from .browser_pool import BrowserPool, BrowserSetupError, PortalLoginError
+from .portal_http import HttpVacationBackend
+from ..models.vacation_models import VacationRequest
 from ..utils.logging_utils import get_logger
 
+if TYPE_CHECKING:
+    from .portal_steps import PortalSteps
+
 logger = get_logger('vacation_service')
 
-class VacationRequest(BaseModel):
-    """Vacation request data model"""
-    start_date: str  # Format: YYYY-MM-DD
-    end_date: str    # Format: YYYY-MM-DD
-    vacation_type: str = "01"  # 01: 연가 (Annual Leave)
-    days_count: int = 1
-    reason: str = "개인 사유"
-    
+def _portal_ui():
+    """
+    Selenium and the page steps for the browser methods, imported on first use so that
+    loading this module (at application startup) does not pull in selenium
+
+    Returns:
+        module: portal_steps, which also exposes By and EC
+    """
+    from . import portal_steps
+    return portal_steps
+
+# Locators as (By.XPATH, ...) tuples
+VACATION_FORM_BOX = ("xpath", "//div[@class='aprv_doc_box'][@role='form_add'][.//h4[contains(text(), '직원휴가신청서(연차/대체휴가)')]]")
+REGFILE_BUTTON = ("xpath", "//span[@class='btn_gray'][@role='select_regfile'][contains(text(), '기록물철')]")
+
 class VacationService:
     """Service for handling vacation requests through KDI portal automation"""
     
-    def __init__(self, username: str = "", password: str = ""):
+    def __init__(self, username: str = "", password: str = "", pool: Optional[BrowserPool] = None,
+                 http_backend: Optional[HttpVacationBackend] = None):
         self.username = username
         self.password = password
-        self.driver = None
+        self.pool = pool or BrowserPool(username=username, password=password)
+        self.http_backend = http_backend
+        self._local = threading.local()
+    
+    @property
+    def driver(self):
+        """Browser driver used by the submission running on the current thread"""
+        return getattr(self._local, 'driver', None)
+    
+    @driver.setter
+    def driver(self, value):
+        self._local.driver = value
+    
+    @property
+    def steps(self) -> Optional["PortalSteps"]:
+        """Page-step runner of the submission running on the current thread"""
+        return getattr(self._local, 'steps', None)
+    
+    @steps.setter
+    def steps(self, value: Optional["PortalSteps"]):
+        self._local.steps = value
     
     def submit_vacation_request(self, request: VacationRequest) -> dict:
         """
@@ -43,166 +69,214 @@ class VacationService:
         Returns:
             dict: Result with success status and message
         """
-        try:
-            logger.info(f"휴가 신청 시작: {request.start_date} ~ {request.end_date}")
-            
-            # Initialize browser
-            if not self._setup_browser():
-                return {"success": False, "message": "브라우저 초기화 실패"}
-            
-            # Login to portal
-            if not self._login():
-                return {"success": False, "message": "포털 로그인 실패"}
-            
-            # Navigate to vacation request form
-            if not self._navigate_to_vacation_form():
-                return {"success": False, "message": "휴가 신청서 페이지 이동 실패"}
+        return self.submit_vacation_requests([request])[0]
+    
+    def submit_vacation_requests(self, requests: List[VacationRequest]) -> List[dict]:
+        """
+        Submit several vacation requests in one portal session
+        
+        Uses the HTTP backend when configured and falls back to the browser
+        for requests whose HTTP path failed before anything was posted.
+        
+        Args:
+            requests: VacationRequest objects to submit
             
-            # Fill vacation form
-            if not self._fill_vacation_form(request):
-                return {"success": False, "message": "휴가 신청서 작성 실패"}
+        Returns:
+            List[dict]: One result (success status and message) per request, in order
+        """
+        results: List[Optional[dict]] = [None] * len(requests)
+        browser_indexes = list(range(len(requests)))
+        
+        if self.http_backend:
+            browser_indexes = []
+            for index, request in enumerate(requests):
+                result = self.http_backend.submit_vacation_request(request)
+                if result["success"] or not result.pop("fallback", False):
+                    result.pop("fallback", None)
+                    results[index] = result
+                else:
+                    logger.warning(f"HTTP 휴가 신청 실패, 브라우저로 재시도합니다: {result['message']}")
+                    browser_indexes.append(index)
+        
+        if browser_indexes:
+            browser_results = self._submit_with_browser([requests[index] for index in browser_indexes])
+            for index, result in zip(browser_indexes, browser_results):
+                results[index] = result
+        
+        return results
+    
+    def _submit_with_browser(self, requests: List[VacationRequest]) -> List[dict]:
+        """Submit vacation requests by driving the portal UI, reusing one pooled browser session while it stays healthy"""
+        results: List[dict] = []
+        try:
+            logger.info(f"휴가 신청 시작 ({len(requests)}건)")
             
-            # Submit form
-            if not self._submit_form(request.reason):
-                return {"success": False, "message": "휴가 신청서 제출 실패"}
+            # Borrow a warm, logged-in browser session; a discarded one is replaced for the rest of the batch
+            while len(results) < len(requests):
+                with self.pool.session() as browser:
+                    self._submit_in_session(browser, requests[len(results):], results)
             
-            logger.info("휴가 신청이 성공적으로 완료되었습니다")
-            return {"success": True, "message": "휴가 신청이 성공적으로 완료되었습니다"}
+            return results
+        
+        except BrowserSetupError as e:
+            logger.error(f"{e}")
+            message = "브라우저 초기화 실패"
+        
+        except PortalLoginError:
+            message = "포털 로그인 실패"
             
         except Exception as e:
             logger.error(f"휴가 신청 중 오류 발생: {e}")
-            return {"success": False, "message": f"휴가 신청 중 오류 발생: {str(e)}"}
+            message = f"휴가 신청 중 오류 발생: {str(e)}"
         
-        finally:
-            if self.driver:
-                self.driver.quit()
-                logger.info("브라우저를 종료했습니다")
+        return results + [{"success": False, "message": message}] * (len(requests) - len(results))
     
-    def _setup_browser(self) -> bool:
-        """Setup browser with anti-detection options"""
+    def _submit_in_session(self, browser, requests: List[VacationRequest], results: List[dict]):
+        """
+        Submit requests in one borrowed session, appending to results, until done or the session is discarded
+        
+        Args:
+            browser: Pooled browser session
+            requests: Requests not yet attempted
+            results: Results of the batch so far (one is appended per attempted request)
+        """
+        ui = _portal_ui()
+        self.driver = browser.driver
+        self.steps = ui.PortalSteps(browser.driver)
         try:
-            chrome_options = webdriver.ChromeOptions()
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage') 
-            chrome_options.add_argument('--disable-extensions')
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            try:
-                self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-                self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-                return True
-            except Exception as e:
-                logger.warning(f"Chrome 드라이버 시작 실패, Edge 시도: {e}")
-                from selenium.webdriver.edge.service import Service as EdgeService  
-                from webdriver_manager.microsoft import EdgeChromiumDriverManager
-                self.driver = webdriver.Edge(service=EdgeService(EdgeChromiumDriverManager().install()))
-                return True
+            tree_ready = False
+            for position, request in enumerate(requests):
+                logger.info(f"휴가 신청서 작성: {request.start_date} ~ {request.end_date}")
+                
+                # Open the e-Approval form tree once and reuse it while the session is healthy
+                if not tree_ready:
+                    if position:
+                        self.driver.get(self.pool.base_url)
+                    tree_ready = self._open_form_tree()
+                    if not tree_ready:
+                        browser.discard()
+                        results.append({"success": False, "message": "휴가 신청서 페이지 이동 실패"})
+                        return
+                
+                result = self._submit_in_form_window(request)
+                results.append(result)
+                if not result["success"]:
+                    # 실패한 드라이버로 나머지를 계속하지 않고 새 세션에서 이어서 처리
+                    browser.discard()
+                    return
                 
+                # Close the form popup; re-open the tree if the form replaced it
+                tree_ready = self._return_to_main_window(browser)
+                if not browser.healthy:
+                    return
+        finally:
+            if self.steps and self.steps.timings:
+                logger.info(f"휴가 신청 단계별 소요 시간: {self.steps.summary()}")
+            self.driver = None
+            self.steps = None
+    
+    def _submit_in_form_window(self, request: VacationRequest) -> dict:
+        """Open, fill and submit one vacation form from the expanded form tree"""
+        # Navigate to vacation request form
+        if not self._open_vacation_form():
+            return {"success": False, "message": "휴가 신청서 페이지 이동 실패"}
+        
+        # Fill vacation form
+        if not self._fill_vacation_form(request):
+            return {"success": False, "message": "휴가 신청서 작성 실패"}
+        
+        # Submit form
+        submitted = self._submit_form(request.reason)
+        if submitted is None:
+            return {"success": False, "unconfirmed": True, "message": "휴가 신청서 제출 결과를 확인하지 못했습니다"}
+        if not submitted:
+            return {"success": False, "message": "휴가 신청서 제출 실패"}
+        
+        logger.info("휴가 신청이 성공적으로 완료되었습니다")
+        return {"success": True, "message": "휴가 신청이 성공적으로 완료되었습니다"}
+    
+    def _return_to_main_window(self, browser) -> bool:
+        """Close form popups; returns True when the form tree is still open in the main window"""
+        try:
+            handles = self.driver.window_handles
+            for handle in handles:
+                if handle != browser.main_window:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+            self.driver.switch_to.window(browser.main_window)
+            return len(handles) > 1
         except Exception as e:
-            logger.error(f"브라우저 초기화 실패: {e}")
+            logger.warning(f"메인 창 복귀 실패: {e}")
+            browser.discard()
             return False
     
-    def _login(self) -> bool:
-        """Login to KDI portal"""
+    def _open_form_tree(self) -> bool:
+        """Open e-Approval document creation and expand the personnel form category"""
+        ui = _portal_ui()
+        
         try:
-            self.driver.get("https://portal.kdischool.ac.kr")
-            wait = WebDriverWait(self.driver, 10)
-            
-            username_field = wait.until(EC.presence_of_element_located((By.ID, "login_id")))
-            password_field = wait.until(EC.presence_of_element_located((By.ID, "login_pwd")))
+            steps = self.steps
             
-            username_field.clear()
-            username_field.send_keys(self.username)
+            # e-Approval 메뉴 클릭 → 문서작성 버튼 표시
+            with steps.step("open_approval_menu") as wait:
+                wait.until(ui.EC.element_to_be_clickable((ui.By.XPATH, "//div[@title='e-Approval']"))).click()
+                doc_create_button = wait.until(ui.EC.element_to_be_clickable((ui.By.XPATH, "//span[@title='문서작성']")))
             
-            password_field.clear()  
-            password_field.send_keys(self.password)
+            # 문서작성 버튼 클릭 → 서식(복무) 카테고리 표시
+            with steps.step("open_document_tree") as wait:
+                doc_create_button.click()
+                personnel_category = wait.until(ui.EC.element_to_be_clickable((ui.By.XPATH, "//span[@class='tree_label'][contains(text(), '3. 서식(복무) (Personnel documents)')]")))
             
-            login_submit = self.driver.find_element(By.XPATH, "//input[@type='submit'][@value='Login']")
-            login_submit.click()
+            # 서식(복무) 카테고리 클릭 → 양식 목록 표시
+            with steps.step("open_personnel_category") as wait:
+                personnel_category.click()
+                wait.until(ui.EC.presence_of_element_located(VACATION_FORM_BOX))
             
-            time.sleep(2)
+            return True
             
-            current_url = self.driver.current_url
-            if "portal" in current_url or "main" in current_url or "dashboard" in current_url:
-                logger.info("포털 로그인 성공")
-                return True
-            else:
-                logger.error("포털 로그인 실패")
-                return False
-                
         except Exception as e:
-            logger.error(f"로그인 중 오류: {e}")
+            logger.error(f"휴가 신청서 페이지 이동 중 오류: {e}")
             return False
     
-    def _navigate_to_vacation_form(self) -> bool:
-        """Navigate to vacation request form"""
+    def _open_vacation_form(self) -> bool:
+        """Open the vacation form popup and select its record file"""
+        ui = _portal_ui()
+        
         try:
-            wait = WebDriverWait(self.driver, 10)
-            
-            # e-Approval 메뉴 클릭
-            approval_menu = wait.until(EC.element_to_be_clickable((By.XPATH, "//div[@title='e-Approval']")))
-            approval_menu.click()
-            time.sleep(1)
+            steps = self.steps
             
-            # 문서작성 버튼 클릭
-            doc_create_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[@title='문서작성']")))
-            doc_create_button.click()
-            time.sleep(1)
-            
-            # 서식(복무) 카테고리 클릭
-            personnel_category = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[@class='tree_label'][contains(text(), '3. 서식(복무) (Personnel documents)')]")))
-            personnel_category.click()
-            time.sleep(1)
-            
-            # 직원휴가신청서(연차/대체휴가) 양식 클릭
-            try:
-                vacation_form = wait.until(EC.presence_of_element_located((By.XPATH, "//div[@class='aprv_doc_box'][@role='form_add']//h4[contains(text(), '직원휴가신청서(연차/대체휴가)')]")))
+            # 직원휴가신청서(연차/대체휴가) 양식 클릭 → 팝업 창 열림
+            with steps.step("open_vacation_form_popup") as wait:
+                vacation_form = wait.until(ui.EC.presence_of_element_located(VACATION_FORM_BOX))
+                current_window = self.driver.current_window_handle
+                handles_before = self.driver.window_handles
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", vacation_form)
-                time.sleep(1)
                 self.driver.execute_script("arguments[0].click();", vacation_form)
-            except:
-                # 전체 div 박스 클릭 방식
-                vacation_div = self.driver.find_element(By.XPATH, "//div[@class='aprv_doc_box'][@role='form_add'][.//h4[contains(text(), '직원휴가신청서(연차/대체휴가)')]]")
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", vacation_div)
-                time.sleep(1)
-                self.driver.execute_script("arguments[0].click();", vacation_div)
-            
-            time.sleep(1)
-            
-            # 팝업 창 처리
-            current_window = self.driver.current_window_handle
-            all_windows = self.driver.window_handles
-            
-            if len(all_windows) > 1:
-                for window in all_windows:
-                    if window != current_window:
+                
+                # 팝업이 아닌 현재 창에서 양식이 열리는 경우도 허용
+                wait.until(ui.EC.any_of(ui.popup_window_opened(handles_before), ui.EC.presence_of_element_located(REGFILE_BUTTON)))
+                for window in self.driver.window_handles:
+                    if window != current_window and window not in handles_before:
                         self.driver.switch_to.window(window)
                         break
             
-            # 기록물철 선택
-            regfile_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[@class='btn_gray'][@role='select_regfile'][contains(text(), '기록물철')]")))
-            regfile_button.click()
-            time.sleep(1)
+            # 기록물철 선택 → 기록물철 트리 표시
+            with steps.step("open_regfile_tree") as wait:
+                wait.until(ui.EC.element_to_be_clickable(REGFILE_BUTTON)).click()
+                wait.until(ui.EC.presence_of_element_located((ui.By.XPATH, "//span[@class='tree_label'][contains(text(), '부서복무관리')]")))
             
             # 부서복무관리 확장
-            try:
-                dept_mgmt = self.driver.find_element(By.XPATH, "//span[@class='tree_label'][contains(text(), '부서복무관리')]/parent::span[contains(@class, 'dynatree-expanded')]")
-            except:
-                dept_mgmt_expander = self.driver.find_element(By.XPATH, "//span[@class='tree_label'][contains(text(), '부서복무관리')]/preceding-sibling::span[@class='dynatree-expander']")
-                dept_mgmt_expander.click()
-                time.sleep(1)
-            
-            # 휴가(외출) 항목 선택
-            vacation_item = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[@class='tree_label'][contains(text(), '휴가(외출)')]")))
-            vacation_item.click()
-            time.sleep(1)
-            
-            # 확인 버튼 클릭
-            confirm_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[@type='button'][@highlight='true']//span[contains(text(), '확인')]")))
-            confirm_button.click()
-            time.sleep(1)
+            with steps.step("expand_department_node") as wait:
+                if not self.driver.find_elements(ui.By.XPATH, "//span[@class='tree_label'][contains(text(), '부서복무관리')]/parent::span[contains(@class, 'dynatree-expanded')]"):
+                    self.driver.find_element(ui.By.XPATH, "//span[@class='tree_label'][contains(text(), '부서복무관리')]/preceding-sibling::span[@class='dynatree-expander']").click()
+                    wait.until(ui.tree_node_expanded('부서복무관리'))
+            
+            # 휴가(외출) 항목 선택 후 확인 → 기록물철 대화상자 닫힘
+            with steps.step("select_regfile") as wait:
+                wait.until(ui.EC.element_to_be_clickable((ui.By.XPATH, "//span[@class='tree_label'][contains(text(), '휴가(외출)')]"))).click()
+                confirm_button = wait.until(ui.EC.element_to_be_clickable((ui.By.XPATH, "//button[@type='button'][@highlight='true']//span[contains(text(), '확인')]")))
+                confirm_button.click()
+                wait.until(ui.dialog_closed(confirm_button))
             
             logger.info("휴가 신청서 페이지 이동 완료")
             return True
@@ -211,72 +285,57 @@ class VacationService:
             logger.error(f"휴가 신청서 페이지 이동 중 오류: {e}")
             return False
     
+    def _pick_date(self, field_name: str, value: datetime):
+        """Pick a date through the jQuery UI datepicker of the given input"""
+        from selenium.webdriver.support.ui import Select
+        ui = _portal_ui()
+        
+        steps = self.steps
+        
+        # 입력 필드 클릭 → 날짜 선택기 표시
+        with steps.step(f"{field_name}_open_datepicker") as wait:
+            wait.until(ui.EC.element_to_be_clickable((ui.By.NAME, field_name))).click()
+            wait.until(ui.datepicker_rendered())
+        
+        # 년도/월 선택 → 해당 월 달력 표시 (월은 0-based)
+        with steps.step(f"{field_name}_select_month") as wait:
+            Select(wait.until(ui.EC.element_to_be_clickable((ui.By.CSS_SELECTOR, "select.ui-datepicker-year")))).select_by_value(str(value.year))
+            Select(wait.until(ui.EC.element_to_be_clickable((ui.By.CSS_SELECTOR, "select.ui-datepicker-month")))).select_by_value(str(value.month - 1))
+            wait.until(ui.datepicker_rendered(value.year, value.month))
+        
+        # 일 선택 → 날짜 선택기 닫힘
+        with steps.step(f"{field_name}_select_day") as wait:
+            day_xpath = f"//td[@data-handler='selectDay'][@data-month='{value.month - 1}'][@data-year='{value.year}']//a[text()='{value.day}']"
+            wait.until(ui.EC.element_to_be_clickable((ui.By.XPATH, day_xpath))).click()
+            wait.until(ui.datepicker_closed())
+    
     def _fill_vacation_form(self, request: VacationRequest) -> bool:
         """Fill vacation form with request data"""
+        from selenium.webdriver.support.ui import Select
+        ui = _portal_ui()
+        
         try:
-            wait = WebDriverWait(self.driver, 10)
-            
-            # 시작 날짜 설정
-            start_date_input = wait.until(EC.element_to_be_clickable((By.NAME, "StartDate_1")))
-            start_date_input.click()
-            time.sleep(1)
+            steps = self.steps
             
             # 날짜 파싱
             start_date = datetime.strptime(request.start_date, "%Y-%m-%d")
             end_date = datetime.strptime(request.end_date, "%Y-%m-%d")
             
-            # 년도 설정
-            year_select = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "select.ui-datepicker-year")))
-            year_dropdown = Select(year_select)
-            year_dropdown.select_by_value(str(start_date.year))
-            time.sleep(1)
-            
-            # 월 설정 (0-based index)
-            month_select = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "select.ui-datepicker-month")))
-            month_dropdown = Select(month_select)
-            month_dropdown.select_by_value(str(start_date.month - 1))
-            time.sleep(1)
-            
-            # 일 설정
-            day_xpath = f"//td[@data-handler='selectDay'][@data-month='{start_date.month - 1}'][@data-year='{start_date.year}']//a[text()='{start_date.day}']"
-            day_element = wait.until(EC.element_to_be_clickable((By.XPATH, day_xpath)))
-            day_element.click()
-            time.sleep(1)
-            
-            # 종료 날짜 설정
-            end_date_input = wait.until(EC.element_to_be_clickable((By.NAME, "EndDate_1")))
-            end_date_input.click()
-            time.sleep(1)
-            
-            # 종료일 년도 설정
-            end_year_select = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "select.ui-datepicker-year")))
-            end_year_dropdown = Select(end_year_select)
-            end_year_dropdown.select_by_value(str(end_date.year))
-            time.sleep(1)
-            
-            # 종료일 월 설정
-            end_month_select = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "select.ui-datepicker-month")))
-            end_month_dropdown = Select(end_month_select)
-            end_month_dropdown.select_by_value(str(end_date.month - 1))
-            time.sleep(1)
-            
-            # 종료일 일 설정
-            end_day_xpath = f"//td[@data-handler='selectDay'][@data-month='{end_date.month - 1}'][@data-year='{end_date.year}']//a[text()='{end_date.day}']"
-            end_day_element = wait.until(EC.element_to_be_clickable((By.XPATH, end_day_xpath)))
-            end_day_element.click()
-            time.sleep(1)
+            # 시작/종료 날짜 설정
+            self._pick_date("StartDate_1", start_date)
+            self._pick_date("EndDate_1", end_date)
             
             # 휴가 종류 선택
-            vacation_kind_select = wait.until(EC.element_to_be_clickable((By.NAME, "VactionKind_1")))
-            vacation_kind_dropdown = Select(vacation_kind_select)
-            vacation_kind_dropdown.select_by_value(request.vacation_type)
-            time.sleep(1)
+            with steps.step("select_vacation_kind") as wait:
+                vacation_kind_select = wait.until(ui.EC.element_to_be_clickable((ui.By.NAME, "VactionKind_1")))
+                Select(vacation_kind_select).select_by_value(request.vacation_type)
             
-            # 휴가 기간 입력
-            term_input = wait.until(EC.element_to_be_clickable((By.NAME, "Term_1")))
-            term_input.clear()
-            term_input.send_keys(str(request.days_count))
-            time.sleep(1)
+            # 휴가 기간 입력 → 입력값 반영 확인
+            with steps.step("enter_term") as wait:
+                term_input = wait.until(ui.EC.element_to_be_clickable((ui.By.NAME, "Term_1")))
+                term_input.clear()
+                term_input.send_keys(str(request.days_count))
+                wait.until(ui.EC.text_to_be_present_in_element_value((ui.By.NAME, "Term_1"), str(request.days_count)))
             
             logger.info("휴가 신청서 작성 완료")
             return True
@@ -285,30 +344,36 @@ class VacationService:
             logger.error(f"휴가 신청서 작성 중 오류: {e}")
             return False
     
-    def _submit_form(self, reason: str) -> bool:
-        """Submit the vacation form"""
+    def _submit_form(self, reason: str) -> Optional[bool]:
+        """
+        Submit the vacation form
+        
+        Returns:
+            Optional[bool]: True when submitted, False when it failed before the confirm
+            click, None when it failed after it (the draft may have been created)
+        """
+        ui = _portal_ui()
+        confirmed = False
+        
         try:
-            wait = WebDriverWait(self.driver, 10)
+            steps = self.steps
             
-            # 기안 버튼 클릭
-            submit_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[@class='btn_highlight'][@role='submit_approve'][contains(text(), '기안')]")))
-            submit_button.click()
-            time.sleep(2)
+            # 기안 버튼 클릭 → 의견 입력 팝업 표시
+            with steps.step("open_opinion_dialog") as wait:
+                wait.until(ui.EC.element_to_be_clickable((ui.By.XPATH, "//span[@class='btn_highlight'][@role='submit_approve'][contains(text(), '기안')]"))).click()
+                opinion_textarea = wait.until(ui.EC.element_to_be_clickable((ui.By.NAME, "opinion")))
             
-            # 의견 입력 팝업 처리
-            opinion_textarea = wait.until(EC.element_to_be_clickable((By.NAME, "opinion")))
-            opinion_textarea.clear()
-            opinion_textarea.send_keys(reason)
-            time.sleep(1)
-            
-            # 확인 버튼 클릭
-            confirm_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[@class='ui-button-text'][contains(text(), '확인')]")))
-            confirm_button.click()
-            time.sleep(2)
+            # 의견 입력 후 확인 → 의견 팝업 닫힘
+            with steps.step("confirm_submission") as wait:
+                opinion_textarea.clear()
+                opinion_textarea.send_keys(reason)
+                wait.until(ui.EC.element_to_be_clickable((ui.By.XPATH, "//span[@class='ui-button-text'][contains(text(), '확인')]"))).click()
+                confirmed = True
+                wait.until(ui.dialog_closed(opinion_textarea))
             
             logger.info("휴가 신청서 제출 완료")
             return True
             
         except Exception as e:
             logger.error(f"휴가 신청서 제출 중 오류: {e}")
-            return False
+            return None if confirmed else False
@@ -0,0 +1,317 @@
+"""
+Text extraction from email attachments (PDF, DOCX, XLSX, plain text and HTML)
+
+The extract_* functions run inside the attachment process pool, so this module
+only imports the standard library at load time; pypdf (requirements.txt) is
+imported on first use.
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from xml.etree.ElementTree import iterparse
+import io
+import os
+import posixpath
+import signal
+import zipfile
+
+# DOCX/XLSX 안의 XML 하나가 풀렸을 때 허용하는 최대 크기 (압축 폭탄 방지)
+MAX_XML_BYTES = 64 * 1024 * 1024
+# PDF에서 읽는 최대 페이지 수
+MAX_PDF_PAGES = 200
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_S = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_R = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_EXTENSIONS = {
+    '.pdf': 'pdf',
+    '.docx': 'docx',
+    '.xlsx': 'xlsx',
+    '.xlsm': 'xlsx',
+    '.txt': 'text',
+    '.csv': 'text',
+    '.tsv': 'text',
+    '.md': 'text',
+    '.log': 'text',
+    '.json': 'text',
+    '.htm': 'html',
+    '.html': 'html',
+}
+_CONTENT_TYPES = {
+    'application/pdf': 'pdf',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'xlsx',
+    'application/vnd.ms-excel.sheet.macroenabled.12': 'xlsx',
+    'text/html': 'html',
+}
+
+class ExtractionLimitReached(Exception):
+    """Raised internally once the output reaches max_chars"""
+
+class ExtractionTimeout(Exception):
+    """The attachment took longer than its time budget"""
+
+class MissingDependency(RuntimeError):
+    """An optional parser library is not installed (not a property of the file)"""
+
+def attachment_kind(filename: str, content_type: str) -> Optional[str]:
+    """
+    Decide which extractor handles an attachment
+
+    Args:
+        filename: Attachment file name (may be empty)
+        content_type: MIME type of the part
+
+    Returns:
+        Optional[str]: pdf, docx, xlsx, html or text; None when unsupported
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension in _EXTENSIONS:
+        return _EXTENSIONS[extension]
+    content_type = (content_type or '').lower()
+    if content_type in _CONTENT_TYPES:
+        return _CONTENT_TYPES[content_type]
+    if content_type.startswith('text/'):
+        return 'text'
+    return None
+
+class _TextBuffer:
+    """Collects output lines and stops the extractor once max_chars is reached"""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.lines: List[str] = []
+        self.length = 0
+
+    def add(self, line: str):
+        line = line.rstrip()
+        if not line and (not self.lines or not self.lines[-1]):
+            return
+        self.lines.append(line)
+        self.length += len(line) + 1
+        if self.length >= self.max_chars:
+            raise ExtractionLimitReached()
+
+    def text(self) -> str:
+        return '\n'.join(self.lines).strip()[:self.max_chars]
+
+def _read_xml(archive: zipfile.ZipFile, name: str) -> io.BytesIO:
+    info = archive.getinfo(name)
+    if info.file_size > MAX_XML_BYTES:
+        raise ValueError(f"{name}: 압축 해제 크기 초과 ({info.file_size} bytes)")
+    return io.BytesIO(archive.read(info))
+
+def _extract_docx(data: bytes, out: _TextBuffer):
+    """Paragraphs as lines, table rows as ' | '-joined cells"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        paragraph: List[str] = []
+        rows: List[List[str]] = []  # 중첩 표를 위한 스택
+        cells: List[List[str]] = []
+        for event, element in iterparse(_read_xml(archive, 'word/document.xml'), events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                if tag == f'{_W}tr':
+                    rows.append([])
+                elif tag == f'{_W}tc':
+                    cells.append([])
+                continue
+            if tag == f'{_W}t':
+                paragraph.append(element.text or '')
+            elif tag == f'{_W}tab':
+                paragraph.append('\t')
+            elif tag in (f'{_W}br', f'{_W}cr'):
+                paragraph.append('\n')
+            elif tag == f'{_W}p':
+                text = ''.join(paragraph).strip()
+                paragraph = []
+                if cells:
+                    if text:
+                        cells[-1].append(text)
+                else:
+                    for line in text.split('\n'):
+                        out.add(line)
+                    out.add('')
+            elif tag == f'{_W}tc' and cells:
+                cell = ' '.join(cells.pop())
+                if rows:
+                    rows[-1].append(cell)
+            elif tag == f'{_W}tr' and rows:
+                row = rows.pop()
+                if any(row):
+                    line = ' | '.join(row)
+                    if cells:
+                        cells[-1].append(line)
+                    else:
+                        out.add(line)
+            elif tag == f'{_W}tbl' and not cells:
+                out.add('')
+            element.clear()
+
+def _xlsx_shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings: List[str] = []
+    parts: List[str] = []
+    for _, element in iterparse(_read_xml(archive, 'xl/sharedStrings.xml')):
+        if element.tag == f'{_S}t':
+            parts.append(element.text or '')
+        elif element.tag == f'{_S}si':
+            strings.append(''.join(parts))
+            parts = []
+            element.clear()
+    return strings
+
+def _xlsx_sheets(archive: zipfile.ZipFile) -> Iterator[Tuple[str, str]]:
+    """(sheet name, worksheet path) in workbook order"""
+    targets: Dict[str, str] = {}
+    if 'xl/_rels/workbook.xml.rels' in archive.namelist():
+        for _, element in iterparse(_read_xml(archive, 'xl/_rels/workbook.xml.rels')):
+            if element.tag == f'{_REL}Relationship':
+                target = element.get('Target', '')
+                path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(f"xl/{target}")
+                targets[element.get('Id', '')] = path
+    for _, element in iterparse(_read_xml(archive, 'xl/workbook.xml')):
+        if element.tag == f'{_S}sheet':
+            path = targets.get(element.get(f'{_R}id', ''))
+            if path and path in archive.namelist():
+                yield element.get('name', ''), path
+
+def _extract_xlsx(data: bytes, out: _TextBuffer):
+    """One '## sheet' heading per worksheet, rows as ' | '-joined cell values"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        shared = _xlsx_shared_strings(archive)
+        for name, path in _xlsx_sheets(archive):
+            out.add(f"## {name}")
+            row: List[str] = []
+            cell_type, value, inline = None, None, []
+            for event, element in iterparse(_read_xml(archive, path), events=('start', 'end')):
+                tag = element.tag
+                if event == 'start':
+                    if tag == f'{_S}c':
+                        cell_type, value, inline = element.get('t'), None, []
+                    continue
+                if tag == f'{_S}v':
+                    value = element.text
+                elif tag == f'{_S}t':
+                    inline.append(element.text or '')
+                elif tag == f'{_S}c':
+                    if cell_type == 's' and value is not None and value.isdigit() and int(value) < len(shared):
+                        text = shared[int(value)]
+                    elif cell_type == 'inlineStr':
+                        text = ''.join(inline)
+                    elif cell_type == 'b':
+                        text = 'TRUE' if value == '1' else 'FALSE'
+                    else:
+                        text = value or ''
+                    row.append(text.strip())
+                    element.clear()
+                elif tag == f'{_S}row':
+                    while row and not row[-1]:
+                        row.pop()
+                    if row:
+                        out.add(' | '.join(row))
+                    row = []
+                    element.clear()
+            out.add('')
+
+def _extract_pdf(data: bytes, out: _TextBuffer):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise MissingDependency("PDF 텍스트 추출에는 pypdf가 필요합니다 (pip install pypdf)")
+    reader = PdfReader(io.BytesIO(data))
+    for index, page in enumerate(reader.pages):
+        if index >= MAX_PDF_PAGES:
+            break
+        for line in (page.extract_text() or '').split('\n'):
+            out.add(line)
+        out.add('')
+
+def _extract_text(data: bytes, out: _TextBuffer, charset: Optional[str] = None):
+    from .email_utils import decode_bytes
+    for line in decode_bytes(data, charset).splitlines():
+        out.add(line)
+
+def _extract_html(data: bytes, out: _TextBuffer, charset: Optional[str] = None):
+    from .email_utils import decode_bytes
+    from .html_text import html_to_text
+    for line in html_to_text(decode_bytes(data, charset), limit=out.max_chars).splitlines():
+        out.add(line)
+
+_EXTRACTORS: Dict[str, Callable] = {
+    'pdf': _extract_pdf,
+    'docx': _extract_docx,
+    'xlsx': _extract_xlsx,
+    'text': _extract_text,
+    'html': _extract_html,
+}
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+def extract_attachment_text(data: Union[bytes, str], kind: str, max_chars: int = 20000, timeout: float = 0,
+                            charset: Optional[str] = None) -> Tuple[str, bool]:
+    """
+    Extract readable text from an attachment (entry point of the process pool)
+
+    Args:
+        data: Decoded attachment bytes, or the path of a file holding them
+        kind: Extractor name from attachment_kind
+        max_chars: Stop once this many characters have been extracted
+        timeout: Seconds before the extraction is aborted (0: no limit); enforced with
+            SIGALRM in the pool process, so a pathological file cannot hold a worker
+        charset: Declared charset for text attachments
+
+    Returns:
+        Tuple[str, bool]: Extracted text and whether it was cut at max_chars
+    """
+    out = _TextBuffer(max_chars)
+    extractor = _EXTRACTORS[kind]
+    use_alarm = timeout > 0 and hasattr(signal, 'setitimer')
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if isinstance(data, str):
+            with open(data, 'rb') as f:
+                data = f.read()
+        if kind in ('text', 'html'):
+            extractor(data, out, charset)
+        else:
+            extractor(data, out)
+        truncated = False
+    except ExtractionLimitReached:
+        truncated = True
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return out.text(), truncated
+
+def format_attachments(attachments: List, with_text: bool = True, max_total_chars: int = 40000) -> str:
+    """
+    Render extracted attachments for a prompt
+
+    Args:
+        attachments: AttachmentText list
+        with_text: Include the extracted text, not just the file list
+        max_total_chars: Text budget shared by all attachments
+
+    Returns:
+        str: Empty when there are no attachments
+    """
+    sections = []
+    budget = max_total_chars
+    for attachment in attachments:
+        header = f"- {attachment.filename} ({attachment.content_type}, {attachment.size:,} bytes)"
+        if attachment.error:
+            header += f" [텍스트 없음: {attachment.error}]"
+        elif attachment.truncated:
+            header += " [앞부분만 추출]"
+        if not with_text or not attachment.text or budget <= 0:
+            sections.append(header)
+            continue
+        text = attachment.text[:budget]
+        budget -= len(text)
+        sections.append(f"{header}\n```\n{text}\n```")
+    return '\n'.join(sections)
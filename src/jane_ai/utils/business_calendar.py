@@ -0,0 +1,233 @@
+"""
+Business-day calendar for vacation validation
+"""
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# 관공서 공휴일 (대체공휴일, 선거일, 임시공휴일 포함)
+KOREAN_PUBLIC_HOLIDAYS: Dict[str, str] = {
+    # 2024
+    "2024-01-01": "신정",
+    "2024-02-09": "설날 전날",
+    "2024-02-10": "설날",
+    "2024-02-11": "설날 다음날",
+    "2024-02-12": "설날 대체 휴일",
+    "2024-03-01": "삼일절",
+    "2024-04-10": "국회의원 선거일",
+    "2024-05-05": "어린이날",
+    "2024-05-06": "어린이날 대체 휴일",
+    "2024-05-15": "부처님오신날",
+    "2024-06-06": "현충일",
+    "2024-08-15": "광복절",
+    "2024-09-16": "추석 전날",
+    "2024-09-17": "추석",
+    "2024-09-18": "추석 다음날",
+    "2024-10-01": "국군의 날(임시공휴일)",
+    "2024-10-03": "개천절",
+    "2024-10-09": "한글날",
+    "2024-12-25": "기독탄신일",
+    # 2025
+    "2025-01-01": "신정",
+    "2025-01-27": "임시공휴일",
+    "2025-01-28": "설날 전날",
+    "2025-01-29": "설날",
+    "2025-01-30": "설날 다음날",
+    "2025-03-01": "삼일절",
+    "2025-03-03": "삼일절 대체 휴일",
+    "2025-05-05": "부처님오신날",
+    "2025-05-06": "어린이날 대체 휴일",
+    "2025-06-03": "대통령 선거일",
+    "2025-06-06": "현충일",
+    "2025-08-15": "광복절",
+    "2025-10-03": "개천절",
+    "2025-10-05": "추석 전날",
+    "2025-10-06": "추석",
+    "2025-10-07": "추석 다음날",
+    "2025-10-08": "추석 대체 휴일",
+    "2025-10-09": "한글날",
+    "2025-12-25": "기독탄신일",
+    # 2026
+    "2026-01-01": "신정",
+    "2026-02-16": "설날 전날",
+    "2026-02-17": "설날",
+    "2026-02-18": "설날 다음날",
+    "2026-03-01": "삼일절",
+    "2026-03-02": "삼일절 대체 휴일",
+    "2026-05-01": "노동절",
+    "2026-05-05": "어린이날",
+    "2026-05-24": "부처님오신날",
+    "2026-05-25": "부처님오신날 대체 휴일",
+    "2026-06-03": "지방선거일",
+    "2026-06-06": "현충일",
+    "2026-07-17": "제헌절",
+    "2026-08-15": "광복절",
+    "2026-08-17": "광복절 대체 휴일",
+    "2026-09-24": "추석 전날",
+    "2026-09-25": "추석",
+    "2026-09-26": "추석 다음날",
+    "2026-10-03": "개천절",
+    "2026-10-05": "개천절 대체 휴일",
+    "2026-10-09": "한글날",
+    "2026-12-25": "기독탄신일",
+    # 2027
+    "2027-01-01": "신정",
+    "2027-02-06": "설날 전날",
+    "2027-02-07": "설날",
+    "2027-02-08": "설날 다음날",
+    "2027-02-09": "설날 대체 휴일",
+    "2027-03-01": "삼일절",
+    "2027-05-01": "노동절",
+    "2027-05-03": "노동절 대체 휴일",
+    "2027-05-05": "어린이날",
+    "2027-05-13": "부처님오신날",
+    "2027-06-06": "현충일",
+    "2027-07-17": "제헌절",
+    "2027-07-19": "제헌절 대체 휴일",
+    "2027-08-15": "광복절",
+    "2027-08-16": "광복절 대체 휴일",
+    "2027-09-14": "추석 전날",
+    "2027-09-15": "추석",
+    "2027-09-16": "추석 다음날",
+    "2027-10-03": "개천절",
+    "2027-10-04": "개천절 대체 휴일",
+    "2027-10-09": "한글날",
+    "2027-10-11": "한글날 대체 휴일",
+    "2027-12-25": "기독탄신일",
+    "2027-12-27": "기독탄신일 대체 휴일",
+    # 2028
+    "2028-01-01": "신정",
+    "2028-01-26": "설날 전날",
+    "2028-01-27": "설날",
+    "2028-01-28": "설날 다음날",
+    "2028-03-01": "삼일절",
+    "2028-04-12": "국회의원 선거일",
+    "2028-05-01": "노동절",
+    "2028-05-02": "부처님오신날",
+    "2028-05-05": "어린이날",
+    "2028-06-06": "현충일",
+    "2028-07-17": "제헌절",
+    "2028-08-15": "광복절",
+    "2028-10-02": "추석 전날",
+    "2028-10-03": "개천절",
+    "2028-10-04": "추석 다음날",
+    "2028-10-05": "추석 대체 휴일",
+    "2028-10-09": "한글날",
+    "2028-12-25": "기독탄신일",
+    # 2029
+    "2029-01-01": "신정",
+    "2029-02-12": "설날 전날",
+    "2029-02-13": "설날",
+    "2029-02-14": "설날 다음날",
+    "2029-03-01": "삼일절",
+    "2029-05-01": "노동절",
+    "2029-05-05": "어린이날",
+    "2029-05-07": "어린이날 대체 휴일",
+    "2029-05-20": "부처님오신날",
+    "2029-05-21": "부처님오신날 대체 휴일",
+    "2029-06-06": "현충일",
+    "2029-07-17": "제헌절",
+    "2029-08-15": "광복절",
+    "2029-09-21": "추석 전날",
+    "2029-09-22": "추석",
+    "2029-09-23": "추석 다음날",
+    "2029-09-24": "추석 대체 휴일",
+    "2029-10-03": "개천절",
+    "2029-10-09": "한글날",
+    "2029-12-25": "기독탄신일",
+    # 2030
+    "2030-01-01": "신정",
+    "2030-02-02": "설날 전날",
+    "2030-02-03": "설날",
+    "2030-02-04": "설날 다음날",
+    "2030-02-05": "설날 대체 휴일",
+    "2030-03-01": "삼일절",
+    "2030-04-03": "대통령 선거일",
+    "2030-05-01": "노동절",
+    "2030-05-05": "어린이날",
+    "2030-05-06": "어린이날 대체 휴일",
+    "2030-05-09": "부처님오신날",
+    "2030-06-06": "현충일",
+    "2030-06-12": "지방선거일",
+    "2030-07-17": "제헌절",
+    "2030-08-15": "광복절",
+    "2030-09-11": "추석 전날",
+    "2030-09-12": "추석",
+    "2030-09-13": "추석 다음날",
+    "2030-10-03": "개천절",
+    "2030-10-09": "한글날",
+    "2030-12-25": "기독탄신일"
+}
+
+class BusinessCalendar:
+    """Precomputed index of weekends and public holidays with O(1) lookups"""
+    
+    def __init__(self, holidays: Dict[str, str]):
+        self.holidays = {datetime.strptime(day, "%Y-%m-%d").date(): name for day, name in holidays.items()}
+        self.first_day = date(min(self.holidays).year, 1, 1)
+        self.last_day = date(max(self.holidays).year, 12, 31)
+        
+        # 날짜 오프셋별 근무일 여부와 누적 근무일 수
+        total_days = (self.last_day - self.first_day).days + 1
+        self._business = bytearray(total_days)
+        self._cumulative = [0] * (total_days + 1)
+        for offset in range(total_days):
+            day = self.first_day + timedelta(days=offset)
+            is_business = day.weekday() < 5 and day not in self.holidays
+            self._business[offset] = is_business
+            self._cumulative[offset + 1] = self._cumulative[offset] + is_business
+    
+    def _offset(self, day: date) -> int:
+        if not self.first_day <= day <= self.last_day:
+            raise ValueError(
+                f"{day.isoformat()}은(는) 휴일 달력 범위"
+                f"({self.first_day.isoformat()} ~ {self.last_day.isoformat()})를 벗어났습니다"
+            )
+        return (day - self.first_day).days
+    
+    def is_business_day(self, day: date) -> bool:
+        """Check whether the day is neither a weekend nor a public holiday"""
+        return bool(self._business[self._offset(day)])
+    
+    def holiday_name(self, day: date) -> Optional[str]:
+        """Return the public holiday name, or None"""
+        return self.holidays.get(day)
+    
+    def count_business_days(self, start: date, end: date) -> int:
+        """Count business days in the inclusive range [start, end]"""
+        return self._cumulative[self._offset(end) + 1] - self._cumulative[self._offset(start)]
+
+@lru_cache(maxsize=1)
+def get_business_calendar() -> BusinessCalendar:
+    """Return the shared calendar index (built once per process)"""
+    return BusinessCalendar(KOREAN_PUBLIC_HOLIDAYS)
+
+def validate_vacation_period(start_date: str, end_date: str) -> Tuple[date, date, int]:
+    """
+    Validate a vacation period and count its business days
+    
+    Args:
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+        
+    Returns:
+        Tuple[date, date, int]: Parsed start, end and business days count
+        
+    Raises:
+        ValueError: If the period is malformed or contains no business day
+    """
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"날짜 형식이 올바르지 않습니다 (YYYY-MM-DD): {start_date} ~ {end_date}")
+    
+    if end < start:
+        raise ValueError(f"종료일({end_date})이 시작일({start_date})보다 빠릅니다")
+    
+    calendar = get_business_calendar()
+    days_count = calendar.count_business_days(start, end)
+    if days_count == 0:
+        raise ValueError(f"{start_date} ~ {end_date} 기간에 근무일이 없습니다 (주말/공휴일)")
+    
+    return start, end, days_count
@@ -3,22 +3,79 @@ Email utility functions
 """
 import re
 import html
+import codecs
 import logging
 from email.header import decode_header
 from email.message import Message
-from typing import Tuple, Optional
+from functools import lru_cache
+from typing import Dict, List, Tuple, Optional
 
-def decode_mime_words(s: str) -> str:
+from .html_text import html_to_text
+
+# 국내 메일에서 흔한 charset 이름 (EUC-KR로 표기돼도 실제로는 확장 한글이 섞인 CP949인 경우가 많음)
+_CHARSET_ALIASES = {
+    'ks_c_5601-1987': 'cp949',
+    'ks_c_5601-1989': 'cp949',
+    'ks_c_5601': 'cp949',
+    'ksc5601': 'cp949',
+    'ksc_5601': 'cp949',
+    'euc-kr': 'cp949',
+    'euc_kr': 'cp949',
+    'x-euc-kr': 'cp949',
+    'windows-949': 'cp949',
+    'x-windows-949': 'cp949',
+    'ms949': 'cp949',
+}
+# charset이 없거나 알 수 없을 때 순서대로 시도
+_FALLBACK_CODECS = ('utf-8', 'cp949')
+
+@lru_cache(maxsize=64)
+def _lookup_codec(charset: Optional[str]) -> Optional[str]:
+    """Python codec name for a declared MIME charset (None when missing or unknown)"""
+    if not charset:
+        return None
+    name = charset.strip().strip('"\'').lower()
+    name = _CHARSET_ALIASES.get(name, name)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        # unknown-8bit 등
+        return None
+
+def decode_bytes(data: bytes, charset: Optional[str] = None) -> str:
+    """
+    Decode bytes using the declared charset, falling back to UTF-8 and then CP949
+
+    Args:
+        data: Raw bytes (payload or header fragment)
+        charset: Declared charset, if any
+
+    Returns:
+        str: Decoded text; undecodable bytes become U+FFFD instead of being dropped
+    """
+    codec = _lookup_codec(charset)
+    if codec is not None:
+        try:
+            return data.decode(codec)
+        except UnicodeDecodeError:
+            pass
+    for fallback in _FALLBACK_CODECS:
+        if fallback == codec:
+            continue
+        try:
+            return data.decode(fallback)
+        except UnicodeDecodeError:
+            pass
+    return data.decode(codec or 'utf-8', errors='replace')
+
+def decode_mime_words(s) -> str:
     """MIME 인코딩된 문자열 디코딩"""
     try:
         decoded_fragments = decode_header(s)
         decoded_string = ''
         for fragment, charset in decoded_fragments:
             if isinstance(fragment, bytes):
-                if charset:
-                    decoded_string += fragment.decode(charset)
-                else:
-                    decoded_string += fragment.decode('utf-8')
+                decoded_string += decode_bytes(fragment, charset)
             else:
                 decoded_string += fragment
         return decoded_string
@@ -26,94 +83,319 @@ def decode_mime_words(s: str) -> str:
         logging.warning(f"MIME 디코딩 실패: {e}")
         return str(s)
 
+# 본문 정리용 정규식 (호출마다 컴파일하지 않도록 모듈 로드 시 한 번만 컴파일)
+_NBSP = re.compile(r'&nbsp;')
+_HORIZONTAL_SPACE = re.compile(r'[ \t]+')
+_EXCESS_NEWLINES = re.compile(r'\n{3,}')
+
+def _decode_part(part: Message) -> str:
+    payload = part.get_payload(decode=True)
+    return decode_bytes(payload, part.get_content_charset()) if payload else ""
+
 def extract_email_body(email_message: Message) -> str:
     """이메일 본문 추출"""
     try:
-        body = ""
-        if email_message.is_multipart():
-            for part in email_message.walk():
-                if part.get_content_type() == "text/plain":
-                    payload = part.get_payload(decode=True)
-                    if payload:
-                        body += payload.decode('utf-8', errors='ignore')
-        else:
-            payload = email_message.get_payload(decode=True)
-            if payload:
-                body = payload.decode('utf-8', errors='ignore')
-        
-        # HTML 엔터티 디코딩 및 정리
-        body = html.unescape(body.strip())
-        
-        # 추가 정리 (HTML 엔터티만 처리)
-        body = re.sub(r'&nbsp;', ' ', body)
+        # MIME 트리를 한 번만 순회하며 각 파트를 선언된 charset으로 한 번씩 디코딩
+        plain_parts = []
+        html_body = ""
+        for part in email_message.walk():
+            if part.is_multipart() or part.get_content_disposition() == 'attachment':
+                continue
+            content_type = part.get_content_type()
+            if content_type == "text/plain":
+                plain_parts.append(_decode_part(part))
+            elif content_type == "text/html" and not html_body:
+                html_body = _decode_part(part)
+        body = "".join(plain_parts)
         
-        # 줄 단위로 처리하여 줄바꿈 보존
-        lines = body.split('\n')
-        cleaned_lines = []
+        if body.strip():
+            # HTML 엔터티 디코딩 및 정리
+            body = _NBSP.sub(' ', html.unescape(body.strip()))
+        elif html_body:
+            # 텍스트 파트가 없는 HTML 전용 메일 (포털 알림, 일부 Outlook 메일)
+            body = html_to_text(html_body)
         
-        for line in lines:
-            # 각 줄에서만 연속된 공백을 하나로 만들기 (줄바꿈은 보존)
-            cleaned_line = re.sub(r'[ \t]+', ' ', line.strip())
-            cleaned_lines.append(cleaned_line)
-        
-        # 줄바꿈으로 다시 합치기
-        body = '\n'.join(cleaned_lines)
+        # 각 줄에서만 연속된 공백을 하나로 만들기 (줄바꿈은 보존)
+        body = '\n'.join(_HORIZONTAL_SPACE.sub(' ', line.strip()) for line in body.split('\n'))
         
         # 연속된 빈 줄을 최대 2개로 제한
-        body = re.sub(r'\n{3,}', '\n\n', body)
-        
-        # 서명 블록 포맷팅 개선
-        body = format_signature_block(body)
+        body = _EXCESS_NEWLINES.sub('\n\n', body)
         
         return body.strip()
     except Exception as e:
         logging.error(f"이메일 본문 추출 실패: {e}")
         return "본문을 읽을 수 없습니다."
 
-def format_signature_block(body: str) -> str:
-    """서명 블록 포맷팅 개선"""
-    try:
-        # 이메일 주소, 전화번호 패턴 찾아서 줄바꿈 추가
-        # Tel, Mobile, Email 앞에 줄바꿈 추가
-        body = re.sub(r'(Tel\s+\d)', r'\n\1', body)
-        body = re.sub(r'(Mobile\s+\d)', r'\n\1', body) 
-        body = re.sub(r'(Email\s+)', r'\n\1', body)
-        
-        # 부서나 직책 정보 앞에 줄바꿈 추가 (예: "전산2팀")
-        body = re.sub(r'([가-힣]+\d*팀)', r'\n\1', body)
-        body = re.sub(r'([가-힣]+전문원|[가-힣]+과장|[가-힣]+부장)', r'\n\1', body)
-        
-        # 연속된 줄바꿈 정리
-        body = re.sub(r'\n{3,}', '\n\n', body)
-        
-        return body
-    except Exception as e:
-        logging.warning(f"서명 블록 포맷팅 실패: {e}")
-        return body
+# 이후 내용이 모두 이전 메일인 구분선 (Outlook, 국내 메일 클라이언트)
+_ORIGINAL_MESSAGE = re.compile(
+    r'^\s*-{2,}\s*(?:Original Message|원본 메시지|원본 메일|원래 메시지|Reply Message)\s*-{2,}\s*$', re.I
+)
+# Gmail/Apple Mail 인용 머리말 ("On ... wrote:", "2025년 8월 27일 (수) 오후 3:00, 홍길동 <...>님이 작성:")
+_ATTRIBUTION = re.compile(r'^\s*(?:On\s.*\swrote:|.*님이\s*작성(?:했습니다)?\s*:)\s*$', re.I)
+# 님이 없는 머리말 ("2025. 8. 27. 오후 3:00, hong@kdis.ac.kr 작성:")은 날짜/시각과 주소가 함께 있을 때만
+_WRITTEN = re.compile(r'^.*\s작성\s*:\s*$')
+# 구분선 없이 헤더로 시작하는 인용 (새 Outlook, 모바일 Outlook, 국내 웹메일)
+_HEADER_LINE = re.compile(
+    r'^\s*\**(?P<name>From|Sent|Date|To|Cc|Subject|보낸\s*사람|발신자|보낸이|보낸\s*날짜|날짜|받는\s*사람|수신자|참조|제목)'
+    r'\s*\**\s*:\s*\**\s*(?P<value>.*)$',
+    re.I
+)
+_HEADER_NAMES = {
+    'from': 'from', '보낸사람': 'from', '발신자': 'from', '보낸이': 'from',
+    'sent': 'date', 'date': 'date', '보낸날짜': 'date', '날짜': 'date',
+    'to': 'to', '받는사람': 'to', '수신자': 'to', 'cc': 'cc', '참조': 'cc',
+    'subject': 'subject', '제목': 'subject',
+}
+_ADDRESS = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+_DATE_VALUE = re.compile(
+    r'\d{4}\s*[-./년]|\d{1,2}:\d{2}|[월화수목금토일]요일|오전|오후'
+    r'|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|Mon|Tue|Wed|Thu|Fri|Sat|Sun)[a-z]*\b',
+    re.I
+)
+_UNDERSCORE_RULE = re.compile(r'^\s*_{10,}\s*$')
+_QUOTED = re.compile(r'^\s*>')
+
+# 현재 메시지 끝의 서명/바닥글 (이후 내용은 thread_history로 보내고 모델 입력에서 제외)
+_SIGNATURE_DELIMITER = re.compile(r'^--\s?$')
+_FOOTER_WINDOW = 8  # 법적 고지/모바일 바닥글은 마지막 8줄(빈 줄 제외) 안에서만 인정
+_SIGNATURE_MAX_LINES = 6  # '--' 뒤 서명 블록의 최대 줄 수
+_MOBILE_FOOTER = re.compile(
+    r'^\s*(?:Sent from my \S+.*|Sent from (?:Outlook|Mail|Yahoo Mail)\b.*|Get Outlook for \S+.*'
+    r'|\S*(?:iPhone|iPad|Galaxy|갤럭시|Android|모바일)\S*에서\s*보냄|(?:Android|iOS)용 Outlook 받기.*)\s*$',
+    re.I
+)
+_DISCLAIMER = re.compile(
+    r'^\W*(?:CONFIDENTIALITY(?: NOTICE)?|DISCLAIMER|LEGAL NOTICE'
+    r'|This (?:e-?mail|message|communication)\b.*\b(?:confidential|privileged'
+    r'|intended (?:solely |only |exclusively )?for the (?:sole |exclusive )?(?:use|named|addressee|recipient|individual|person|entity))'
+    r'|The information (?:contained )?in this (?:e-?mail|message)'
+    r'|(?:본|이)\s*(?:메일|이메일|전자\s*우편|메시지)[은는에].*(?:기밀|비밀|법[적률]|수신인|수신자 외|무단|발신\s*전용))',
+    re.I
+)
+# 서명의 연락처 줄 (전화번호, 이메일, URL, 연락처 항목명)
+_CONTACT_ITEM = re.compile(
+    r'(?:\+?\d{1,3}[\s.-]?)?\(?\d{2,4}\)?[\s.-]\d{3,4}[\s.-]\d{4}'
+    r'|[\w.+-]+@[\w-]+\.[\w.-]+'
+    r'|(?:https?://|www\.)\S+'
+    r'|(?:^|\s|\|)(?:Tel|Phone|Mobile|Mob|Cell|Fax|E-?mail|Office|전화|휴대폰|핸드폰|팩스|이메일|주소|Address)\b\s*[.:]?',
+    re.I
+)
+_CONTACT_LINE_MAX = 100
+# '--' 뒤 서명의 이름/직함 줄 ("김철수 드림", "Alex Kim", "행정팀 과장", "Program Officer | KDI School")
+_SIGNATURE_NAME = re.compile(r"^(?:[가-힣]{2,4}|[A-Z][\w.'-]*(?:\s+[A-Z][\w.'-]*){0,3})\s*(?:드림|올림|배상)?$")
+_SIGNATURE_TITLE = re.compile(
+    r'\S(?:팀|센터|대학원|학과|본부)(?:\s|$|[|/,])|교수|과장|부장|차장|대리|주임|전문원|연구원|조교|팀장|원장'
+    r'|\b(?:Professor|Manager|Officer|Director|Assistant|Coordinator|Specialist|Team|Office|Division'
+    r'|School|University|Institute)\b'
+)
+_SIGNATURE_NAME_MAX = 60
+_SENTENCE_END = re.compile(r'[.?!？。]$|다$')
+
+def _header_fields(lines: List[str], index: int) -> Dict[str, str]:
+    """Header fields of the block starting at index, up to the first blank or non-header line"""
+    fields: Dict[str, str] = {}
+    for line in lines[index:index + 6]:
+        match = _HEADER_LINE.match(line)
+        if not match:
+            break
+        name = _HEADER_NAMES[re.sub(r'\s+', '', match.group('name')).lower()]
+        fields.setdefault(name, match.group('value').strip())
+    return fields
+
+def _is_reply_header(lines: List[str], index: int) -> bool:
+    """
+    From:/보낸 사람: that opens a real header block of a quoted mail
+    
+    The sender must not be a bare date (e.g. a 'From: 2026-11-03' leave period), and the block
+    needs an address in From/To/Cc or a dated Sent/Date field together with a subject.
+    """
+    fields = _header_fields(lines, index)
+    sender = fields.get('from')
+    if sender is None or len(fields) < 2:
+        return False
+    if not _ADDRESS.search(sender) and (not sender or _DATE_VALUE.search(sender)):
+        return False
+    if any(_ADDRESS.search(fields.get(name, '')) for name in ('from', 'to', 'cc')):
+        return True
+    return bool(_DATE_VALUE.search(fields.get('date', ''))) and 'subject' in fields
+
+def _tail_start(lines: List[str], count: int) -> int:
+    """Index of the count-th non-blank line from the end (0 when there are fewer)"""
+    seen = 0
+    for index in range(len(lines) - 1, -1, -1):
+        if lines[index].strip():
+            seen += 1
+            if seen == count:
+                return index
+    return 0
+
+def _is_attribution(line: str) -> bool:
+    """Quote attribution line ('On ... wrote:', '...님이 작성:', or '... 작성:' with a date/time and an address)"""
+    if _ATTRIBUTION.match(line):
+        return True
+    # '1. 보고서 작성:' 같은 본문 목록은 제외
+    return bool(_WRITTEN.match(line) and _ADDRESS.search(line) and _DATE_VALUE.search(line))
+
+def _is_signature_line(line: str) -> bool:
+    """A contact item, or a short name / name with title line (not a sentence)"""
+    if len(line) > _CONTACT_LINE_MAX:
+        return False
+    if _CONTACT_ITEM.search(line):
+        return True
+    stripped = line.strip()
+    if len(stripped) > _SIGNATURE_NAME_MAX or _SENTENCE_END.search(stripped):
+        return False
+    return bool(_SIGNATURE_NAME.match(stripped) or _SIGNATURE_TITLE.search(stripped))
+
+def _is_signature_block(lines: List[str]) -> bool:
+    """Lines after a '--' delimiter: a short block made only of names, titles and contact details"""
+    block = [line for line in lines if line.strip()]
+    if not block or len(block) > _SIGNATURE_MAX_LINES:
+        return False
+    return all(_is_signature_line(line) for line in block)
+
+def _signature_start(lines: List[str]) -> int:
+    """
+    Where the signature, mobile footer and disclaimer at the end of the current message begin
+    
+    Footer and disclaimer lines count only in the last few lines, and a '--' delimiter only when
+    a signature-like block follows it, so a separator or a 'This message is ...' sentence in the
+    body is kept.
+    
+    Returns:
+        int: Index of the first trailing signature line (len(lines) when there is none)
+    """
+    end = len(lines)
+    while True:
+        tail = _tail_start(lines[:end], _FOOTER_WINDOW)
+        found = None
+        for index in range(tail, end):
+            line = lines[index]
+            if _MOBILE_FOOTER.match(line) or _DISCLAIMER.match(line):
+                found = index
+                break
+            if _SIGNATURE_DELIMITER.match(line) and _is_signature_block(lines[index + 1:end]):
+                found = index
+                break
+        if found is None:
+            break
+        end = found
+    
+    # 끝부분 연락처 블록: 연락처 항목이 2개 이상일 때만 서명으로 판단 (본문 속 번호 안내는 유지)
+    while end > 0 and not lines[end - 1].strip():
+        end -= 1
+    block_start, items = end, 0
+    while block_start > 0:
+        line = lines[block_start - 1]
+        if not line.strip():
+            block_start -= 1
+            continue
+        found = len(_CONTACT_ITEM.findall(line)) if len(line) <= _CONTACT_LINE_MAX else 0
+        if not found:
+            break
+        items += found
+        block_start -= 1
+    if items >= 2:
+        end = block_start
+    return end
 
 def separate_current_message_from_thread(full_email_body: str) -> Tuple[str, str]:
-    """이메일 본문에서 현재 메시지와 이전 대화 스레드 분리"""
+    """
+    이메일 본문에서 현재 메시지와 이전 대화 스레드 분리
+    
+    Outlook/국내 클라이언트 구분선, Gmail 인용 머리말, 헤더 블록, 끝부분의 '>' 인용을
+    한 번의 줄 단위 순회로 찾고, 현재 메시지 끝의 서명·모바일 바닥글·법적 고지는
+    이전 대화 스레드 쪽으로 옮깁니다 (잘라낸 내용은 버리지 않음).
+    
+    Returns:
+        Tuple[str, str]: (현재 메시지, 이전 대화 스레드)
+    """
     try:
-        # -----Original Message----- 패턴을 찾아서 분리
-        original_message_pattern = r'-----Original Message-----'
+        lines = full_email_body.split('\n')
+        cut = len(lines)
+        quote_start = None
         
-        if re.search(original_message_pattern, full_email_body):
-            # Original Message 이전 부분이 현재 메시지
-            parts = re.split(original_message_pattern, full_email_body, 1)
-            current_message = parts[0].strip()
-            thread_history = f"-----Original Message-----{parts[1]}" if len(parts) > 1 else ""
+        for index, line in enumerate(lines):
+            if _QUOTED.match(line):
+                if quote_start is None:
+                    quote_start = index
+                continue
+            if not line.strip():
+                continue
             
-            logging.debug("현재 메시지와 스레드 히스토리를 분리했습니다.")
-            return current_message, thread_history.strip()
+            if _ORIGINAL_MESSAGE.match(line) or _is_attribution(line):
+                cut = index
+                break
+            if (line.lstrip().startswith('On ') and index + 1 < len(lines)
+                    and _is_attribution(f"{line} {lines[index + 1]}")):
+                # 줄바꿈된 Gmail 머리말 ("On ... <\naddress> wrote:")
+                cut = index
+                break
+            if _is_reply_header(lines, index):
+                cut = index
+                if index > 0 and _UNDERSCORE_RULE.match(lines[index - 1]):
+                    cut = index - 1
+                break
+            # 인용 뒤에 답장이 이어지면 (본문 중간 인용) 현재 메시지로 유지
+            quote_start = None
         else:
-            # Original Message가 없으면 전체가 현재 메시지
+            if quote_start is not None:
+                cut = quote_start
+        
+        cut = _signature_start(lines[:cut])
+        current_message = '\n'.join(lines[:cut]).strip()
+        thread_history = '\n'.join(lines[cut:]).strip()
+        if not current_message:
+            # 인용만 있는 메일 (예: 답장 없이 전달)은 전체를 현재 메시지로 처리
             return full_email_body.strip(), ""
+        
+        if thread_history:
+            logging.debug("현재 메시지와 스레드 히스토리를 분리했습니다.")
+        return current_message, thread_history
             
     except Exception as e:
         logging.warning(f"메시지 분리 중 오류: {e}")
         # 오류 시 전체를 현재 메시지로 처리
         return full_email_body.strip(), ""
 
+# 회신/전달 접두어 ("RE: FW: 제목", "Re[2]: 제목", "회신: 제목", "[답장] 제목")
+_SUBJECT_PREFIX = re.compile(r'^\s*(?:(?:re|fw|fwd|aw|wg|회신|답장|전달)\s*(?:\[\d+\])?\s*[:：]|\[(?:re|fw|fwd|회신|답장|전달)\])\s*', re.I)
+
+def normalize_subject(subject: str) -> str:
+    """회신/전달 접두어를 모두 제거한 원래 제목"""
+    subject = subject or ""
+    while True:
+        stripped = _SUBJECT_PREFIX.sub('', subject, count=1)
+        if stripped == subject:
+            return ' '.join(subject.split())
+        subject = stripped
+
+_MESSAGE_ID = re.compile(r'<[^<>\s]+>')
+# References 헤더에 유지할 최대 Message-ID 수 (첫 메시지와 최근 메시지 유지)
+MAX_REFERENCES = 20
+
+def parse_message_ids(header: Optional[str]) -> List[str]:
+    """References/In-Reply-To 헤더의 Message-ID 목록 (꺾쇠 포함, 원래 순서)"""
+    return _MESSAGE_ID.findall(str(header or ''))
+
+def build_references(references: Optional[str], in_reply_to: Optional[str], message_id: Optional[str]) -> str:
+    """
+    References chain for a reply: the parent's References, then its Message-ID
+    
+    Args:
+        references: Parent's References header
+        in_reply_to: Parent's In-Reply-To header (used when References is missing)
+        message_id: Parent's Message-ID
+    
+    Returns:
+        str: Space-separated Message-IDs, the thread root kept when trimmed to MAX_REFERENCES
+    """
+    ids = parse_message_ids(references) or parse_message_ids(in_reply_to)
+    ids += [mid for mid in parse_message_ids(message_id) if mid not in ids]
+    if len(ids) > MAX_REFERENCES:
+        ids = ids[:1] + ids[-(MAX_REFERENCES - 1):]
+    return ' '.join(ids)
+
 def extract_sender_email(sender_string: str) -> str:
     """발신자 문자열에서 이메일 주소 추출"""
     if '<' in sender_string and '>' in sender_string:
@@ -0,0 +1,201 @@
+"""
+Streaming HTML-to-text conversion for HTML-only messages
+"""
+from html.parser import HTMLParser
+from typing import List, Optional
+import re
+
+# HTML 본문에서 모델에 보낼 최대 글자 수 (뉴스레터/알림 메일이 프롬프트를 부풀리지 않도록)
+HTML_TEXT_LIMIT = 20000
+
+_FEED_CHUNK = 64 * 1024
+
+# 내용 전체를 버리는 요소
+_SKIP_TAGS = {'script', 'style', 'head', 'title', 'noscript', 'template', 'svg', 'object', 'iframe', 'xml'}
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param',
+              'source', 'track', 'wbr'}
+_BLOCK_TAGS = {'address', 'article', 'aside', 'center', 'dd', 'details', 'div', 'dl', 'dt', 'fieldset',
+               'figcaption', 'figure', 'footer', 'form', 'header', 'main', 'nav', 'section', 'summary',
+               'table', 'thead', 'tbody', 'tfoot', 'ul', 'ol'}
+_PARAGRAPH_TAGS = {'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'pre', 'blockquote', 'hr'}
+_HIDDEN_STYLE = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden|mso-hide\s*:\s*all', re.I)
+_WHITESPACE = re.compile(r'\s+')
+
+class _TextExtractor(HTMLParser):
+    """Collects readable text: blocks become lines, tables ' | ' rows, lists '- ' items, blockquotes '> '"""
+
+    def __init__(self, limit: int):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.parts: List[str] = []
+        self.length = 0
+        self.truncated = False
+        self._skip_tag: Optional[str] = None
+        self._skip_depth = 0
+        self._pending_newlines = 0
+        self._at_line_start = True
+        self._quote_depth = 0
+        self._pre_depth = 0
+        self._lists: List[Optional[int]] = []  # ol: 다음 번호, ul: None
+        self._cell_count = 0
+        self._link_href: Optional[str] = None
+        self._link_text: List[str] = []
+
+    # 출력
+    def _newline(self, count: int = 1):
+        if self.parts:
+            self._pending_newlines = max(self._pending_newlines, count)
+
+    def _write(self, text: str, keep_indent: bool = False):
+        if self.truncated:
+            return
+        if self._pending_newlines:
+            self.parts.append('\n' * min(self._pending_newlines, 2))
+            self._pending_newlines = 0
+            self._at_line_start = True
+        if self._at_line_start:
+            if self._quote_depth:
+                self.parts.append('> ' * self._quote_depth)
+            text = text if self._pre_depth or keep_indent else text.lstrip(' ')
+            if not text:
+                return
+            self._at_line_start = False
+        self.parts.append(text)
+        self.length += len(text)
+        if self.length >= self.limit:
+            self.truncated = True
+
+    # 파서 콜백
+    def handle_starttag(self, tag, attrs):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            if not (self._skip_tag == 'head' and tag == 'body'):
+                return
+            # </head>가 빠진 메일도 본문은 읽음
+            self._skip_tag, self._skip_depth = None, 0
+
+        attrs = dict(attrs)
+        hidden = 'hidden' in attrs or _HIDDEN_STYLE.search(attrs.get('style') or '')
+        if tag in _SKIP_TAGS or (hidden and tag not in _VOID_TAGS):
+            self._skip_tag, self._skip_depth = tag, 1
+            return
+
+        if tag == 'br':
+            self._newline()
+        elif tag in _PARAGRAPH_TAGS:
+            self._newline(2)
+            if tag == 'blockquote':
+                self._quote_depth += 1
+            elif tag == 'pre':
+                self._pre_depth += 1
+            elif tag == 'hr':
+                self._write('---')
+                self._newline(2)
+        elif tag in ('ul', 'ol'):
+            self._newline()
+            self._lists.append(1 if tag == 'ol' else None)
+        elif tag == 'li':
+            self._newline()
+            indent = '  ' * max(0, len(self._lists) - 1)
+            number = self._lists[-1] if self._lists else None
+            if number is None:
+                self._write(f"{indent}- ", keep_indent=True)
+            else:
+                self._write(f"{indent}{number}. ", keep_indent=True)
+                self._lists[-1] = number + 1
+            self._at_line_start = False
+        elif tag == 'tr':
+            self._newline()
+            self._cell_count = 0
+        elif tag in ('td', 'th'):
+            if self._cell_count:
+                self._write(' | ')
+            self._cell_count += 1
+        elif tag in _BLOCK_TAGS:
+            self._newline()
+        elif tag == 'a':
+            self._link_href = attrs.get('href')
+            self._link_text = []
+        # img 등 이미지는 (추적 픽셀 포함) 모두 생략
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+            return
+
+        if tag in _PARAGRAPH_TAGS:
+            if tag == 'blockquote' and self._quote_depth:
+                self._quote_depth -= 1
+            elif tag == 'pre' and self._pre_depth:
+                self._pre_depth -= 1
+            self._newline(2)
+        elif tag in ('ul', 'ol'):
+            if self._lists:
+                self._lists.pop()
+            self._newline()
+        elif tag in ('li', 'tr') or tag in _BLOCK_TAGS:
+            self._newline()
+        elif tag == 'a' and self._link_href is not None:
+            href, text = self._link_href, ''.join(self._link_text).strip()
+            self._link_href = None
+            # 본문과 다른 짧은 링크만 덧붙임 (긴 추적 URL은 생략)
+            if href.startswith(('http://', 'https://')) and len(href) <= 100 and href not in text:
+                self._write(f" ({href})")
+
+    def handle_data(self, data):
+        if self._skip_tag is not None or self.truncated:
+            return
+        if self._pre_depth:
+            lines = data.split('\n')
+            for index, line in enumerate(lines):
+                if index:
+                    self._newline()
+                if line:
+                    self._write(line)
+            return
+        text = _WHITESPACE.sub(' ', data)
+        if not text.strip():
+            if not self._at_line_start and not self._pending_newlines and text:
+                self._write(' ')
+            return
+        if self._link_href is not None:
+            self._link_text.append(text)
+        self._write(text)
+
+def html_to_text(html_body: str, limit: int = HTML_TEXT_LIMIT) -> str:
+    """
+    Convert an HTML body to plain text
+
+    Scripts, styles, hidden elements and images (including tracking pixels) are
+    dropped; paragraphs, lists, tables and blockquotes keep a readable layout.
+    Parsing stops as soon as the output reaches the limit.
+
+    Args:
+        html_body: HTML markup
+        limit: Maximum number of characters to return
+
+    Returns:
+        str: Plain text, with a trailing "[...]" marker when truncated
+    """
+    extractor = _TextExtractor(limit)
+    for start in range(0, len(html_body), _FEED_CHUNK):
+        extractor.feed(html_body[start:start + _FEED_CHUNK])
+        if extractor.truncated:
+            break
+    if not extractor.truncated:
+        extractor.close()
+
+    lines = [line.rstrip() for line in ''.join(extractor.parts).split('\n')]
+    text = '\n'.join(lines).strip()
+    if extractor.truncated:
+        text = text[:limit].rstrip() + "\n[...]"
+    return text
@@ -0,0 +1,107 @@
+"""
+IMAP command arguments: server-side search criteria for the inbox poll and UID sets
+"""
+from typing import Iterable, List, Optional, Tuple
+import re
+
+# RFC 5322 필드 이름: 콜론과 공백을 제외한 출력 가능한 ASCII
+_FIELD_NAME = re.compile(r'^[!-9;-~]+$')
+
+def quote(value: str) -> str:
+    """IMAP quoted string (ASCII only, no CR/LF)"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def parse_header_filters(spec: str) -> List[Tuple[str, str]]:
+    """
+    Parse header exclusions such as 'List-Id, Auto-Submitted, From:noreply'
+
+    Args:
+        spec: Comma-separated 'Header' (message has the header) or 'Header:substring' terms
+
+    Returns:
+        List[Tuple[str, str]]: (header name, substring) pairs; an empty substring matches any value
+
+    Raises:
+        ValueError: A term is not a valid header name or has a non-ASCII or multi-line value
+    """
+    filters = []
+    for term in (spec or '').split(','):
+        term = term.strip()
+        if not term:
+            continue
+        name, _, value = term.partition(':')
+        name, value = name.strip(), value.strip()
+        if not _FIELD_NAME.match(name):
+            raise ValueError(f"잘못된 헤더 이름: {term!r}")
+        if not value.isascii() or '\r' in value or '\n' in value:
+            raise ValueError(f"헤더 조건 값은 한 줄의 ASCII여야 합니다: {term!r}")
+        filters.append((name, value))
+    return filters
+
+def validate_gmail_raw(query: str) -> str:
+    """
+    Check a Gmail search query (X-GM-RAW), e.g. 'category:primary -from:noreply'
+
+    Raises:
+        ValueError: The query spans several lines or has unbalanced quotes
+    """
+    query = (query or '').strip()
+    if '\r' in query or '\n' in query:
+        raise ValueError("Gmail 검색 조건은 한 줄이어야 합니다")
+    if query.count('"') % 2:
+        raise ValueError(f"Gmail 검색 조건의 따옴표가 맞지 않습니다: {query!r}")
+    return query
+
+def uid_sets(uids: Iterable[int], max_length: int = 900) -> List[str]:
+    """
+    Compress UIDs into IMAP sets such as '3:7,9,12:14'
+
+    Args:
+        uids: Message UIDs in any order
+        max_length: Longest set per command (servers limit the command line length)
+
+    Returns:
+        List[str]: One or more sets covering every UID once
+    """
+    ranges: List[List[int]] = []
+    for uid in sorted(set(uids)):
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    sets: List[str] = []
+    current: List[str] = []
+    length = 0
+    for low, high in ranges:
+        term = str(low) if low == high else f"{low}:{high}"
+        if current and length + len(term) + 1 > max_length:
+            sets.append(','.join(current))
+            current, length = [], 0
+        current.append(term)
+        length += len(term) + 1
+    if current:
+        sets.append(','.join(current))
+    return sets
+
+def build_search_criteria(uid_range: str, header_filters: List[Tuple[str, str]],
+                          gmail_raw: Optional[str] = None) -> Tuple[List[str], Optional[bytes]]:
+    """
+    Arguments of UID SEARCH for new mail that passes the filters
+
+    Args:
+        uid_range: UID set to search, e.g. '1234:*'
+        header_filters: Result of parse_header_filters (each becomes NOT HEADER)
+        gmail_raw: Gmail query; only pass it when the server has X-GM-EXT-1
+
+    Returns:
+        Tuple[List[str], Optional[bytes]]: Search arguments and, for a non-ASCII Gmail query,
+        the UTF-8 literal to send after them (X-GM-RAW is then the last argument)
+    """
+    criteria = ['UID', uid_range]
+    for name, value in header_filters:
+        criteria += ['NOT', 'HEADER', name, quote(value)]
+    if not gmail_raw:
+        return criteria, None
+    if gmail_raw.isascii():
+        return criteria + ['X-GM-RAW', quote(gmail_raw)], None
+    return ['CHARSET', 'UTF-8'] + criteria + ['X-GM-RAW'], gmail_raw.encode('utf-8')
@@ -0,0 +1,119 @@
+"""
+Incremental MIME parsing that keeps only what the reply pipeline needs later
+"""
+from email.feedparser import BytesFeedParser
+from email.message import Message
+from typing import List, Optional, Union
+import hashlib
+import os
+import tempfile
+
+from .logging_utils import get_logger
+
+logger = get_logger('mime_stream')
+
+# 파서에 한 번에 넣는 크기 (전체 메시지를 하나의 str로 복사하지 않도록)
+FEED_CHUNK = 64 * 1024
+# 이보다 큰 첨부 파일은 임시 파일로 내려 메모리에 두지 않음
+SPILL_THRESHOLD = 256 * 1024
+
+_SPOOL_ATTR = 'jane_spooled_payload'
+
+class SpooledPayload:
+    """Decoded attachment bytes, kept in memory when small and in a temp file otherwise"""
+
+    __slots__ = ('size', 'sha256', 'data', 'path')
+
+    def __init__(self, data: bytes, spill_threshold: int = SPILL_THRESHOLD):
+        self.size = len(data)
+        self.sha256 = hashlib.sha256(data).hexdigest()
+        self.data: Optional[bytes] = None
+        self.path: Optional[str] = None
+        if self.size > spill_threshold:
+            fd, self.path = tempfile.mkstemp(prefix='jane-mime-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+        else:
+            self.data = data
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """Bytes, or the temp file path for spilled payloads (cheap to hand to another process)"""
+        return self.data if self.path is None else self.path
+
+    def read(self) -> bytes:
+        if self.path is None:
+            return self.data or b''
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def release(self):
+        """Delete the temp file (later reads return nothing)"""
+        path, self.path, self.data = self.path, None, None
+        if path:
+            try:
+                os.unlink(path)
+            except OSError as e:
+                logger.warning(f"임시 첨부 파일 삭제 실패 ({path}): {e}")
+
+def _is_body_text(part: Message) -> bool:
+    return part.get_content_type() in ('text/plain', 'text/html') and part.get_content_disposition() != 'attachment'
+
+def _is_attachment(part: Message) -> bool:
+    disposition = part.get_content_disposition()
+    if disposition != 'attachment' and not part.get_filename():
+        return False
+    # 서명 로고 등 본문에 삽입된 이미지는 첨부로 보지 않음
+    return not (disposition == 'inline' and part.get_content_maintype() == 'image')
+
+def parse_message(raw: bytes, keep_attachments: bool = True, spill_threshold: int = SPILL_THRESHOLD) -> Message:
+    """
+    Parse an RFC 822 message incrementally and compact it
+
+    The message is fed to BytesFeedParser in chunks, then every leaf part other
+    than the inline text/plain and text/html bodies is emptied. Attachments are
+    kept (when requested) as SpooledPayload objects, read with part_payload.
+
+    Args:
+        raw: Fetched message literal
+        keep_attachments: Keep attachment bytes for later extraction
+        spill_threshold: Attachments larger than this many bytes go to a temp file
+
+    Returns:
+        Message: Headers, text bodies and spooled attachments
+    """
+    parser = BytesFeedParser()
+    view = memoryview(raw)
+    for start in range(0, len(view), FEED_CHUNK):
+        parser.feed(bytes(view[start:start + FEED_CHUNK]))
+    view.release()
+    message = parser.close()
+
+    for part in message.walk():
+        if part.is_multipart() or _is_body_text(part):
+            continue
+        if keep_attachments and _is_attachment(part):
+            setattr(part, _SPOOL_ATTR, SpooledPayload(part.get_payload(decode=True) or b'', spill_threshold))
+        # 인코딩된 원본 페이로드는 더 이상 필요 없음
+        part.set_payload('')
+    return message
+
+def part_payload(part: Message) -> SpooledPayload:
+    """Attachment bytes of a part (also works for messages not parsed by parse_message)"""
+    spooled = getattr(part, _SPOOL_ATTR, None)
+    if spooled is None:
+        spooled = SpooledPayload(part.get_payload(decode=True) or b'', spill_threshold=float('inf'))
+    return spooled
+
+def attachment_parts(message: Optional[Message]) -> List[Message]:
+    """Leaf parts that are real attachments (not inline bodies or embedded images)"""
+    if message is None:
+        return []
+    return [part for part in message.walk() if not part.is_multipart() and _is_attachment(part)]
+
+def release_payloads(message: Optional[Message]):
+    """Delete the temp files of a message's spilled attachments"""
+    for part in attachment_parts(message):
+        spooled = getattr(part, _SPOOL_ATTR, None)
+        if spooled is not None:
+            spooled.release()
@@ -0,0 +1,66 @@
+"""
+Model price table for token cost estimates
+"""
+from typing import Dict, Optional, Tuple
+import json
+
+from .logging_utils import get_logger
+
+logger = get_logger('pricing')
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "o4-mini": (1.10, 0.275, 4.40),
+    "o3": (2.00, 0.50, 8.00),
+}
+
+def parse_prices(spec: str) -> Dict[str, Tuple[float, float, float]]:
+    """
+    Parse price overrides given as JSON
+
+    Args:
+        spec: e.g. '{"gpt-4o": [2.5, 1.25, 10]}' (USD per 1M input, cached input, output tokens)
+
+    Returns:
+        Dict[str, Tuple[float, float, float]]: The default table updated with the overrides
+    """
+    prices = dict(MODEL_PRICES)
+    if not spec:
+        return prices
+    try:
+        for model, values in json.loads(spec).items():
+            input_price, cached_price, output_price = (float(value) for value in values)
+            prices[model] = (input_price, cached_price, output_price)
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning(f"모델 가격 설정을 해석할 수 없어 기본값을 사용합니다: {e}")
+        return dict(MODEL_PRICES)
+    return prices
+
+def price_for(model: str, prices: Optional[Dict[str, Tuple[float, float, float]]] = None
+              ) -> Optional[Tuple[float, float, float]]:
+    """Exact match first, then the longest known prefix (dated snapshots such as gpt-4o-2024-08-06)"""
+    prices = MODEL_PRICES if prices is None else prices
+    if model in prices:
+        return prices[model]
+    candidates = [name for name in prices if model.startswith(name + "-")]
+    return prices[max(candidates, key=len)] if candidates else None
+
+def estimate_cost(model: str, input_tokens: int, cached_tokens: int, output_tokens: int,
+                  prices: Optional[Dict[str, Tuple[float, float, float]]] = None) -> Optional[float]:
+    """
+    Estimate the cost of a model call in USD
+
+    Returns:
+        Optional[float]: Cost, or None when the model is not in the price table
+    """
+    price = price_for(model, prices)
+    if price is None:
+        return None
+    input_price, cached_price, output_price = price
+    uncached = max(0, input_tokens - cached_tokens)
+    return (uncached * input_price + cached_tokens * cached_price + output_tokens * output_price) / 1_000_000
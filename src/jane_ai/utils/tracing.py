@@ -0,0 +1,272 @@
+"""
+Per-email tracing: a root span per EmailInfo.uid with child spans for each stage and tool call
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.request import Request, urlopen
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+
+from .logging_utils import get_logger
+
+logger = get_logger('tracing')
+
+# 현재 스레드/비동기 태스크에서 활성화된 스팬 (run_coroutine_threadsafe는 호출 시점 컨텍스트를 복사함)
+_current_span: ContextVar[Optional['Span']] = ContextVar('jane_current_span', default=None)
+
+class Span:
+    """A timed unit of work inside one email's trace"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start_time', 'end_time',
+                 'attributes', 'status', 'error', 'root', '_started', '_tracer')
+
+    def __init__(self, tracer: 'Tracer', name: str, trace_id: str, parent: Optional['Span'] = None,
+                 attributes: Optional[Dict[str, Any]] = None, start_time: Optional[float] = None):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.root: 'Span' = parent.root if parent is not None else self
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.end_time: Optional[float] = None
+        now = time.time()
+        # 시작 시각을 지정하면 이미 지난 구간(대기 시간 등)을 기록할 수 있음
+        self.start_time = now if start_time is None else start_time
+        self._started = time.perf_counter() - (now - self.start_time)
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_error(self, error: Any):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+
+    def end(self):
+        """Finish the span and hand it to the exporters (later calls are ignored)"""
+        if self.end_time is not None:
+            return
+        self.end_time = self.start_time + (time.perf_counter() - self._started)
+        self._tracer._export(self)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_time is None else (self.end_time - self.start_time) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start_time,
+            'end': self.end_time,
+            'duration_ms': round(self.duration_ms, 3) if self.end_time is not None else None,
+            'status': self.status,
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+class JsonlSpanExporter:
+    """Append finished spans as JSON lines to a size-rotated local file"""
+
+    def __init__(self, path: str = "logs/traces.jsonl", max_bytes: int = 10 * 1024 * 1024, backups: int = 5):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        self._handler.setFormatter(logging.Formatter('%(message)s'))
+
+    def export(self, span: Span):
+        record = logging.makeLogRecord({'msg': json.dumps(span.to_dict(), ensure_ascii=False, default=str)})
+        self._handler.handle(record)
+
+    def shutdown(self):
+        self._handler.close()
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+class OtlpHttpExporter:
+    """Batch finished spans to an OTLP/HTTP JSON collector (POST {endpoint}/v1/traces) from a background thread"""
+
+    def __init__(self, endpoint: str, service_name: str = "jane-ai", batch_size: int = 256,
+                 flush_interval: float = 2.0, timeout: float = 5.0):
+        self.url = endpoint.rstrip('/') + ('' if endpoint.rstrip('/').endswith('/v1/traces') else '/v1/traces')
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=10000)
+        self._thread = threading.Thread(target=self._run, name="jane-trace-export", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            # 수집기가 느리면 처리 경로를 막지 않고 스팬을 버림
+            pass
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._thread.join(timeout=self.timeout + 1)
+
+    def _run(self):
+        batch: List[Span] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                span = False
+            if span:
+                batch.append(span)
+            if span is None or len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch:
+                    self._post(batch)
+                    batch = []
+                deadline = time.monotonic() + self.flush_interval
+            if span is None:
+                return
+
+    def _post(self, spans: List[Span]):
+        payload = {'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service_name}}]},
+            'scopeSpans': [{'scope': {'name': 'jane_ai'}, 'spans': [self._otlp_span(span) for span in spans]}],
+        }]}
+        request = Request(self.url, data=json.dumps(payload).encode('utf-8'),
+                          headers={'Content-Type': 'application/json'})
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except OSError as e:
+            logger.warning(f"트레이스 전송 실패 ({len(spans)}개 스팬 버림): {e}")
+
+    @staticmethod
+    def _otlp_span(span: Span) -> Dict[str, Any]:
+        otlp = {
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': 1,
+            'startTimeUnixNano': str(int(span.start_time * 1e9)),
+            'endTimeUnixNano': str(int(span.end_time * 1e9)),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in span.attributes.items()],
+            'status': {'code': 2, 'message': span.error or ''} if span.status == "error" else {'code': 1},
+        }
+        if span.parent_id:
+            otlp['parentSpanId'] = span.parent_id
+        return otlp
+
+class Tracer:
+    """Creates spans and fans finished ones out to the configured exporters"""
+
+    def __init__(self):
+        self._exporters: List[Any] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._exporters)
+
+    def configure(self, exporters: List[Any]):
+        self.shutdown()
+        self._exporters = list(exporters)
+
+    def shutdown(self):
+        exporters, self._exporters = self._exporters, []
+        for exporter in exporters:
+            try:
+                exporter.shutdown()
+            except Exception as e:
+                logger.warning(f"트레이스 내보내기 종료 중 오류: {e}")
+
+    def start_trace(self, name: str, **attributes) -> Optional[Span]:
+        """Open a root span (None when tracing is disabled)"""
+        if not self._exporters:
+            return None
+        return Span(self, name, secrets.token_hex(16), attributes=attributes)
+
+    def start_span(self, name: str, parent: Optional[Span] = None, start_time: Optional[float] = None,
+                   **attributes) -> Optional[Span]:
+        """Open a child of parent (default: the active span); None outside a trace"""
+        parent = parent or _current_span.get()
+        if parent is None or not self._exporters:
+            return None
+        return Span(self, name, parent.trace_id, parent, attributes, start_time)
+
+    def _export(self, span: Span):
+        for exporter in self._exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                logger.warning(f"스팬 내보내기 실패: {e}")
+
+tracer = Tracer()
+
+def configure_tracing(path: str = "", max_bytes: int = 10 * 1024 * 1024, backups: int = 5,
+                      otlp_endpoint: str = ""):
+    """Install the JSONL file and/or OTLP exporters; with neither, spans are not created at all"""
+    exporters = []
+    if path:
+        exporters.append(JsonlSpanExporter(path, max_bytes=max_bytes, backups=backups))
+    if otlp_endpoint:
+        exporters.append(OtlpHttpExporter(otlp_endpoint))
+    tracer.configure(exporters)
+    if exporters:
+        logger.info(f"이메일 트레이스 기록: {', '.join(filter(None, [path, otlp_endpoint]))}")
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def set_attribute(key: str, value: Any):
+    """Set an attribute on the active span, if any"""
+    active = _current_span.get()
+    if active is not None:
+        active.set_attribute(key, value)
+
+def set_trace_attribute(key: str, value: Any):
+    """Set an attribute on the root span of the active trace (e.g. the email's intent)"""
+    active = _current_span.get()
+    if active is not None:
+        active.root.set_attribute(key, value)
+
+@contextmanager
+def activate(active: Optional[Span]) -> Iterator[Optional[Span]]:
+    """Make a span current for this thread or task (used when work hops to another thread)"""
+    token = _current_span.set(active)
+    try:
+        yield active
+    finally:
+        _current_span.reset(token)
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """Child span of the active span for the duration of the block; a no-op outside a trace"""
+    child = tracer.start_span(name, **attributes)
+    if child is None:
+        yield None
+        return
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
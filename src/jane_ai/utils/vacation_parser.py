@@ -0,0 +1,204 @@
+"""
+Rule-based vacation request parser
+"""
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+# 휴가 종류 키워드 (VactionKind_1 코드)
+VACATION_TYPE_KEYWORDS = {
+    "01": re.compile(r'연차|연가|annual\s+leave', re.IGNORECASE),
+    "02": re.compile(r'병가|sick\s+leave', re.IGNORECASE),
+    "03": re.compile(r'경조', re.IGNORECASE),
+    "04": re.compile(r'특별\s*휴가|special\s+leave', re.IGNORECASE),
+}
+
+VACATION_TYPE_NAMES = {
+    "01": "연가",
+    "02": "병가",
+    "03": "경조휴가",
+    "04": "특별휴가",
+}
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+# 날짜 표현 (순서대로 한 번에 스캔)
+_DATE_PATTERN = re.compile(
+    r'(?P<iso_y>\d{4})\s*[-./]\s*(?P<iso_m>\d{1,2})\s*[-./]\s*(?P<iso_d>\d{1,2})'
+    r'|(?:(?P<ko_y>\d{4})\s*년\s*)?(?P<ko_m>\d{1,2})\s*월\s*(?P<ko_d>\d{1,2})\s*일'
+    r'|(?P<en_m>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+(?P<en_d>\d{1,2})(?:st|nd|rd|th)?(?:,?\s*(?P<en_y>\d{4}))?'
+    r'|(?<![\d/])(?P<sl_m>\d{1,2})/(?P<sl_d>\d{1,2})(?![\d/])'
+    # 월이 생략된 'N일'은 범위 연결어 바로 뒤에서만 날짜로 봄 ("29일부터 30일까지"); "연차 1일"은 날짜가 아님
+    r'|(?:(?<=부터)|(?<=까지)|(?<=[~\-–]))\s*(?P<day>\d{1,2})\s*일(?!\s*(?:간|동안|치|자))',
+    re.IGNORECASE
+)
+
+# 두 날짜 사이에 이것만 있으면 하나의 기간 표현 (예: "11월 3일부터 5일", "11/3 ~ 11/5")
+_RANGE_CONNECTOR = re.compile(r'\s*(?:부터|~|-|–|to|through|until)\s*', re.IGNORECASE)
+
+# 신청 의사 표현
+_REQUEST_PATTERN = re.compile(
+    r'신청|쓰겠|사용하겠|내겠|상신|기안|request|apply|take\s+(?:a\s+)?(?:day|leave)',
+    re.IGNORECASE
+)
+
+# 모델 판단이 필요한 표현 (반차, 외출, 기간/시간 단위, 질문 등)
+_AMBIGUOUS_PATTERN = re.compile(
+    r'반차|반일|외출|시간|오전|오후|취소|변경|\d\s*일\s*(?:간|동안)|\?|나요|까요'
+    r'|half[-\s]day|\d+\s+days|cancel',
+    re.IGNORECASE
+)
+
+_REASON_PATTERNS = [
+    # 첫 문장까지만 사유로 사용 (뒤에 붙은 연락처 등이 포털 사유 칸에 들어가지 않도록)
+    re.compile(r'(?:사유|reason)\s*[:：]\s*(?P<reason>[^\n.!?。]+)', re.IGNORECASE),
+    re.compile(r'(?P<reason>[가-힣A-Za-z0-9 ]{2,30}?)\s*(?:으로|로)\s*인(?:한|해)'),
+    re.compile(r'(?:due\s+to|because\s+of)\s+(?P<reason>[^.\n]+)', re.IGNORECASE),
+]
+
+@dataclass
+class ParsedVacationRequest:
+    """Result of rule-based vacation request parsing"""
+    is_request: bool = False
+    start_date: Optional[str] = None  # YYYY-MM-DD format
+    end_date: Optional[str] = None    # YYYY-MM-DD format
+    vacation_type: Optional[str] = None
+    reason: Optional[str] = None
+    ambiguous: bool = False
+
+    @property
+    def is_complete(self) -> bool:
+        """True when the request can be submitted without model assistance"""
+        return (
+            self.is_request
+            and not self.ambiguous
+            and bool(self.start_date and self.end_date and self.vacation_type and self.reason)
+        )
+
+    @property
+    def missing_info(self) -> List[str]:
+        """Missing fields in Korean, for follow-up questions"""
+        missing = []
+        if not self.start_date:
+            missing.append("시작 날짜")
+        if not self.end_date:
+            missing.append("종료 날짜")
+        if not self.vacation_type:
+            missing.append("휴가 종류")
+        if not self.reason:
+            missing.append("휴가 사유")
+        return missing
+
+def _nearest_date(month: int, day: int, reference: date) -> date:
+    """연도가 없는 날짜를 기준일에 가장 가까운 연도로 해석"""
+    candidates = []
+    for year in (reference.year - 1, reference.year, reference.year + 1):
+        try:
+            candidates.append(date(year, month, day))
+        except ValueError:
+            continue
+    if not candidates:
+        raise ValueError(f"잘못된 날짜: {month}월 {day}일")
+    return min(candidates, key=lambda d: abs((d - reference).days))
+
+def _extract_date_ranges(message: str, reference: date) -> List[Tuple[date, date]]:
+    """
+    메시지의 날짜 표현을 순서대로 추출
+
+    연결어(부터, ~, to ...)로 이어진 두 날짜는 하나의 (시작, 종료) 기간이 되고,
+    단독 날짜는 (날짜, 날짜)가 됨. 같은 표현이 반복되면 한 번만 남김.
+    """
+    ranges: List[Tuple[date, date]] = []
+    previous: Optional[date] = None
+    previous_end = 0
+    for match in _DATE_PATTERN.finditer(message):
+        groups = match.groupdict()
+        if groups['iso_y']:
+            found = date(int(groups['iso_y']), int(groups['iso_m']), int(groups['iso_d']))
+        elif groups['ko_m']:
+            month, day = int(groups['ko_m']), int(groups['ko_d'])
+            if groups['ko_y']:
+                found = date(int(groups['ko_y']), month, day)
+            else:
+                found = _nearest_date(month, day, reference)
+        elif groups['en_m']:
+            month, day = _MONTHS[groups['en_m'][:3].lower()], int(groups['en_d'])
+            if groups['en_y']:
+                found = date(int(groups['en_y']), month, day)
+            else:
+                found = _nearest_date(month, day, reference)
+        elif groups['sl_m']:
+            found = _nearest_date(int(groups['sl_m']), int(groups['sl_d']), reference)
+        else:
+            # "29일부터 30일까지"처럼 월이 생략된 경우 직전 날짜의 연/월을 따름
+            if previous is None:
+                raise ValueError("월이 없는 날짜")
+            found = date(previous.year, previous.month, int(groups['day']))
+
+        connected = (
+            previous is not None
+            and ranges[-1][0] == ranges[-1][1]
+            and _RANGE_CONNECTOR.fullmatch(message[previous_end:match.start()])
+        )
+        if connected:
+            ranges[-1] = (ranges[-1][0], found)
+        else:
+            ranges.append((found, found))
+        previous, previous_end = found, match.end()
+    return list(dict.fromkeys(ranges))
+
+def _extract_vacation_type(message: str) -> Optional[str]:
+    """휴가 종류 코드 추출 (여러 종류가 언급되면 None)"""
+    found = [code for code, pattern in VACATION_TYPE_KEYWORDS.items() if pattern.search(message)]
+    return found[0] if len(found) == 1 else None
+
+def _extract_reason(message: str) -> Optional[str]:
+    """휴가 사유 추출"""
+    for pattern in _REASON_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            reason = match.group('reason').strip(' .,')
+            if reason:
+                return reason
+    return None
+
+def parse_vacation_request(message: str, reference: Optional[date] = None) -> ParsedVacationRequest:
+    """
+    Parse a vacation request from the current message without a model call
+
+    Args:
+        message: Current message content (thread history excluded)
+        reference: Today's date; resolves dates without a year, and earlier dates make
+            the request ambiguous (default: today)
+
+    Returns:
+        ParsedVacationRequest: Extracted fields; check is_complete before submitting
+    """
+    reference = reference or datetime.now().date()
+    result = ParsedVacationRequest()
+
+    result.vacation_type = _extract_vacation_type(message)
+    result.is_request = bool(result.vacation_type or '휴가' in message) and bool(_REQUEST_PATTERN.search(message))
+    result.ambiguous = bool(_AMBIGUOUS_PATTERN.search(message))
+    result.reason = _extract_reason(message)
+
+    try:
+        ranges = _extract_date_ranges(message, reference)
+    except ValueError:
+        result.ambiguous = True
+        return result
+
+    if not ranges:
+        return result
+    start, end = ranges[0]
+    result.start_date = start.strftime("%Y-%m-%d")
+    result.end_date = end.strftime("%Y-%m-%d")
+    # 기간 밖의 날짜(복귀일, 보고일 등), 거꾸로 된 기간, 지난 날짜는 모델이 판단
+    if len(ranges) > 1 or end < start or start < reference:
+        result.ambiguous = True
+
+    return result
@@ -0,0 +1,5 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path[:0] = [path for path in (ROOT, os.path.join(ROOT, 'src')) if path not in sys.path]
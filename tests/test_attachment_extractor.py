@@ -0,0 +1,72 @@
+from concurrent.futures import Future
+
+from jane_ai.services.attachment_extractor import AttachmentExtractor
+from jane_ai.utils.attachment_text import ExtractionTimeout, MissingDependency
+
+def finished(error=None, result=None):
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+def test_missing_library_and_timeout_are_not_cached():
+    extractor = AttachmentExtractor()
+    extractor._store("pdf", finished(MissingDependency("PDF 텍스트 추출에는 pypdf가 필요합니다")))
+    extractor._store("slow", finished(ExtractionTimeout()))
+    assert extractor._cache == {}
+
+def test_file_errors_and_results_are_cached():
+    extractor = AttachmentExtractor()
+    extractor._store("broken", finished(ValueError("손상된 파일")))
+    extractor._store("ok", finished(result=("본문", False)))
+    assert extractor._cache["broken"][2] == "추출 실패: 손상된 파일"
+    assert extractor._cache["ok"] == ("본문", False, None)
+
+def test_shared_extraction_outlives_first_email(monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from email.message import EmailMessage
+    from jane_ai.services import attachment_extractor
+    from jane_ai.utils.mime_stream import parse_message, release_payloads
+
+    release = threading.Event()
+    extract = attachment_extractor.extract_attachment_text
+
+    def slow_extract(data, kind, max_chars, timeout, charset):
+        release.wait(5)
+        # 스레드 풀에서는 SIGALRM을 쓸 수 없음
+        return extract(data, kind, max_chars, 0, charset)
+
+    monkeypatch.setattr(attachment_extractor, "extract_attachment_text", slow_extract)
+
+    def email_with_report():
+        message = EmailMessage()
+        message["Subject"] = "보고서"
+        message.set_content("첨부 확인 부탁드립니다.")
+        message.add_attachment("분기 매출 보고서\n".encode("utf-8") * 100, maintype="text", subtype="plain",
+                               filename="report.txt")
+        return parse_message(message.as_bytes(), spill_threshold=0)
+
+    extractor = AttachmentExtractor(timeout=0.05)
+    extractor._executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        first = email_with_report()
+        first_pending = extractor.submit(first)
+        assert extractor.collect(first_pending)[0].error == "추출 시간 초과"
+
+        second = email_with_report()
+        second_pending = extractor.submit(second)
+        assert second_pending[0].future is first_pending[0].future
+        # 첫 메일은 응답 후 자기 임시 파일을 지움
+        release_payloads(first)
+        release.set()
+
+        extractor.timeout = 5
+        [attachment] = extractor.collect(second_pending)
+        release_payloads(second)
+        assert attachment.error is None
+        assert attachment.text.startswith("분기 매출 보고서")
+    finally:
+        extractor.shutdown()
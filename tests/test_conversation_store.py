@@ -0,0 +1,69 @@
+import pytest
+
+from jane_ai.models.conversation_models import ConversationTurn
+from jane_ai.services.conversation_store import ConversationStore, thread_key
+from jane_ai.utils.email_utils import MAX_REFERENCES, build_references
+
+OWNER = "kim@kdis.ac.kr"
+OTHER = "lee@kdis.ac.kr"
+JANE = "jane.ai@kdis.ac.kr"
+
+@pytest.fixture
+def store():
+    store = ConversationStore(":memory:")
+    yield store
+    store.close()
+
+def start_thread(store, sender=OWNER, subject="회의 일정"):
+    """First inbound message and Jane's reply <reply-1@jane> of a thread"""
+    key = store.resolve_thread("<msg-1@kdis>", None, None, None, thread_key(sender, subject), sender)
+    store.append_turn(key, sender, subject, ConversationTurn(sender, "회의 일정 확인 부탁드립니다.", True,
+                                                            message_id="<msg-1@kdis>"))
+    store.index_message("<reply-1@jane>", key)
+    store.append_turn(key, sender, subject, ConversationTurn(JANE, "확인했습니다.", False,
+                                                            message_id="<reply-1@jane>"))
+    return key
+
+def test_owner_reply_joins_thread_even_with_changed_subject(store):
+    key = start_thread(store)
+    fallback = thread_key(OWNER, "다른 제목")
+    assert store.resolve_thread("<msg-2@kdis>", "<reply-1@jane>", None, None, fallback, OWNER) == key
+
+def test_other_sender_with_known_reference_falls_back(store):
+    start_thread(store)
+    fallback = thread_key(OTHER, "회의 일정")
+    resolved = store.resolve_thread("<msg-3@kdis>", "<reply-1@jane>", "<msg-1@kdis> <reply-1@jane>",
+                                    None, fallback, OTHER)
+    assert resolved == fallback
+
+def test_gmail_thread_id_is_also_checked(store):
+    key = start_thread(store)
+    store.resolve_thread("<msg-2@kdis>", None, None, "1790", key, OWNER)
+    fallback = thread_key(OTHER, "전달: 회의 일정")
+    assert store.resolve_thread("<msg-4@kdis>", None, None, "1790", fallback, OTHER) == fallback
+
+def test_participant_who_wrote_in_thread_is_accepted(store):
+    key = start_thread(store)
+    # 참조에 추가된 동료가 같은 스레드에 답장한 기록이 있으면 이후 답장도 같은 스레드
+    store.append_turn(key, OWNER, "회의 일정", ConversationTurn(OTHER, "저도 참석합니다.", True,
+                                                              message_id="<msg-5@kdis>"))
+    resolved = store.resolve_thread("<msg-6@kdis>", "<reply-1@jane>", None, None, thread_key(OTHER, "x"), OTHER)
+    assert resolved == key
+
+def test_sender_check_is_case_insensitive(store):
+    key = start_thread(store)
+    resolved = store.resolve_thread("<msg-7@kdis>", "<reply-1@jane>", None, None, "fallback", OWNER.upper())
+    assert resolved == key
+
+def test_build_references_appends_parent_id():
+    assert build_references("<a@x> <b@x>", "<b@x>", "<c@x>") == "<a@x> <b@x> <c@x>"
+    assert build_references(None, "<b@x>", "<c@x>") == "<b@x> <c@x>"
+    assert build_references("<a@x>", None, "<a@x>") == "<a@x>"
+
+def test_build_references_trims_but_keeps_thread_root():
+    ids = [f"<m{index}@x>" for index in range(30)]
+    references = build_references(" ".join(ids), None, "<parent@x>").split()
+    assert len(references) == MAX_REFERENCES
+    assert references[0] == "<m0@x>"
+    assert references[-1] == "<parent@x>"
+    assert references[1:] == (ids + ["<parent@x>"])[-(MAX_REFERENCES - 1):]
@@ -0,0 +1,104 @@
+import pytest
+
+from benchmarks.fake_servers import FakeImapServer
+from jane_ai.services.email_monitor import EmailMonitor
+
+RAW = (b"From: staff@kdis.ac.kr\r\nTo: jane@bench.local\r\nSubject: test\r\n"
+       b"Message-ID: <m1@kdis>\r\n\r\nhello\r\n")
+
+@pytest.fixture
+def imap():
+    server = FakeImapServer().start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def monitor(imap):
+    monitor = EmailMonitor(imap.username, imap.password, imap.host, imap.port, use_ssl=False,
+                           timeout=5, reconnect_delay=0.01, reconnect_max_delay=0.05)
+    yield monitor
+    monitor.disconnect()
+
+def test_fetch_does_not_mark_message_seen(imap, monitor):
+    assert monitor.connect()
+    monitor.get_latest_emails()
+    uid = imap.append(RAW)
+    emails = monitor.get_latest_emails()
+    assert [email.uid for email in emails] == [str(uid)]
+    assert monitor.get_original_email(str(uid)) is not None
+    assert '\\Seen' not in imap.flags[uid]
+
+def message(index):
+    return (f"From: staff@kdis.ac.kr\r\nTo: jane@bench.local\r\nSubject: test {index}\r\n"
+            f"Message-ID: <m{index}@kdis>\r\n\r\nhello\r\n").encode()
+
+def failing_fetch(monitor, uid, times):
+    """Make fetching one UID raise a non-session error the first `times` calls"""
+    fetch = monitor._fetch_message
+    calls = {'count': 0}
+
+    def fetch_message(requested):
+        if requested == str(uid).encode() and calls['count'] < times:
+            calls['count'] += 1
+            raise ValueError("파싱 실패")
+        return fetch(requested)
+
+    monitor._fetch_message = fetch_message
+
+def test_failed_uid_is_retried_without_duplicates(imap, monitor):
+    assert monitor.connect()
+    monitor.get_latest_emails()
+    uids = [imap.append(message(index)) for index in range(3)]
+    failing_fetch(monitor, uids[1], times=1)
+
+    assert [email.uid for email in monitor.get_latest_emails()] == [str(uids[0]), str(uids[2])]
+    assert monitor.last_seen_uid == str(uids[0]).encode()
+    assert [email.uid for email in monitor.get_latest_emails()] == [str(uids[1])]
+    assert monitor.last_seen_uid == str(uids[2]).encode()
+    assert monitor.get_latest_emails() == []
+
+def test_uid_that_keeps_failing_is_skipped(imap, monitor):
+    assert monitor.connect()
+    monitor.get_latest_emails()
+    uid = imap.append(message(0))
+    failing_fetch(monitor, uid, times=100)
+
+    for _ in range(EmailMonitor.MAX_FETCH_ATTEMPTS - 1):
+        assert monitor.get_latest_emails() == []
+        assert monitor.last_seen_uid == str(uid - 1).encode()
+    assert monitor.get_latest_emails() == []
+    assert monitor.last_seen_uid == str(uid).encode()
+
+def test_uid_validity_change_resets_position(imap, monitor):
+    assert monitor.connect()
+    monitor.get_latest_emails()
+    imap.append(message(0))
+    monitor.disconnect()
+    monitor.uid_validity = b'999999'
+
+    assert monitor.connect()
+    assert monitor.last_seen_uid is None
+    # 첫 폴링은 현재 최신 UID만 기록하고 기존 메일을 다시 처리하지 않음
+    assert monitor.get_latest_emails() == []
+    assert monitor.last_seen_uid == b'1'
+
+def test_reconnect_backoff_grows_and_resets(monkeypatch, monitor):
+    results = []
+    monkeypatch.setattr(monitor, 'connect', lambda: results.pop(0))
+    monkeypatch.setattr('jane_ai.services.email_monitor.random.uniform', lambda low, high: high)
+    clock = [1000.0]
+    monkeypatch.setattr('jane_ai.services.email_monitor.time.monotonic', lambda: clock[0])
+
+    delays = []
+    for _ in range(4):
+        results.append(False)
+        assert not monitor.ensure_connected()
+        delays.append(round(monitor._next_reconnect - clock[0], 6))
+        # 대기 시간 전에는 연결을 시도하지 않음 (results가 비어 있으면 pop에서 실패)
+        assert not monitor.ensure_connected()
+        clock[0] = monitor._next_reconnect
+    assert delays == [0.02, 0.04, 0.05, 0.05]
+
+    results.append(True)
+    assert monitor.ensure_connected()
+    assert monitor.reconnect_attempts == 0
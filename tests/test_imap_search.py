@@ -0,0 +1,33 @@
+import pytest
+
+from jane_ai.utils.imap_search import build_search_criteria, parse_header_filters, uid_sets
+
+def test_uid_sets_compresses_runs():
+    assert uid_sets([9, 3, 4, 5, 12, 13, 14, 7, 4]) == ["3:5,7,9,12:14"]
+    assert uid_sets([]) == []
+
+def test_uid_sets_splits_long_sets():
+    sets = uid_sets(range(1, 200, 2), max_length=40)
+    assert all(len(value) <= 40 for value in sets)
+    assert [int(uid) for value in sets for uid in value.split(',')] == list(range(1, 200, 2))
+
+def test_search_criteria_with_header_filters():
+    filters = parse_header_filters("List-Id, From:noreply")
+    criteria, literal = build_search_criteria("10:*", filters)
+    assert criteria == ['UID', '10:*', 'NOT', 'HEADER', 'List-Id', '""', 'NOT', 'HEADER', 'From', '"noreply"']
+    assert literal is None
+
+def test_search_criteria_with_gmail_query():
+    criteria, literal = build_search_criteria("10:*", [], 'category:primary -from:"no reply"')
+    assert criteria == ['UID', '10:*', 'X-GM-RAW', '"category:primary -from:\\"no reply\\""']
+    assert literal is None
+
+def test_non_ascii_gmail_query_is_sent_as_literal():
+    criteria, literal = build_search_criteria("10:*", [], "제목:휴가")
+    assert criteria == ['CHARSET', 'UTF-8', 'UID', '10:*', 'X-GM-RAW']
+    assert literal == "제목:휴가".encode('utf-8')
+
+@pytest.mark.parametrize("spec", ["Bad Header", "From:홍길동"])
+def test_invalid_header_filters(spec):
+    with pytest.raises(ValueError):
+        parse_header_filters(spec)
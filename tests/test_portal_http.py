@@ -0,0 +1,46 @@
+import pytest
+
+from jane_ai.models.vacation_models import VacationRequest
+from jane_ai.services.portal_http import HttpVacationBackend, _parse
+from portal_test.stub_portal import StubPortal
+
+@pytest.fixture
+def stub():
+    portal = StubPortal().start()
+    yield portal
+    portal.stop()
+
+def make_backend(stub, **kwargs):
+    return HttpVacationBackend(username=stub.username, password=stub.password, base_url=stub.base_url,
+                               form_url="/approval/vacation/form", **kwargs)
+
+def make_request():
+    return VacationRequest(start_date="2026-11-03", end_date="2026-11-04", days_count=2, reason="개인 사유")
+
+def test_submission_selects_regfile(stub):
+    result = make_backend(stub).submit_vacation_request(make_request())
+    assert result["success"], result
+    assert stub.submissions[-1]["regFile"] == "휴가(외출)"
+
+def test_unknown_regfile_falls_back_without_posting(stub):
+    result = make_backend(stub, regfile="없는 기록물철").submit_vacation_request(make_request())
+    assert not result["success"] and result["fallback"]
+    assert stub.submissions == []
+
+def test_response_without_success_marker_is_failure(stub, monkeypatch):
+    backend = make_backend(stub)
+    original = backend._open
+
+    def fake_open(url, fields=None):
+        if fields is not None and 'StartDate_1' in fields:
+            return url, 200, "<html><body>처리 중</body></html>"
+        return original(url, fields)
+
+    monkeypatch.setattr(backend, '_open', fake_open)
+    result = backend.submit_vacation_request(make_request())
+    assert not result["success"] and not result["fallback"]
+
+def test_tree_label_keeps_nested_markup():
+    page = _parse('<span class="tree_label">휴가<b>신청</b>서</span>'
+                  '<span class="tree_label"><span>부서</span>복무관리</span><span>기타</span>')
+    assert page.tree_labels == ["휴가신청서", "부서복무관리"]
@@ -0,0 +1,58 @@
+import pytest
+
+from jane_ai.utils.email_utils import separate_current_message_from_thread
+
+@pytest.mark.parametrize("body", [
+    "휴가 신청합니다.\nFrom: 2026-11-03\nTo: 2026-11-05\n사유: 가족 행사",
+    "This message is intended for the HR team: please file my leave 11/3",
+    "안녕하세요.\n--\n11월 3일부터 5일까지 휴가 신청합니다.\n사유: 가족 행사",
+    "안녕하세요.\n--\n주차 등록은 어디에서 하나요?",
+    "다음 항목 부탁드립니다.\n1. 보고서 작성:\n- 예산 요약\n2. 회의록 정리",
+    "숫자 확인했습니다.\n--\nThe numbers above are final.",
+])
+def test_lookalikes_stay_in_current_message(body):
+    assert separate_current_message_from_thread(body) == (body, "")
+
+def test_outlook_header_block_without_separator():
+    body = ("네, 좋습니다.\n\nFrom: Hong Gildong\nSent: Wednesday, August 27, 2025 3:00 PM\n"
+            "To: Jane\nSubject: 회의 일정\n\n이전 내용")
+    current, history = separate_current_message_from_thread(body)
+    assert current == "네, 좋습니다."
+    assert history.startswith("From: Hong Gildong")
+
+def test_korean_header_block_with_address():
+    body = "확인했습니다.\n보낸 사람: 김철수 <kim@kdis.ac.kr>\n받는 사람: jane.ai@kdis.ac.kr\n\n이전 내용"
+    current, history = separate_current_message_from_thread(body)
+    assert current == "확인했습니다."
+    assert history.startswith("보낸 사람:")
+
+def test_stripped_signature_moves_to_thread_history():
+    signature = "--\n김철수 / 전산2팀\n전화 044-550-0101"
+    footer = "Sent from my iPhone"
+    disclaimer = "CONFIDENTIALITY NOTICE: This e-mail is confidential and intended solely for the addressee."
+    body = f"회의실 예약 부탁드립니다.\n\n{signature}\n\n{footer}\n\n{disclaimer}\n\n> 이전 메일"
+    current, history = separate_current_message_from_thread(body)
+    assert current == "회의실 예약 부탁드립니다."
+    for part in (signature, footer, disclaimer, "> 이전 메일"):
+        assert part in history
+
+def test_disclaimer_sentence_early_in_long_message_is_kept():
+    lines = ["This message is confidential between us, but please share the leave form."]
+    lines += [f"{index}번째 안내 문장입니다." for index in range(10)]
+    body = "\n".join(lines)
+    assert separate_current_message_from_thread(body) == (body, "")
+
+@pytest.mark.parametrize("attribution", [
+    "2025년 8월 27일 (수) 오후 3:00, 홍길동 <hong@kdis.ac.kr>님이 작성:",
+    "2025. 8. 27. 오후 3:00, hong@kdis.ac.kr 작성:",
+])
+def test_korean_attribution_starts_thread(attribution):
+    current, history = separate_current_message_from_thread(f"답장입니다.\n\n{attribution}\n> 이전 메일")
+    assert current == "답장입니다."
+    assert history.startswith(attribution)
+
+@pytest.mark.parametrize("signature", ["--\n김철수 드림\n행정팀 과장", "--\nAlex Kim\nProgram Officer | KDI School"])
+def test_name_and_title_signature_is_stripped(signature):
+    current, history = separate_current_message_from_thread(f"부탁드립니다.\n\n{signature}")
+    assert current == "부탁드립니다."
+    assert history == signature
@@ -0,0 +1,62 @@
+import asyncio
+import json
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("agents")
+from agents.tool_context import ToolContext
+
+from jane_ai.agents.jane_agents import JaneRunContext, ToolSpanHooks, submit_vacation_request
+from jane_ai.utils import tracing
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def shutdown(self):
+        pass
+
+class DoneBatcher:
+    def submit(self, request):
+        future = Future()
+        future.set_result({"success": True, "message": "ok"})
+        return future
+
+@pytest.fixture
+def exporter():
+    exporter = ListExporter()
+    tracing.tracer.configure([exporter])
+    yield exporter
+    tracing.tracer.shutdown()
+
+def test_spans_inside_tool_nest_under_tool_span(exporter):
+    hooks = ToolSpanHooks()
+    run_context = JaneRunContext(sender_email="staff@kdis.ac.kr", vacation_batcher=DoneBatcher())
+    tool_context = ToolContext(context=run_context, tool_call_id="call_1")
+    agent = SimpleNamespace(name="vacation_agent")
+    arguments = json.dumps({"start_date": "2027-03-08", "end_date": "2027-03-09"})
+
+    async def run_tool():
+        # 에이전트 SDK와 같이 훅과 도구를 형제 태스크로 실행
+        _, result = await asyncio.gather(
+            hooks.on_tool_start(tool_context, agent, submit_vacation_request),
+            submit_vacation_request.on_invoke_tool(tool_context, arguments),
+        )
+        await hooks.on_tool_end(tool_context, agent, submit_vacation_request, result)
+        return result
+
+    root = tracing.tracer.start_trace("email")
+    with tracing.activate(root):
+        result = asyncio.run(run_tool())
+    root.end()
+
+    assert result["success"], result
+    spans = {span.name: span for span in exporter.spans}
+    assert spans["tool_submit_vacation"].parent_id == spans["tool:submit_vacation_request"].span_id
+    assert spans["tool:submit_vacation_request"].parent_id == root.span_id
+    assert run_context.tool_spans == {}
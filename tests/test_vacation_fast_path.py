@@ -0,0 +1,55 @@
+import asyncio
+from concurrent.futures import Future
+from datetime import date
+
+import pytest
+
+pytest.importorskip("agents")
+
+from jane_ai.agents import jane_agents
+from jane_ai.agents.jane_agents import JaneAgents, JaneRunContext
+from jane_ai.utils.vacation_parser import parse_vacation_request
+
+class RecordedBatcher:
+    """Answers every submission with a fixed ledger result"""
+
+    def __init__(self, result):
+        self.result = result
+        self.requests = []
+
+    def submit(self, request):
+        self.requests.append(request)
+        future = Future()
+        future.set_result(self.result)
+        return future
+
+@pytest.fixture(autouse=True)
+def fixed_today(monkeypatch):
+    monkeypatch.setattr(jane_agents, 'parse_vacation_request',
+                        lambda message: parse_vacation_request(message, reference=date(2026, 10, 19)))
+
+def fast_path(message, batcher):
+    agents = object.__new__(JaneAgents)
+    run_context = JaneRunContext(sender_email="kim@kdis.ac.kr", vacation_batcher=batcher)
+    return asyncio.run(agents._try_vacation_fast_path(message, run_context))
+
+def test_in_flight_duplicate_does_not_ask_for_a_retry():
+    batcher = RecordedBatcher({"success": False, "duplicate": True, "message": "동일한 휴가 신청이 이미 처리 중입니다"})
+    reply = fast_path("11월 3일부터 5일까지 연차 신청합니다. 사유: 가족 여행", batcher)
+    assert "새로 기안하지 않았습니다" in reply
+    assert "동일한 휴가 신청이 이미 처리 중입니다" in reply
+    assert "문제가 발생했습니다" not in reply and "다시 요청해 주시거나" not in reply
+
+def test_already_submitted_duplicate():
+    batcher = RecordedBatcher({"success": True, "duplicate": True, "message": "휴가 신청이 성공적으로 완료되었습니다"})
+    reply = fast_path("11월 3일부터 5일까지 연차 신청합니다. 사유: 가족 여행", batcher)
+    assert "이미 포털 전자결재에 기안되어" in reply
+
+def test_calendar_validation_error_explains_the_period():
+    batcher = RecordedBatcher({"success": True})
+    # 2026-11-07/08은 주말
+    reply = fast_path("11월 7일부터 8일까지 연차 신청합니다. 사유: 이사", batcher)
+    assert batcher.requests == []
+    assert "포털에 제출하지 않았습니다" in reply
+    assert "근무일이 없습니다" in reply
+    assert "문제가 발생했습니다" not in reply
@@ -0,0 +1,82 @@
+from socket import timeout as SocketTimeout
+from urllib.error import URLError
+
+import pytest
+
+from jane_ai.models.vacation_models import VacationRequest
+from jane_ai.services.portal_http import HttpVacationBackend
+from jane_ai.services.vacation_batcher import VacationBatcher
+from jane_ai.services.vacation_ledger import VacationLedger
+from jane_ai.services.vacation_service import VacationService
+from portal_test.stub_portal import StubPortal
+
+@pytest.fixture
+def stub():
+    portal = StubPortal().start()
+    yield portal
+    portal.stop()
+
+@pytest.fixture
+def ledger():
+    ledger = VacationLedger(":memory:")
+    yield ledger
+    ledger.close()
+
+def make_request():
+    return VacationRequest(start_date="2026-11-03", end_date="2026-11-04", days_count=2,
+                           requester="kim@kdis.ac.kr")
+
+def make_batcher(service, ledger):
+    return VacationBatcher(service, window=0, max_workers=1, ledger=ledger)
+
+def test_post_that_times_out_after_sending_is_not_retried(stub, ledger):
+    backend = HttpVacationBackend(username=stub.username, password=stub.password, base_url=stub.base_url,
+                                  form_url="/approval/vacation/form")
+    original = backend._open
+
+    def open_then_time_out(url, fields=None):
+        response = original(url, fields)
+        if fields is not None and 'StartDate_1' in fields:
+            # 포털은 양식을 받았지만 응답이 오기 전에 시간 초과
+            raise URLError(SocketTimeout("timed out"))
+        return response
+
+    backend._open = open_then_time_out
+    batcher = make_batcher(VacationService(http_backend=backend), ledger)
+    try:
+        first = batcher.submit(make_request()).result(timeout=10)
+        assert not first["success"] and first["unconfirmed"]
+        second = batcher.submit(make_request()).result(timeout=10)
+        assert second["duplicate"] and second["unconfirmed"]
+        assert len(stub.submissions) == 1
+    finally:
+        batcher.shutdown()
+
+class PostThenRaiseService:
+    """Posts every request, then fails before returning the results"""
+
+    def __init__(self):
+        self.pool = type("Pool", (), {"size": 1})()
+        self.calls = 0
+
+    def submit_vacation_requests(self, requests):
+        self.calls += 1
+        raise RuntimeError("확인 대화상자 대기 시간 초과")
+
+def test_exception_after_submit_is_recorded_unconfirmed(ledger):
+    service = PostThenRaiseService()
+    batcher = make_batcher(service, ledger)
+    try:
+        with pytest.raises(RuntimeError):
+            batcher.submit(make_request()).result(timeout=10)
+        second = batcher.submit(make_request()).result(timeout=10)
+        assert second["duplicate"] and second["unconfirmed"]
+        assert service.calls == 1
+    finally:
+        batcher.shutdown()
+
+def test_rejected_request_can_be_claimed_again(ledger):
+    request = make_request()
+    assert ledger.claim(request) is None
+    ledger.record(request, {"success": False, "message": "필수 항목 누락"})
+    assert ledger.claim(request) is None
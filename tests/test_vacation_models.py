@@ -0,0 +1,16 @@
+import pytest
+
+from jane_ai.models.vacation_models import VacationRequest
+
+def test_days_count_is_coerced_to_int():
+    request = VacationRequest(start_date="2026-11-03", end_date="2026-11-04", days_count="2")
+    assert request.days_count == 2
+
+@pytest.mark.parametrize("days_count", ["two", 1.5, True, None])
+def test_invalid_days_count_is_rejected(days_count):
+    with pytest.raises(ValueError):
+        VacationRequest(start_date="2026-11-03", end_date="2026-11-04", days_count=days_count)
+
+def test_non_string_field_is_rejected():
+    with pytest.raises(ValueError):
+        VacationRequest(start_date=None, end_date="2026-11-04")
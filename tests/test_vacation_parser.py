@@ -0,0 +1,59 @@
+from datetime import date
+
+from jane_ai.utils.vacation_parser import parse_vacation_request
+
+TODAY = date(2026, 10, 19)
+
+def test_single_date_with_day_count():
+    parsed = parse_vacation_request("10월 30일 연차 1일 신청합니다. 사유: 개인 용무", reference=TODAY)
+    assert (parsed.start_date, parsed.end_date) == ("2026-10-30", "2026-10-30")
+    assert parsed.reason == "개인 용무"
+    assert parsed.is_complete
+
+def test_range_with_bare_end_day():
+    parsed = parse_vacation_request("11월 3일부터 5일까지 연차 신청합니다. 사유: 가족 여행", reference=TODAY)
+    assert (parsed.start_date, parsed.end_date) == ("2026-11-03", "2026-11-05")
+    assert parsed.is_complete
+
+def test_range_with_tilde():
+    parsed = parse_vacation_request("11/3 ~ 11/5 연차 신청합니다. 사유: 이사", reference=TODAY)
+    assert (parsed.start_date, parsed.end_date) == ("2026-11-03", "2026-11-05")
+    assert parsed.is_complete
+
+def test_return_date_outside_range_is_ambiguous():
+    parsed = parse_vacation_request(
+        "11월 3일 연차 신청합니다. 사유: 개인 용무. 12월 1일 복귀 예정입니다.", reference=TODAY
+    )
+    assert parsed.ambiguous
+    assert not parsed.is_complete
+
+def test_reported_date_in_parentheses_is_ambiguous():
+    parsed = parse_vacation_request(
+        "연차 신청합니다. 사유: 병원 진료. 11월 3일 (11월 1일 팀장님께 보고 완료)", reference=TODAY
+    )
+    assert parsed.ambiguous
+    assert not parsed.is_complete
+
+def test_repeated_date_is_not_ambiguous():
+    parsed = parse_vacation_request("11월 3일 연차 신청합니다. 사유: 이사. 11월 3일 하루입니다.", reference=TODAY)
+    assert parsed.start_date == parsed.end_date == "2026-11-03"
+    assert parsed.is_complete
+
+def test_past_date_is_rejected():
+    parsed = parse_vacation_request("2026-10-01 연차 신청합니다. 사유: 개인 용무", reference=TODAY)
+    assert parsed.ambiguous
+    assert not parsed.is_complete
+
+def test_reversed_range_is_ambiguous():
+    parsed = parse_vacation_request("11월 5일부터 11월 3일까지 연차 신청합니다. 사유: 이사", reference=TODAY)
+    assert not parsed.is_complete
+
+def test_bare_day_without_month_is_ambiguous():
+    parsed = parse_vacation_request("~30일 연차 신청합니다. 사유: 이사", reference=TODAY)
+    assert not parsed.is_complete
+
+def test_reason_stops_at_sentence_boundary():
+    parsed = parse_vacation_request(
+        "11월 3일 연차 신청합니다. 사유: 이사. 연락처 010-1234-5678", reference=TODAY
+    )
+    assert parsed.reason == "이사"
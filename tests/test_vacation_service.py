@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from jane_ai.models.vacation_models import VacationRequest
+from jane_ai.services.vacation_service import VacationService
+
+class FakeDriver:
+    def __init__(self, name):
+        self.name = name
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+class FakeBrowser:
+    def __init__(self, name):
+        self.driver = FakeDriver(name)
+        self.healthy = True
+
+    def discard(self):
+        self.healthy = False
+
+class FakePool:
+    """Hands out a new browser per session and records which ones were discarded"""
+
+    base_url = "http://portal.test"
+    size = 1
+
+    def __init__(self):
+        self.browsers = []
+
+    @contextmanager
+    def session(self):
+        browser = FakeBrowser(f"browser-{len(self.browsers) + 1}")
+        self.browsers.append(browser)
+        yield browser
+
+def make_requests(count):
+    return [VacationRequest(start_date=f"2026-11-0{index + 2}", end_date=f"2026-11-0{index + 2}")
+            for index in range(count)]
+
+def test_discarded_session_is_replaced_for_the_rest_of_the_batch():
+    pool = FakePool()
+    service = VacationService(pool=pool)
+    used = []
+
+    def submit_in_form_window(request):
+        used.append((request.start_date, service.driver.name))
+        # 두 번째 신청에서 드라이버가 고장남
+        return {"success": request.start_date != "2026-11-03", "message": ""}
+
+    service._open_form_tree = lambda: True
+    service._submit_in_form_window = submit_in_form_window
+    service._return_to_main_window = lambda browser: True
+
+    results = service._submit_with_browser(make_requests(3))
+
+    assert [result["success"] for result in results] == [True, False, True]
+    assert used == [("2026-11-02", "browser-1"), ("2026-11-03", "browser-1"), ("2026-11-04", "browser-2")]
+    assert [browser.healthy for browser in pool.browsers] == [False, True]
+
+def test_form_tree_failure_moves_on_to_a_fresh_session():
+    pool = FakePool()
+    service = VacationService(pool=pool)
+    service._open_form_tree = lambda: service.driver.name != "browser-1"
+    service._submit_in_form_window = lambda request: {"success": True, "message": ""}
+    service._return_to_main_window = lambda browser: True
+
+    results = service._submit_with_browser(make_requests(2))
+
+    assert [result["success"] for result in results] == [False, True]
+    assert len(pool.browsers) == 2
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Jane.ai - daily token and cost report
+
+Usage:
+    python usage_report.py [--days 7] [--since 2025-09-01] [--until 2025-09-07]
+        [--by intent,model] [--top 10] [--db data/usage.db]
+"""
+from datetime import date, timedelta
+import argparse
+import os
+import sys
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from config.config import load_config
+from jane_ai.services.usage_store import GROUP_COLUMNS, UsageStore
+
+def format_cost(value) -> str:
+    return "-" if value is None else f"${value:,.4f}"
+
+NUMERIC_COLUMNS = {"emails", "requests", "input", "cached", "output", "cost", "cost/email"}
+
+def print_table(rows, columns):
+    """Left-aligned text columns, right-aligned numbers"""
+    headers = [title for _, title in columns]
+    cells = [[str(render(row)) for render, _ in columns] for row in rows]
+    widths = [max([len(header)] + [len(line[index]) for line in cells]) for index, header in enumerate(headers)]
+
+    def fmt(values):
+        return "  ".join(value.rjust(width) if header in NUMERIC_COLUMNS else value.ljust(width)
+                         for value, width, header in zip(values, widths, headers))
+
+    print(fmt(headers))
+    print("  ".join("-" * width for width in widths))
+    for line in cells:
+        print(fmt(line))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Jane.ai daily token and cost report")
+    parser.add_argument('--days', type=int, default=7, help="report the last N days (including today)")
+    parser.add_argument('--since', type=date.fromisoformat, help="first day (YYYY-MM-DD), overrides --days")
+    parser.add_argument('--until', type=date.fromisoformat, help="last day (YYYY-MM-DD, default: today)")
+    parser.add_argument('--by', default="intent",
+                        help=f"comma-separated breakdown per day: {', '.join(c for c in GROUP_COLUMNS if c != 'day')}")
+    parser.add_argument('--top', type=int, default=10, help="most expensive emails to list (0: none)")
+    parser.add_argument('--db', help="usage database (default: JANE_USAGE_PATH)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    path = args.db or load_config().ai.usage_path
+    if not path or not os.path.exists(path):
+        print(f"사용량 데이터베이스가 없습니다: {path or '(JANE_USAGE_PATH 비활성화)'}")
+        sys.exit(1)
+
+    until = args.until or date.today()
+    since = args.since or until - timedelta(days=max(1, args.days) - 1)
+    breakdown = [column.strip() for column in args.by.split(',') if column.strip() and column.strip() != 'day']
+
+    store = UsageStore(path)
+    try:
+        try:
+            daily = store.rollup(since, until, ["day"])
+            detail = store.rollup(since, until, ["day"] + breakdown) if breakdown else []
+        except ValueError as e:
+            print(e)
+            sys.exit(2)
+        totals = store.rollup(since, until, [])
+        top = store.top_emails(since, until, args.top) if args.top > 0 else []
+    finally:
+        store.close()
+
+    print(f"=== Jane.ai 모델 사용량 ({since} ~ {until}) ===\n")
+    if not daily:
+        print("기록된 사용량이 없습니다.")
+        return
+
+    usage_columns = [
+        (lambda row: f"{row['emails']:,}", "emails"),
+        (lambda row: f"{row['requests']:,}", "requests"),
+        (lambda row: f"{row['input_tokens']:,}", "input"),
+        (lambda row: f"{row['cached_tokens']:,}", "cached"),
+        (lambda row: f"{row['output_tokens']:,}", "output"),
+        (lambda row: format_cost(row['cost_usd']), "cost"),
+        (lambda row: format_cost(row['cost_usd'] / row['emails'] if row['cost_usd'] and row['emails'] else None),
+         "cost/email"),
+    ]
+
+    print_table(daily, [(lambda row: row['day'], "day")] + usage_columns)
+    total = totals[0]
+    print(f"\n합계: 이메일 {total['emails']:,}건, 요청 {total['requests']:,}회, "
+          f"입력 {total['input_tokens']:,} (캐시 {total['cached_tokens']:,}), 출력 {total['output_tokens']:,} 토큰, "
+          f"비용 {format_cost(total['cost_usd'])}")
+    if total['unpriced']:
+        print(f"가격표에 없는 모델 호출 {total['unpriced']:,}건은 비용에서 제외되었습니다 (JANE_MODEL_PRICES로 설정)")
+
+    if detail:
+        print(f"\n--- 일별 {', '.join(breakdown)} 기준 ---")
+        print_table(detail, [(lambda row: row['day'], "day")] +
+                    [((lambda column: lambda row: row[column] or "-")(column), column) for column in breakdown] +
+                    usage_columns)
+
+    if top:
+        print(f"\n--- 비용 상위 이메일 {len(top)}건 ---")
+        print_table(top, [
+            (lambda row: row['day'], "day"),
+            (lambda row: row['email_uid'], "uid"),
+            (lambda row: row['sender_domain'] or "-", "sender_domain"),
+            (lambda row: row['intent'] or "-", "intent"),
+            (lambda row: f"{row['input_tokens']:,}", "input"),
+            (lambda row: f"{row['output_tokens']:,}", "output"),
+            (lambda row: format_cost(row['cost_usd']), "cost"),
+            (lambda row: (row['subject'] or "")[:40], "subject"),
+        ])
+
+if __name__ == "__main__":
+    main()